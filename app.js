@@ -32,10 +32,23 @@ holistic.setOptions({
 
 holistic.onResults(onResults);
 
-// Load the TensorFlow.js model
+// Weights to download: 'tfjs_model' (float32), 'tfjs_model_float16' (half the size)
+// or 'tfjs_model_uint8' (a quarter); see tfjs_artifacts.py for what each costs in accuracy.
+// Override with ?model=<directory>.
+const pageParams = new URLSearchParams(window.location.search);
+const MODEL_DIR = pageParams.get('model') || 'tfjs_model_float16';
+
+// The sign recognition app serves the models under /models/ with the ETags and
+// Cache-Control that let the browser keep them (see model_file in app.py). This
+// page may be served from elsewhere, so it asks that app for them; override with
+// ?modelServer=<origin>.
+const MODEL_SERVER = pageParams.get('modelServer') ??
+    (window.location.port === '5000' ? '' : 'http://localhost:5000');
+
+// Load the TensorFlow.js model; the weight shards resolve relative to model.json
 async function loadModel() {
     try {
-        model = await tf.loadLayersModel('tfjs_model/model.json');
+        model = await tf.loadLayersModel(`${MODEL_SERVER}/models/${MODEL_DIR}/model.json`);
         isModelLoaded = true;
         console.log('Model loaded successfully');
     } catch (error) {
@@ -1,32 +1,39 @@
-from flask import Flask, request, jsonify, render_template, make_response
+from flask import Flask, request, jsonify, render_template, make_response, Response, abort
 from flask_cors import CORS
-import tensorflow as tf
 import numpy as np
-import cv2
-import mediapipe as mp
-import base64
 import json
 import logging
 import os
+import re
 from collections import deque
 import threading
 import queue
 import time
 import requests
+from recognition_logic import (
+    SIGNS, SIGN_REGISTRY_PATH, actions, tagalog_labels, init_client_buffer, MAX_EMPTY_FRAMES, CONFIDENCE_THRESHOLD,
+    get_layout, extract_keypoints, assemble_window, FrameGeometry, has_hands, postprocess_prediction, track_hands,
+    add_to_sentence
+)
+from sign_decoder import StreamingSignDecoder
+from frame_pipeline import (
+    decode_data_url, decode_frame, to_rgb, crop, map_landmarks_to_frame, RoiTracker, PoseHandsDetector,
+    draw_overlay, encode_frame
+)
+from frame_pacing import FramePacer
+from tfjs_artifacts import cache_control, read_model_file
+from metrics import REGISTRY, CONTENT_TYPE, StageTimer, counter, gauge, histogram
+from startup_phases import Startup
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Suppress MediaPipe warnings
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TensorFlow logging
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TensorFlow logging; set before TensorFlow is imported
 import absl.logging
 absl.logging.set_verbosity(absl.logging.ERROR)
 
-# Configure TensorFlow for better performance
-tf.config.threading.set_inter_op_parallelism_threads(2)
-tf.config.threading.set_intra_op_parallelism_threads(2)
-
 # Create the Flask app with CORS options
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True, allow_headers="*", expose_headers="*")
@@ -41,398 +48,222 @@ def options_handler(path=None):
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     return response
 
-# Initialize MediaPipe with optimized settings
-mp_holistic = mp.solutions.holistic
-holistic = mp_holistic.Holistic(
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5,
-    model_complexity=0,  # Reduced complexity for better performance
-    enable_segmentation=False,
-    refine_face_landmarks=False,
-    static_image_mode=False
-)
-
-# Load the model
-try:
-    model = tf.keras.models.load_model('action.h5')
-    # Optimize model for inference
-    model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
-    logger.info("Model loaded successfully")
-except Exception as e:
-    logger.error(f"Error loading model: {e}")
-    raise
-
-# Define actions and colors for visualization
-actions = ['hello', 'thanks', 'iloveyou']
-colors = [(245,117,16), (117,245,16), (16,117,245)]
-
-# Define Tagalog translations
-tagalog_labels = {
-    'hello': 'kamusta',
-    'thanks': 'salamat',
-    'iloveyou': 'mahal kita'
-}
-
-# For converting back from Tagalog to English (for model processing)
-english_labels = {
-    'kamusta': 'hello',
-    'salamat': 'thanks',
-    'mahal kita': 'iloveyou'
-}
+# Keypoints fed to the model: 'full' (1662 features), 'pose_hands' (258, no face mesh)
+# or 'pose_hands_face' (309). Other layouts need a model trained with train_layout_model.py.
+KEYPOINT_LAYOUT = get_layout(os.environ.get('KEYPOINT_LAYOUT', 'full'))
+MODEL_PATH = os.environ.get('MODEL_PATH', 'action.h5' if KEYPOINT_LAYOUT.name == 'full' else f'action_{KEYPOINT_LAYOUT.name}.h5')
+# A .tflite MODEL_PATH (see tflite_artifacts.py) runs on the TensorFlow Lite interpreter instead of Keras
+USE_TFLITE = MODEL_PATH.endswith('.tflite')
+
+logger.info(f"Using keypoint layout {KEYPOINT_LAYOUT.name} ({KEYPOINT_LAYOUT.size} features)")
+logger.info(f"Recognizing {len(SIGNS)} signs from {SIGN_REGISTRY_PATH}")
+
+# TensorFlow, the model and MediaPipe are loaded by the startup phases below,
+# in background threads once the server runs, so importing this module is
+# quick and /test answers while they load. /ready says when they are done.
+model = None
+detector = None
+prediction_thread = None
+
+STARTUP_PHASE_SECONDS = gauge('startup_phase_seconds', "Time each startup phase took", ('phase', 'status'))
+startup = Startup(on_phase_done=lambda name, status, seconds: STARTUP_PHASE_SECONDS.set(seconds, phase=name,
+                                                                                      status=status))
+gauge('service_ready', "Whether startup finished and predictions are served", function=lambda: startup.ready)
+
+@startup.phase('tensorflow')
+def import_tensorflow():
+    if USE_TFLITE:
+        return None  # TFLiteModel imports its interpreter, without TensorFlow if tflite_runtime is installed
+    import tensorflow as tf
+    # Configure TensorFlow for better performance
+    tf.config.threading.set_inter_op_parallelism_threads(2)
+    tf.config.threading.set_intra_op_parallelism_threads(2)
+    return tf
+
+@startup.phase('model', after=('tensorflow',))
+def load_model():
+    global model
+    if USE_TFLITE:
+        from tflite_model import TFLiteModel
+        loaded = TFLiteModel(MODEL_PATH, num_threads=2)
+    else:
+        tf = startup.result('tensorflow')
+        # Only used for inference, so the optimizer and metrics of compiling are never needed
+        loaded = tf.keras.models.load_model(MODEL_PATH, compile=False)
+    if loaded.input_shape[-1] != KEYPOINT_LAYOUT.size:
+        raise ValueError(f"{MODEL_PATH} expects {loaded.input_shape[-1]} features per frame, but layout "
+                         f"{KEYPOINT_LAYOUT.name} has {KEYPOINT_LAYOUT.size}; set MODEL_PATH or KEYPOINT_LAYOUT to match")
+    if loaded.output_shape[-1] != len(SIGNS):
+        raise ValueError(f"{MODEL_PATH} predicts {loaded.output_shape[-1]} signs, but {SIGN_REGISTRY_PATH} lists "
+                         f"{len(SIGNS)}; set SIGN_REGISTRY to the model's signs")
+    model = loaded
+    logger.info(f"Model {MODEL_PATH} loaded successfully")
+
+@startup.phase('model_warmup', after=('model',))
+def warm_up_model():
+    # The first predict traces the inference function; pay for it on a blank window, not a user's frame
+    window_length = model.input_shape[1] or init_client_buffer()['frames'].maxlen
+    model.predict(np.zeros((1, window_length, KEYPOINT_LAYOUT.size), dtype=np.float32), verbose=0)
+
+@startup.phase('detector')
+def create_detector():
+    global detector
+    # Initialize MediaPipe with optimized settings; layouts without the face mesh skip it entirely
+    if KEYPOINT_LAYOUT.uses_face_mesh:
+        import mediapipe as mp
+        detector = mp.solutions.holistic.Holistic(
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+            model_complexity=0,  # Reduced complexity for better performance
+            enable_segmentation=False,
+            refine_face_landmarks=False,
+            static_image_mode=False
+        )
+    else:
+        detector = PoseHandsDetector(min_detection_confidence=0.5, min_tracking_confidence=0.5, model_complexity=0)
+
+@startup.phase('detector_warmup', after=('detector',))
+def warm_up_detector():
+    # The first frame initializes MediaPipe's graph and models
+    detector.process(np.zeros((480, 640, 3), dtype=np.uint8))
+
+# Record the frames each client sends when SESSION_RECORD_DIR is set, for replay_session.py
+session_recorder = None
+if os.environ.get('SESSION_RECORD_DIR'):
+    import atexit
+    from session_recorder import SessionRecorder
+    session_recorder = SessionRecorder(os.environ['SESSION_RECORD_DIR'])
+    atexit.register(session_recorder.close)
 
 # Create a sequence buffer for each client
 sequence_buffer = {}
 prediction_queue = queue.Queue()
 
-# Initialize client buffer safely with explicit types
-def init_client_buffer():
-    """Create a new buffer for a client with proper data types"""
-    return {
-        'frames': deque(maxlen=30),
-        'predictions': deque(maxlen=10),
-        'sentence': deque(maxlen=5),
-        'last_prediction': ('Waiting for hands...', 0.0, None, False),
-        'current_action': None,
-        'current_action_start_time': None,
-        'consecutive_predictions': 0,
-        'last_action': None,
-        'empty_frame_counter': 0,
-        'previous_results': None,
-        'motion_history': deque(maxlen=10),
-        'last_iloveyou_time': 0,  # Track when we last detected "iloveyou"
-        'iloveyou_cooldown': 2.0  # Seconds to wait before allowing another "iloveyou" detection
-    }
-
-# Constants for prediction stability
-CONFIDENCE_THRESHOLD = 0.65  # Lowered threshold to detect more quickly
-HIGH_CONFIDENCE_THRESHOLD = 0.90  # Lowered to detect 'iloveyou' better
-MIN_PREDICTION_TIME = 0.5  # Reduced time to make predictions faster
-MIN_CONSECUTIVE_PREDICTIONS = 3  # Reduced number of consecutive predictions needed
-MAX_EMPTY_FRAMES = 5  # Maximum number of frames without hands before resetting
-VALID_HAND_VISIBILITY_THRESHOLD = 0.2  # Reduced from 0.8 - much more lenient visibility requirement
-MOTION_THRESHOLD = 0.025  # Increased from 0.02 - requiring more motion for dynamic signs
-
-# Sign-specific settings
-SIGN_TYPES = {
-    'hello': 'dynamic',  # Dynamic sign that needs motion
-    'thanks': 'dynamic', # Dynamic sign that needs motion
-    'iloveyou': 'static' # Static sign that needs proper hand configuration
-}
-
-# More balanced weights - reduce iloveyou weight even more
-SIGN_WEIGHTS = {
-    'hello': 1.1,    # Boost to hello
-    'thanks': 1.1,   # Boost to thanks
-    'iloveyou': 0.85  # Further reduction for iloveyou to prevent over-detection
-}
-
-def extract_keypoints(results):
-    try:
-        pose = np.array([[res.x, res.y, res.z, res.visibility] for res in results.pose_landmarks.landmark]).flatten() if results.pose_landmarks else np.zeros(33*4)
-        face = np.array([[res.x, res.y, res.z] for res in results.face_landmarks.landmark]).flatten() if results.face_landmarks else np.zeros(468*3)
-        lh = np.array([[res.x, res.y, res.z] for res in results.left_hand_landmarks.landmark]).flatten() if results.left_hand_landmarks else np.zeros(21*3)
-        rh = np.array([[res.x, res.y, res.z] for res in results.right_hand_landmarks.landmark]).flatten() if results.right_hand_landmarks else np.zeros(21*3)
-        return np.concatenate([pose, face, lh, rh])
-    except Exception as e:
-        logger.error(f"Error extracting keypoints: {e}")
-        return None
-
-def calculate_hand_motion(current_hand, previous_hand):
-    """Calculate the amount of motion between two hand landmark frames"""
-    if current_hand is None or previous_hand is None:
-        return 0
-    
-    # Calculate Euclidean distance for each landmark point
-    total_motion = 0
-    for i in range(len(current_hand.landmark)):
-        curr = current_hand.landmark[i]
-        prev = previous_hand.landmark[i]
-        
-        # Distance in 3D space
-        dist = np.sqrt((curr.x - prev.x)**2 + (curr.y - prev.y)**2 + (curr.z - prev.z)**2)
-        total_motion += dist
-    
-    # Return average motion
-    return total_motion / len(current_hand.landmark)
-
-def has_hands(results):
-    """Check if hands are present in the frame with simpler, more lenient detection"""
-    # Most basic check - are any hand landmarks detected?
-    if results.left_hand_landmarks is None and results.right_hand_landmarks is None:
-        return False
-    
-    # If we have hands, do some basic validation but be very lenient
-    if results.left_hand_landmarks:
-        # Just check that some fingers are visible (not just wrist)
-        return True
-    
-    if results.right_hand_landmarks:
-        # Just check that some fingers are visible (not just wrist)
-        return True
-    
-    return False
+# Turns each client's predictions into the signs added to its sentence
+sign_decoder = StreamingSignDecoder(
+    SIGNS,
+    smoothing_seconds=float(os.environ.get('SIGN_SMOOTHING_MS', '150')) / 1000,
+    enter_threshold=CONFIDENCE_THRESHOLD,
+    min_hold_seconds=float(os.environ.get('SIGN_MIN_HOLD_MS', '100')) / 1000
+)
 
-def check_sign_validity(predicted_sign, current_results, previous_results, motion_history):
-    """Check if the predicted sign meets the criteria for its type (dynamic vs static)"""
-    sign_type = SIGN_TYPES.get(predicted_sign, 'dynamic')
-    
-    # Convert any NumPy values in motion_history to Python float
-    motion_history = [float(m) if hasattr(m, 'dtype') else m for m in motion_history]
-    
-    # Special handling for specific signs
-    if predicted_sign == 'hello':
-        # For "hello" we expect hand near forehead 
-        if current_results and current_results.right_hand_landmarks:
-            landmarks = current_results.right_hand_landmarks.landmark
-            # Check if hand is near the forehead height (y position)
-            if len(landmarks) >= 21:
-                wrist = landmarks[0]
-                # Get nose position as reference for face/head
-                nose_y = None
-                if current_results.pose_landmarks:
-                    nose = current_results.pose_landmarks.landmark[0]  # Nose landmark
-                    nose_y = nose.y
-                
-                # Check if hand is near forehead height (above nose)
-                hand_near_forehead = False
-                if nose_y:
-                    # Hand should be near or above nose height
-                    hand_near_forehead = wrist.y <= nose_y + 0.05
-                
-                # Check for some motion but not too much
-                if len(motion_history) >= 3:
-                    avg_motion = sum(motion_history[-3:]) / 3
-                    good_motion = MOTION_THRESHOLD * 0.5 < avg_motion < MOTION_THRESHOLD * 2.0
-                    
-                    return bool(hand_near_forehead and good_motion)
-        
-        # Fallback to motion-only check
-        if len(motion_history) >= 3:
-            avg_motion = sum(motion_history[-3:]) / 3
-            return bool(avg_motion > MOTION_THRESHOLD * 0.8)
-    
-    elif predicted_sign == 'thanks':
-        # For "thanks" we expect fingers tapping on chin, potentially with both hands
-        
-        # Check if hands are near chin height
-        hands_near_chin = False
-        if current_results:
-            # Check for chin/mouth position in face landmarks
-            chin_y = None
-            if current_results.face_landmarks:
-                # Use bottom lip as reference for chin
-                lips = [current_results.face_landmarks.landmark[i] for i in range(0, 17)]  # Lower face contour
-                if lips:
-                    chin_y = max(lip.y for lip in lips)  # Bottom of face
-            
-            # Check if either or both hands are near chin
-            left_hand_near_chin = False
-            right_hand_near_chin = False
-            
-            if current_results.left_hand_landmarks and chin_y:
-                left_fingers = [current_results.left_hand_landmarks.landmark[i] for i in range(8, 21, 4)]  # Fingertips
-                left_hand_near_chin = any(abs(finger.y - chin_y) < 0.1 for finger in left_fingers)
-                
-            if current_results.right_hand_landmarks and chin_y:
-                right_fingers = [current_results.right_hand_landmarks.landmark[i] for i in range(8, 21, 4)]  # Fingertips
-                right_hand_near_chin = any(abs(finger.y - chin_y) < 0.1 for finger in right_fingers)
-                
-            hands_near_chin = left_hand_near_chin or right_hand_near_chin
-            
-            # Check for appropriate motion (tapping)
-            if len(motion_history) >= 3:
-                avg_motion = sum(motion_history[-3:]) / 3
-                good_motion = MOTION_THRESHOLD * 0.6 < avg_motion < MOTION_THRESHOLD * 1.5
-                
-                return bool(hands_near_chin and good_motion)
-        
-        # Fallback to motion-only check
-        if len(motion_history) >= 3:
-            avg_motion = sum(motion_history[-3:]) / 3
-            return bool(MOTION_THRESHOLD * 0.5 < avg_motion < MOTION_THRESHOLD * 1.5)
-    
-    elif predicted_sign == 'iloveyou':
-        # For "iloveyou" we expect extended thumb, index, and pinky - static pose
-        if len(motion_history) >= 3:
-            avg_motion = sum(motion_history[-3:]) / 3
-            
-            # Low motion threshold for this static sign
-            low_motion = avg_motion < MOTION_THRESHOLD * 0.5
-            
-            # Check for proper hand configuration - specific to "iloveyou" sign
-            proper_hand_config = False
-            
-            # Check if we have hand landmarks to verify
-            if current_results and (current_results.left_hand_landmarks or current_results.right_hand_landmarks):
-                # Preferably check right hand first, then left
-                hand_landmarks = current_results.right_hand_landmarks or current_results.left_hand_landmarks
-                
-                # Check for "I love you" sign configuration
-                if hand_landmarks:
-                    landmarks = hand_landmarks.landmark
-                    if len(landmarks) >= 21:
-                        # Check specific finger extensions for the ILY sign
-                        thumb_tip = landmarks[4]   # Thumb tip
-                        index_tip = landmarks[8]   # Index finger tip
-                        middle_tip = landmarks[12] # Middle finger tip
-                        ring_tip = landmarks[16]   # Ring finger tip
-                        pinky_tip = landmarks[20]  # Pinky tip
-                        wrist = landmarks[0]       # Wrist reference
-                        
-                        # Critical finger positions for ILY sign
-                        thumb_extended = thumb_tip.y < wrist.y - 0.05  # Thumb must be clearly extended upward
-                        index_extended = index_tip.y < wrist.y - 0.1   # Index must be clearly extended upward
-                        middle_curled = middle_tip.y > index_tip.y + 0.05  # Middle must be clearly curled
-                        ring_curled = ring_tip.y > index_tip.y + 0.05      # Ring must be clearly curled
-                        pinky_extended = pinky_tip.y < ring_tip.y - 0.08  # Pinky must be clearly extended
-                        
-                        # All conditions must be met for a proper hand configuration
-                        proper_hand_config = (thumb_extended and 
-                                             index_extended and 
-                                             middle_curled and 
-                                             ring_curled and 
-                                             pinky_extended)
-                            
-            # Need BOTH low motion AND proper hand configuration for "iloveyou"
-            return bool(low_motion and proper_hand_config)
-    
-    # Default handling for sign types
-    if sign_type == 'static':
-        # For generic static signs, we want hands to be stable with minimal motion
-        if len(motion_history) >= 2:
-            avg_motion = sum(motion_history[-2:]) / 2
-            return bool(avg_motion < MOTION_THRESHOLD * 1.5)
-        return True
-    
-    elif sign_type == 'dynamic':
-        # For generic dynamic signs, we expect some motion
-        if len(motion_history) >= 2:
-            avg_motion = sum(motion_history[-2:]) / 2
-            return bool(avg_motion > MOTION_THRESHOLD * 0.5)
-        return True
-    
-    return True
+# Windows whose last frame arrived longer ago than this are dropped instead of predicted on
+PREDICTION_DEADLINE = float(os.environ.get('PREDICTION_DEADLINE_MS', '500')) / 1000
+
+# Run Holistic on a crop around each client's signer instead of the whole frame (ROI_TRACKING=0 to disable)
+ROI_TRACKING = os.environ.get('ROI_TRACKING', '1') == '1'
+roi_trackers = {}
+
+# The detector tracks landmarks from one frame to the next, which only holds while it keeps
+# seeing the same client and crop; it is reset when either changes, and used by one request at a time
+detector_lock = threading.Lock()
+detector_input = None
+
+# Set DECODE_REDUCTION to 2, 4 or 8 to decode frames at that fraction of their size
+DECODE_REDUCTION = int(os.environ.get('DECODE_REDUCTION', '1'))
+
+# Each /predict response tells the page how long to wait before its next frame:
+# MIN_FRAME_INTERVAL_MS while signing, longer while the hands are still or out of
+# view, and longer when the server is overloaded, though never more than
+# MAX_SIGNING_FRAME_INTERVAL_MS while signing (FRAME_PACING=0 to always ask for
+# MIN_FRAME_INTERVAL_MS)
+MIN_FRAME_INTERVAL_MS = int(os.environ.get('MIN_FRAME_INTERVAL_MS', '50'))
+frame_pacer = None
+if os.environ.get('FRAME_PACING', '1') == '1':
+    frame_pacer = FramePacer(
+        min_interval_ms=MIN_FRAME_INTERVAL_MS,
+        idle_interval_ms=int(os.environ.get('IDLE_FRAME_INTERVAL_MS', '150')),
+        absent_interval_ms=int(os.environ.get('ABSENT_FRAME_INTERVAL_MS', '500')),
+        max_interval_ms=int(os.environ.get('MAX_FRAME_INTERVAL_MS', '1000')),
+        max_signing_interval_ms=int(os.environ.get('MAX_SIGNING_FRAME_INTERVAL_MS', '75'))
+    )
+
+# Metrics served on /metrics; /predict also reports its stages in a Server-Timing header
+PREDICT_STAGE_SECONDS = histogram('predict_stage_seconds', "Time spent in each stage of /predict", ('stage',))
+PREDICT_SECONDS = histogram('predict_seconds', "Total time to answer /predict")
+PREDICT_REQUESTS = counter('predict_requests_total', "/predict requests by outcome", ('outcome',))
+WORKER_STAGE_SECONDS = histogram('prediction_worker_stage_seconds',
+                                 "Queue wait, model and post-processing time of each prediction", ('stage',))
+WORKER_BUSY_SECONDS = counter('prediction_worker_busy_seconds_total', "Time the prediction worker spent predicting")
+PREDICTIONS = counter('predictions_total', "Predictions made by the worker, by outcome", ('outcome',))
+FRAME_TO_PREDICTION_SECONDS = histogram('frame_to_prediction_seconds',
+                                        "Time from a window's last frame arriving to its prediction being stored")
+SIGNS_EMITTED = counter('signs_emitted_total', "Signs added to sentences by the sign decoder", ('sign',))
+SENTENCE_NOTIFICATIONS = counter('sentence_notifications_total',
+                                 "Sentence updates sent to the conversation service, by outcome", ('outcome',))
+gauge('prediction_queue_depth', "Windows waiting for the prediction worker", function=prediction_queue.qsize)
+gauge('active_sessions', "Clients with a sequence buffer", function=lambda: len(sequence_buffer))
+TARGET_FRAME_INTERVAL_SECONDS = histogram('target_frame_interval_seconds',
+                                          "Frame interval asked of clients in /predict responses",
+                                          buckets=(0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 0.75, 1.0))
+if frame_pacer:
+    gauge('frame_pacing_load_factor', "Factor all clients are slowed down by because of server load",
+          function=lambda: frame_pacer.load_factor)
 
 def prediction_worker():
     while True:
         try:
-            client_id, sequence, current_results, previous_results, motion_history = prediction_queue.get()
-            if sequence is None:
+            (client_id, frames, geometry, motion_history,
+             frame_seq, frame_time, queued_at) = prediction_queue.get()
+            if frames is None:
                 break
             
-            # Make prediction
-            prediction = model.predict(sequence, verbose=0)
-            scores = prediction[0]
-            
-            # Get the raw prediction first - before applying any weights
-            raw_max_score = float(np.max(scores))
-            raw_predicted_idx = int(np.argmax(scores))
-            raw_predicted_action = actions[raw_predicted_idx]
-            
-            # Add stricter validation for the iloveyou sign
-            # Only apply weight adjustments if the confidence isn't extremely high already
-            if raw_predicted_action == 'iloveyou' and raw_max_score < 0.95:
-                # Check if there's enough finger visibility for iloveyou sign
-                has_sufficient_fingers = False
-                
-                if current_results.right_hand_landmarks:
-                    # For "iloveyou" sign, typically the pinky, index and thumb should be extended
-                    # Check visibility and position of these key landmarks
-                    landmarks = current_results.right_hand_landmarks.landmark
-                    
-                    # More strict verification of finger positions
-                    if len(landmarks) >= 21:  # Make sure we have enough landmarks
-                        # Check positions of thumb tip, index tip, and pinky tip relative to palm
-                        thumb_tip = landmarks[4]    # Thumb tip
-                        index_tip = landmarks[8]    # Index finger tip
-                        middle_tip = landmarks[12]  # Middle finger tip
-                        ring_tip = landmarks[16]    # Ring finger tip
-                        pinky_tip = landmarks[20]   # Pinky tip
-                        wrist = landmarks[0]        # Wrist/palm center
-                        
-                        # Much stricter check for proper finger configuration
-                        if (index_tip.y < wrist.y - 0.1 and      # Index clearly extended up
-                            pinky_tip.y < wrist.y - 0.08 and     # Pinky clearly extended up
-                            abs(thumb_tip.x - wrist.x) > 0.08 and # Thumb clearly extended to side
-                            middle_tip.y > index_tip.y + 0.05 and # Middle clearly curled
-                            ring_tip.y > index_tip.y + 0.05):     # Ring clearly curled
-                            has_sufficient_fingers = True
-                
-                # If we don't have proper finger configuration, reduce the weight further
-                if not has_sufficient_fingers:
-                    SIGN_WEIGHTS['iloveyou'] = 0.7  # Much lower weight if fingers don't match
-                else:
-                    SIGN_WEIGHTS['iloveyou'] = 0.85  # Regular reduced weight with good finger config
-            
-            # Apply weights to balance sign detection
-            weighted_scores = scores.copy()
-            for i, action in enumerate(actions):
-                weighted_scores[i] *= SIGN_WEIGHTS.get(action, 1.0)
+            start = time.perf_counter()
+            WORKER_STAGE_SECONDS.observe(start - queued_at, stage='queue_wait')
             
-            # Get top prediction
-            max_score = float(np.max(weighted_scores))
-            predicted_idx = int(np.argmax(weighted_scores))
-            predicted_action = actions[predicted_idx]
+            # A window this old would only overwrite the prediction with an outdated one;
+            # a newer window from the same client is already queued behind it
+            if start - frame_time > PREDICTION_DEADLINE:
+                PREDICTIONS.inc(outcome='stale')
+                continue
             
-            # Add extra validation for "iloveyou" sign to prevent over-detection
-            if predicted_action == 'iloveyou':
-                # If the raw score for "iloveyou" is very close to other signs, be more skeptical
-                if raw_predicted_action != 'iloveyou' and raw_max_score > 0.65:  # Lower threshold to reject more easily
-                    # Use raw prediction instead
-                    predicted_action = raw_predicted_action
-                    predicted_idx = raw_predicted_idx
-                    max_score = raw_max_score
-                
-                # Require higher confidence threshold for iloveyou
-                if max_score < CONFIDENCE_THRESHOLD * 1.25:  # Even higher confidence needed (25% more)
-                    # Reduce confidence even more
-                    max_score *= 0.8  # Further reduce confidence for borderline cases
+            # The client left while its window was waiting
+            buffer = sequence_buffer.get(client_id)
+            if buffer is None:
+                PREDICTIONS.inc(outcome='disconnected')
+                continue
             
-            # Add protection against invalid predictions
-            if predicted_idx >= len(actions):
-                logger.error(f"Invalid prediction index: {predicted_idx}, max allowed: {len(actions)-1}")
-                # Fall back to highest unweighted score
-                predicted_idx = int(np.argmax(scores))
-                predicted_action = actions[predicted_idx]
-                max_score = float(scores[predicted_idx])
-            
-            # Check if the predicted sign is valid based on its type (static vs dynamic)
-            is_valid_sign = check_sign_validity(predicted_action, current_results, previous_results, motion_history)
-            
-            # Add extra validation for "iloveyou" - require near stillness
-            if predicted_action == 'iloveyou' and is_valid_sign:
-                # If there's too much movement, it's probably not a static sign
-                recent_motion = sum(motion_history[-3:]) / 3 if len(motion_history) >= 3 else 0
-                if recent_motion > MOTION_THRESHOLD * 0.5:  # Even stricter motion threshold (reduced from 0.8)
-                    is_valid_sign = False
-            
-            # Adjust confidence for invalid signs
-            if not is_valid_sign:
-                max_score *= 0.65  # Further reduce confidence for invalid signs (from 0.7)
-            
-            # Convert NumPy types to Python types to avoid serialization issues
-            max_score = float(max_score)
-            is_valid_sign = bool(is_valid_sign)
+            # Make prediction
+            sequence = assemble_window(frames)
+            prediction = model.predict(sequence, verbose=0)
+            scores = prediction[0]
+            predicted_at = time.perf_counter()
+            WORKER_STAGE_SECONDS.observe(predicted_at - start, stage='model')
             
-            # Store the original scores for confidence display
-            display_max_score = float(np.max(scores))
+            # Weight, gate and validate the raw scores
+            predicted_action, display_max_score, scores_list, is_valid_sign = postprocess_prediction(
+                scores, geometry, motion_history)
             
-            # Copy scores to a regular Python list to avoid NumPy serialization issues
-            scores_list = [float(s) for s in scores]
+            # Store the prediction with Python native types (not NumPy types), and the frame it is based on
+            buffer['last_prediction'] = (predicted_action, display_max_score, scores_list, is_valid_sign)
+            buffer['last_prediction_frame'] = (frame_seq, frame_time)
             
-            # Store the prediction with Python native types (not NumPy types)
-            sequence_buffer[client_id]['last_prediction'] = (predicted_action, display_max_score, scores_list, is_valid_sign)
+            finished_at = time.perf_counter()
+            WORKER_STAGE_SECONDS.observe(finished_at - predicted_at, stage='postprocess')
+            FRAME_TO_PREDICTION_SECONDS.observe(finished_at - frame_time)
+            WORKER_BUSY_SECONDS.inc(finished_at - start)
+            if frame_pacer:
+                frame_pacer.observe_prediction(finished_at - start)
+            PREDICTIONS.inc(outcome='valid' if is_valid_sign else 'invalid')
             
         except Exception as e:
+            PREDICTIONS.inc(outcome='error')
             logger.error(f"Error in prediction worker: {str(e)}")
             import traceback
             logger.error(f"Detailed error: {traceback.format_exc()}")
         finally:
             prediction_queue.task_done()
 
-# Start prediction worker thread
-prediction_thread = threading.Thread(target=prediction_worker, daemon=True)
-prediction_thread.start()
+@startup.phase('worker', after=('model_warmup',))
+def start_prediction_worker():
+    global prediction_thread
+    prediction_thread = threading.Thread(target=prediction_worker, daemon=True)
+    prediction_thread.start()
+
+@app.before_request
+def start_services():
+    """Start up on the first request when the app is served without running this module, e.g. by a WSGI server"""
+    startup.start()
 
 # Define a function to notify sign_conversation.py of sentence updates
 def notify_conversation_service(client_id, sentence):
@@ -444,8 +275,10 @@ def notify_conversation_service(client_id, sentence):
             requests.post("http://localhost:5001/api/sentence_update", 
                          json={"clientId": client_id, "sentence": sentence},
                          timeout=0.5)  # Short timeout to avoid blocking
+            SENTENCE_NOTIFICATIONS.inc(outcome='sent')
     except Exception as e:
         # Don't let notification failures affect the main app
+        SENTENCE_NOTIFICATIONS.inc(outcome='failed')
         logger.warning(f"Failed to notify conversation service: {str(e)}")
 
 # Add function to send sentence to Gemini instead of Ollama
@@ -526,178 +359,119 @@ def tagalog():
 
 @app.route('/predict', methods=['POST'])
 def predict():
+    global detector_input
+    if not startup.ready:
+        # Ask the client to come back later rather than queue frames nothing can process yet
+        response = jsonify({
+            'error': 'Sign recognition service failed to start' if startup.failed else 'Sign recognition service is starting',
+            'ready': False,
+            'target_frame_interval_ms': 1000,
+            'success': False
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    timer = StageTimer(PREDICT_STAGE_SECONDS)
     try:
         # Get the image data from the request
         data = request.json
-        image_data = data['image'].split(',')[1]
-        image_bytes = base64.b64decode(image_data)
+        image_prefix, image_bytes = decode_data_url(data['image'])
         client_id = data.get('clientId', 'default')
         language = data.get('language', 'english')
+        timer.mark('decode')
+        
+        if session_recorder:
+            session_recorder.record_frame(client_id, image_bytes, image_prefix, language,
+                                          {'userAgent': request.headers.get('User-Agent')})
+            timer.mark('record')
         
         # Initialize sequence buffer for new clients
         if client_id not in sequence_buffer:
             sequence_buffer[client_id] = init_client_buffer()
         
-        # Convert to numpy array
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        # Convert to RGB for MediaPipe
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Number the client's frames so predictions can say which frame they are based on
+        sequence_buffer[client_id]['frame_seq'] += 1
+        frame_seq = sequence_buffer[client_id]['frame_seq']
         
-        # Make detection
-        results = holistic.process(frame_rgb)
+        # Convert to numpy array
+        frame = decode_frame(image_bytes, DECODE_REDUCTION)
+        timer.mark('imdecode')
         
-        # Get previous results for motion calculation
-        previous_results = sequence_buffer[client_id].get('previous_results')
+        # Crop to the signer found in the previous frame, and convert to RGB for MediaPipe
+        roi_tracker = roi_trackers.setdefault(client_id, RoiTracker()) if ROI_TRACKING else None
+        roi = roi_tracker.next_roi() if roi_tracker else None
+        frame_rgb = to_rgb(crop(frame, roi))
+        timer.mark('cvtcolor')
         
-        # Calculate hand motion if both current and previous frames have hands
-        motion_value = 0
-        if previous_results and results:
-            left_motion = calculate_hand_motion(results.left_hand_landmarks, previous_results.left_hand_landmarks) if results.left_hand_landmarks and previous_results.left_hand_landmarks else 0
-            right_motion = calculate_hand_motion(results.right_hand_landmarks, previous_results.right_hand_landmarks) if results.right_hand_landmarks and previous_results.right_hand_landmarks else 0
-            motion_value = max(left_motion, right_motion)
-            
-        # Store motion value in history
-        sequence_buffer[client_id]['motion_history'].append(motion_value)
-        
-        # Store current results for next frame
-        sequence_buffer[client_id]['previous_results'] = results
+        # Make detection, with landmarks in full-frame coordinates whatever the crop
+        with detector_lock:
+            if detector_input is not None and detector_input != (client_id, roi):
+                detector.reset()
+            detector_input = (client_id, roi)
+            results = detector.process(frame_rgb)
+        map_landmarks_to_frame(results, roi, frame.shape)
+        if roi_tracker:
+            roi_tracker.update(results, frame.shape)
+        timer.mark('detect')
         
         # Check if hands are present - use a much more lenient check
         hands_present = has_hands(results)
         
         # Extract keypoints
-        keypoints = extract_keypoints(results)
+        keypoints = extract_keypoints(results, KEYPOINT_LAYOUT)
         if keypoints is None:
+            PREDICT_REQUESTS.inc(outcome='no_keypoints')
             return jsonify({
                 'error': 'Failed to extract keypoints',
                 'success': False
             }), 400
         
+        # Hand geometry for the motion history and the sign rules, with the
+        # motion measured against the previous frame's geometry
+        geometry = FrameGeometry(keypoints, KEYPOINT_LAYOUT, sequence_buffer[client_id]['previous_geometry'])
+        sequence_buffer[client_id]['motion_history'].append(geometry.motion)
+        sequence_buffer[client_id]['previous_geometry'] = geometry
+        
+        # Track empty frames (no hands) - but be more lenient
+        if track_hands(sequence_buffer[client_id], hands_present):
+            sign_decoder.reset(client_id)
+        
+        # Start the window over from its last few frames if the signer picks up after frames were sent at an idle pace
+        if frame_pacer:
+            frame_pacer.restart_window(client_id, sequence_buffer[client_id])
+        
         # Add keypoints to sequence buffer
         sequence_buffer[client_id]['frames'].append(keypoints)
         
         # Get current prediction
         predicted_action, max_score, scores, is_valid_sign = sequence_buffer[client_id]['last_prediction']
-        
-        # Track empty frames (no hands) - but be more lenient
-        if not hands_present:
-            sequence_buffer[client_id]['empty_frame_counter'] += 1
-        else:
-            sequence_buffer[client_id]['empty_frame_counter'] = 0
-            
-        # Reset if too many empty frames - increased from 5 to be more lenient
-        if sequence_buffer[client_id]['empty_frame_counter'] > MAX_EMPTY_FRAMES * 2:
-            sequence_buffer[client_id]['predictions'].clear()
-            sequence_buffer[client_id]['current_action'] = None
-            sequence_buffer[client_id]['current_action_start_time'] = None
-            sequence_buffer[client_id]['consecutive_predictions'] = 0
+        prediction_frame = sequence_buffer[client_id]['last_prediction_frame']
+        timer.mark('keypoints')
             
         # If we have enough frames, queue a new prediction
         if len(sequence_buffer[client_id]['frames']) == 30:
-            sequence = np.array(list(sequence_buffer[client_id]['frames']))
-            sequence = np.expand_dims(sequence, axis=0)
-            
-            # Always make predictions, even if hands might not be perfectly detected
+            # Always make predictions, even if hands might not be perfectly detected.
+            # The queue gets references to the window's keypoint vectors, which are
+            # never modified; the worker stacks them only if the window isn't stale.
             prediction_queue.put((
                 client_id, 
-                sequence, 
-                results, 
-                previous_results, 
-                list(sequence_buffer[client_id]['motion_history'])
+                tuple(sequence_buffer[client_id]['frames']), 
+                geometry, 
+                list(sequence_buffer[client_id]['motion_history']),
+                frame_seq,
+                timer.start,
+                time.perf_counter()
             ))
             
-            # Add prediction to buffer
+            # Feed each new prediction's weighted and gated scores to the sign decoder once, timed by the frame it was made from
             if scores is not None:
-                # Still consider all predictions, even if sign validation is uncertain
-                sequence_buffer[client_id]['predictions'].append(np.argmax(scores))
-                
-                # Check for high confidence predictions
-                if max_score >= HIGH_CONFIDENCE_THRESHOLD:
-                    current_action = predicted_action
-                    
-                    # Check cooldown for "iloveyou" sign to prevent rapid repeated detection
-                    current_time = time.time()
-                    if current_action == 'iloveyou':
-                        last_iloveyou_time = sequence_buffer[client_id]['last_iloveyou_time']
-                        cooldown_period = sequence_buffer[client_id]['iloveyou_cooldown']
-                        
-                        # If we're still in cooldown, don't allow another "iloveyou" detection
-                        if current_time - last_iloveyou_time < cooldown_period:
-                            # Skip this detection
-                            current_action = None
-                        else:
-                            # Update the last detection time
-                            sequence_buffer[client_id]['last_iloveyou_time'] = current_time
-                    
-                    # Only add to sentence if it's valid and not in cooldown
-                    if current_action and (len(sequence_buffer[client_id]['sentence']) == 0 or 
-                        current_action != sequence_buffer[client_id]['sentence'][-1]):
-                        sequence_buffer[client_id]['sentence'].append(current_action)
-                        sequence_buffer[client_id]['last_action'] = current_action
-                        # Reset tracking for next prediction
-                        sequence_buffer[client_id]['current_action'] = None
-                        sequence_buffer[client_id]['consecutive_predictions'] = 0
-                        
+                if prediction_frame is not None and prediction_frame != sequence_buffer[client_id]['decoded_frame']:
+                    sequence_buffer[client_id]['decoded_frame'] = prediction_frame
+                    event = sign_decoder.step(client_id, scores, prediction_frame[1])
+                    sequence_buffer[client_id]['current_action'] = sign_decoder.held_sign(client_id)
+                    if event and add_to_sentence(sequence_buffer[client_id], event.sign):
+                        SIGNS_EMITTED.inc(sign=event.sign)
                         # Notify conversation service of updated sentence
                         notify_conversation_service(client_id, list(sequence_buffer[client_id]['sentence']))
-                        
-                # Check if we have consistent predictions
-                elif len(sequence_buffer[client_id]['predictions']) >= 3:  # Reduced from 5 for even faster detection
-                    # Use a majority vote from recent predictions
-                    recent_preds = list(sequence_buffer[client_id]['predictions'])[-3:]
-                    unique_preds, counts = np.unique(recent_preds, return_counts=True)
-                    majority_idx = np.argmax(counts)
-                    majority_prediction = unique_preds[majority_idx]
-                    majority_count = counts[majority_idx]
-                    
-                    # If we have a majority and confidence is high enough - be more lenient
-                    if majority_count >= 2 and max_score > CONFIDENCE_THRESHOLD * 0.9:  # Reduced threshold
-                        current_action = actions[majority_prediction]
-                        current_time = time.time()
-                        
-                        # Check cooldown for "iloveyou" sign
-                        if current_action == 'iloveyou':
-                            last_iloveyou_time = sequence_buffer[client_id]['last_iloveyou_time']
-                            cooldown_period = sequence_buffer[client_id]['iloveyou_cooldown']
-                            
-                            # If we're still in cooldown, don't allow another "iloveyou" detection
-                            if current_time - last_iloveyou_time < cooldown_period:
-                                # Skip this detection
-                                current_action = None
-                        
-                        # Only proceed if we have a valid action after cooldown check
-                        if current_action:
-                            # Initialize or update prediction tracking
-                            if sequence_buffer[client_id]['current_action'] != current_action:
-                                sequence_buffer[client_id]['consecutive_predictions'] = 1
-                                sequence_buffer[client_id]['current_action'] = current_action
-                                sequence_buffer[client_id]['current_action_start_time'] = current_time
-                            else:
-                                sequence_buffer[client_id]['consecutive_predictions'] += 1
-                                
-                                # Only update the sentence if we have enough consecutive predictions
-                                # and enough time has passed (less strict now)
-                                if (sequence_buffer[client_id]['consecutive_predictions'] >= MIN_CONSECUTIVE_PREDICTIONS - 1 and
-                                    current_time - sequence_buffer[client_id]['current_action_start_time'] >= MIN_PREDICTION_TIME * 0.8):
-                                    
-                                    # Add to sentence if it's a new sign or different from the last one
-                                    if (len(sequence_buffer[client_id]['sentence']) == 0 or 
-                                        current_action != sequence_buffer[client_id]['sentence'][-1]):
-                                        
-                                        # For "iloveyou", update the last detection time
-                                        if current_action == 'iloveyou':
-                                            sequence_buffer[client_id]['last_iloveyou_time'] = current_time
-                                            
-                                        sequence_buffer[client_id]['sentence'].append(current_action)
-                                        sequence_buffer[client_id]['last_action'] = current_action
-                                        # Reset for next prediction
-                                        sequence_buffer[client_id]['current_action'] = None
-                                        sequence_buffer[client_id]['consecutive_predictions'] = 0
-                                        
-                                        # Notify conversation service of updated sentence
-                                        notify_conversation_service(client_id, list(sequence_buffer[client_id]['sentence']))
             
             # Handle case when hands might not be perfectly detected but we're still getting predictions
             elif not hands_present and sequence_buffer[client_id]['empty_frame_counter'] > MAX_EMPTY_FRAMES * 2:
@@ -705,29 +479,19 @@ def predict():
                 predicted_action = 'Waiting for hands...'
                 max_score = 0.0
                 is_valid_sign = False
+                prediction_frame = None
                 sequence_buffer[client_id]['last_prediction'] = (predicted_action, max_score, None, is_valid_sign)
+                sequence_buffer[client_id]['last_prediction_frame'] = None
+        timer.mark('sentence')
         
-        # Add prediction text and background for better visibility
-        cv2.rectangle(frame, (0,0), (frame.shape[1], 40), (245, 117, 16), -1)
-        sentence_text = ' '.join(sequence_buffer[client_id]['sentence'])
-        cv2.putText(frame, sentence_text, (3,30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2, cv2.LINE_AA)
-        
-        # Add prediction and confidence
-        prediction_text = f"{predicted_action} ({max_score:.2f})"
-        color = (0, 255, 0) if is_valid_sign else (0, 165, 255)  # Green if valid, orange if not
-        cv2.putText(frame, prediction_text, (frame.shape[1] - 250, 70), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-        
-        # Add motion indicator (for debugging)
+        # Add the sentence, prediction and motion indicator to the frame
         motion_value = 0 if not sequence_buffer[client_id]['motion_history'] else sequence_buffer[client_id]['motion_history'][-1]
-        motion_text = f"Motion: {motion_value:.4f}"
-        cv2.putText(frame, motion_text, (10, frame.shape[0] - 10), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        draw_overlay(frame, sequence_buffer[client_id]['sentence'], predicted_action, max_score, is_valid_sign, motion_value)
+        timer.mark('overlay')
         
         # Convert frame back to base64 with reduced quality
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
+        frame_data_url = encode_frame(frame, quality=80)
+        timer.mark('imencode')
         
         # Format response depending on language
         display_prediction = predicted_action
@@ -744,18 +508,44 @@ def predict():
         # Fix the NumPy bool_ serialization issue - convert to Python bool
         is_valid_sign_python = bool(is_valid_sign)
         
+        if session_recorder:
+            session_recorder.record_sentence(client_id, display_sentence)
+        
+        # How long the page should wait before sending the next frame
+        target_frame_interval = MIN_FRAME_INTERVAL_MS
+        if frame_pacer:
+            target_frame_interval = frame_pacer.target_interval(client_id, sequence_buffer[client_id],
+                                                                prediction_queue.qsize())
+        TARGET_FRAME_INTERVAL_SECONDS.observe(target_frame_interval / 1000)
+        
         # Return response with converted Python values instead of NumPy types
-        return jsonify({
+        response = jsonify({
             'prediction': display_prediction,
             'confidence': float(max_score),
-            'frame': f'data:image/jpeg;base64,{frame_base64}',
+            'frame': frame_data_url,
             'frames_collected': int(len(sequence_buffer[client_id]['frames'])),
             'sentence': display_sentence,
             'is_valid_sign': is_valid_sign_python,
+            'frame_id': frame_seq,
+            # The frame the prediction is based on and how long ago it arrived
+            'prediction_frame': prediction_frame[0] if prediction_frame else None,
+            'prediction_age_ms': round((time.perf_counter() - prediction_frame[1]) * 1000, 1) if prediction_frame else None,
+            'target_frame_interval_ms': target_frame_interval,
             'success': True
         })
+        timer.mark('respond')
+        
+        # Per-stage breakdown, readable by the page through the Resource Timing API
+        response.headers['Server-Timing'] = timer.server_timing()
+        response.headers['Timing-Allow-Origin'] = '*'
+        PREDICT_SECONDS.observe(timer.total())
+        PREDICT_REQUESTS.inc(outcome='success')
+        if frame_pacer:
+            frame_pacer.observe_request(timer.total())
+        return response
         
     except Exception as e:
+        PREDICT_REQUESTS.inc(outcome='error')
         logger.error(f"Error in predict endpoint: {str(e)}")
         # Give more detailed error information
         import traceback
@@ -787,6 +577,9 @@ def clear_sentence():
     client_id = request.json.get('clientId', 'default')
     if client_id in sequence_buffer:
         sequence_buffer[client_id]['sentence'].clear()
+        # Start decoding afresh too, so a sign held across the clear isn't added straight back
+        sign_decoder.remove(client_id)
+        sequence_buffer[client_id]['current_action'] = None
         # Notify conversation service of cleared sentence
         notify_conversation_service(client_id, [])
         return jsonify({
@@ -796,13 +589,60 @@ def clear_sentence():
         'success': False
     })
 
+@app.route('/disconnect', methods=['POST'])
+def disconnect():
+    """Drop everything kept for a client; the page sends this when it is closed or reloaded"""
+    # Sent with navigator.sendBeacon, so don't rely on the content type
+    data = request.get_json(force=True, silent=True) or {}
+    client_id = data.get('clientId', 'default')
+    sequence_buffer.pop(client_id, None)
+    roi_trackers.pop(client_id, None)
+    sign_decoder.remove(client_id)
+    if frame_pacer:
+        frame_pacer.forget(client_id)
+    return jsonify({
+        'success': True
+    })
+
 @app.route('/test', methods=['GET'])
 def test():
+    """Liveness: the server answers, whether or not startup has finished"""
     return jsonify({
         'status': 'Sign recognition service is running',
         'success': True
     })
 
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness: 200 once the model and MediaPipe are loaded and warmed up, else 503; both with the startup profile"""
+    profile = startup.profile()
+    return jsonify(profile), 200 if profile['ready'] else 503
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics for the recognition pipeline"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+# Converted models for the browser: tfjs_model and its variants (see tfjs_artifacts.py)
+MODEL_FILES_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR_NAME = re.compile(r'^tfjs_model(_\w+)?$')
+
+@app.route('/models/<model_dir>/<filename>', methods=['GET'])
+def model_file(model_dir, filename):
+    """
+    A tfjs model file with a strong ETag. Content-hashed weight shards are
+    cached for good; model.json is revalidated, which costs a 304 when unchanged.
+    """
+    path = os.path.join(MODEL_FILES_DIR, model_dir, filename)
+    if not MODEL_DIR_NAME.match(model_dir) or os.path.basename(filename) != filename or not os.path.isfile(path):
+        abort(404)
+    etag, data = read_model_file(path)
+    content_type = 'application/json' if filename.endswith('.json') else 'application/octet-stream'
+    response = Response(data, content_type=content_type)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control(filename)
+    return response.make_conditional(request)
+
 @app.route('/test_sign', methods=['POST'])
 def test_sign():
     """Test endpoint to simulate sign recognition for debugging"""
@@ -836,5 +676,10 @@ if __name__ == '__main__':
     print(f"Access the app at: http://127.0.0.1:{port}")
     print(f"{'='*50}\n")
     
+    # Load in the background while the server starts listening. With the reloader this
+    # module also runs in a watcher process that serves nothing, so only the server child starts up.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        startup.start()
+    
     # Run the app on the specified port - explicitly set host to 0.0.0.0
     app.run(debug=True, port=port, host='0.0.0.0', threaded=True) 
\ No newline at end of file
@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Benchmark offline against the stand-in client, without touching the on-disk cache
+os.environ.setdefault('TRANSLATE_BACKEND', 'local')
+os.environ.setdefault('TRANSLATE_CACHE_PATH', '')
+
+import translate_backend
+from translation_cache import TranslationCache
+
+# Phrases the app actually translates: sign words and Gemini replies
+COMMON_PHRASES = [
+    ("kamusta", 'tl', 'en'),
+    ("salamat", 'tl', 'en'),
+    ("mahal kita", 'tl', 'en'),
+    ("Hello there friend", 'en', 'tl'),
+    ("You are welcome", 'en', 'tl'),
+    ("I love you too", 'en', 'tl'),
+    ("Nice to meet you", 'en', 'tl'),
+    ("Happy to help you", 'en', 'tl'),
+    ("Thank you friend", 'en', 'tl'),
+    ("Hello there", 'en', 'tl')
+]
+
+def percentile(values, pct):
+    """Return the given percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def make_workload(count, unique_rate, seed):
+    """Draw phrases with a Zipf-like skew towards the common ones, plus some one-off texts"""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(COMMON_PHRASES))]
+    workload = []
+    for i in range(count):
+        if rng.random() < unique_rate:
+            workload.append((f"Reply number {i}", 'en', 'tl'))
+        else:
+            workload.append(rng.choices(COMMON_PHRASES, weights)[0])
+    return workload
+
+def reset(cache_size):
+    """Give the backend a fresh in-memory cache and zero the client counters"""
+    translate_backend.translation_cache = TranslationCache(max_entries=cache_size)
+    translate_backend.translate_client.calls = 0
+    translate_backend.translate_client.texts = 0
+
+def run_single(client, workload, concurrency):
+    """Send every text as its own /translate request"""
+    latencies = []
+
+    def send(item):
+        text, source, target = item
+        start = time.time()
+        response = client.post('/translate', json={'text': text, 'source': source, 'target': target})
+        assert response.status_code == 200, response.get_json()
+        latencies.append(time.time() - start)
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, workload))
+    return time.time() - start, latencies
+
+def run_batch(client, workload, batch_size):
+    """Send the texts in /translate_batch requests grouped by language pair"""
+    latencies = []
+    start = time.time()
+    for i in range(0, len(workload), batch_size):
+        groups = {}
+        for text, source, target in workload[i:i + batch_size]:
+            groups.setdefault((source, target), []).append(text)
+        for (source, target), texts in groups.items():
+            request_start = time.time()
+            response = client.post('/translate_batch', json={'texts': texts, 'source': source, 'target': target})
+            assert response.status_code == 200, response.get_json()
+            latencies.append(time.time() - request_start)
+    return time.time() - start, latencies
+
+def summarize(name, elapsed, latencies, texts):
+    """Collect the results of one benchmark mode"""
+    stats = translate_backend.translation_cache.info()
+    return {
+        'mode': name,
+        'texts': texts,
+        'elapsed_seconds': elapsed,
+        'texts_per_second': texts / elapsed if elapsed else None,
+        'request_p50': percentile(latencies, 50),
+        'request_p95': percentile(latencies, 95),
+        'upstream_calls': translate_backend.translate_client.calls,
+        'upstream_texts': translate_backend.translate_client.texts,
+        'cache_hit_rate': stats['hit_rate']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark translation caching and batching offline")
+    parser.add_argument('--texts', type=int, default=500, help="Number of texts to translate")
+    parser.add_argument('--unique-rate', type=float, default=0.1, help="Fraction of one-off texts that never repeat")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent /translate requests")
+    parser.add_argument('--batch-size', type=int, default=50, help="Texts per /translate_batch request")
+    parser.add_argument('--cache-size', type=int, default=2000, help="Translation cache entries")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the workload")
+    args = parser.parse_args()
+
+    workload = make_workload(args.texts, args.unique_rate, args.seed)
+    client = translate_backend.app.test_client()
+    results = []
+
+    reset(0)
+    results.append(summarize('single_uncached', *run_single(client, workload, args.concurrency), len(workload)))
+
+    reset(args.cache_size)
+    results.append(summarize('single_cached', *run_single(client, workload, args.concurrency), len(workload)))
+
+    reset(args.cache_size)
+    results.append(summarize('batch_cached', *run_batch(client, workload, args.batch_size), len(workload)))
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
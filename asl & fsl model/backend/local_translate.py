@@ -0,0 +1,69 @@
+import random
+import threading
+import time
+
+class LocalTranslateClient:
+    """
+    Offline stand-in for google.cloud.translate_v2.Client, for benchmarking.
+
+    translate() takes a string or a list of strings and returns a dict or a
+    list of dicts with 'translatedText', like the real client. Each call
+    costs a seeded per-request latency plus a small per-text cost, so the
+    savings from caching and batching show up in benchmarks.
+    """
+
+    PHRASES = {
+        ('tl', 'en'): {
+            'kamusta': "hello",
+            'salamat': "thank you",
+            'mahal kita': "I love you",
+            'kamusta salamat': "hello thank you"
+        },
+        ('en', 'tl'): {
+            'hello': "kamusta",
+            'thank you': "salamat",
+            'i love you': "mahal kita",
+            'hello there friend': "kamusta kaibigan",
+            'you are welcome': "walang anuman",
+            'i love you too': "mahal din kita",
+            'nice to meet you': "ikinagagalak kitang makilala",
+            'happy to help you': "masaya akong tulungan ka",
+            'thank you friend': "salamat kaibigan",
+            'hello there': "kamusta"
+        }
+    }
+
+    def __init__(self, request_latency=0.15, per_text_latency=0.005, jitter=0.3, seed=0):
+        """
+        Args:
+            request_latency: Median seconds per upstream request
+            per_text_latency: Extra seconds per text in a request
+            jitter: Log-space sigma of the request latency
+            seed: Seed for the latency draws
+        """
+        self.request_latency = request_latency
+        self.per_text_latency = per_text_latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.calls = 0
+        self.texts = 0
+
+    def _translate_one(self, text, source, target):
+        """Look the phrase up, or tag the text with the target language"""
+        phrases = self.PHRASES.get((source, target), {})
+        return phrases.get(text.strip().lower(), f"[{target}] {text}")
+
+    def translate(self, values, source_language='tl', target_language='en'):
+        single = isinstance(values, str)
+        texts = [values] if single else list(values)
+
+        with self.rng_lock:
+            self.calls += 1
+            self.texts += len(texts)
+            latency = self.request_latency * self.rng.lognormvariate(0, self.jitter)
+        time.sleep(latency + self.per_text_latency * len(texts))
+
+        results = [{'translatedText': self._translate_one(text, source_language, target_language), 'input': text}
+                   for text in texts]
+        return results[0] if single else results
@@ -1,16 +1,78 @@
-from flask import Flask, request, jsonify
-from google.cloud import translate_v2 as translate
+from flask import Flask, request, jsonify, Response
+import atexit
 import os
+import threading
+import time
 from flask_cors import CORS
+from translation_cache import TranslationCache
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
-# Set the path to your service account JSON file
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "./starlit-rite-452918-k8-ff712369ea61.json"
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Initialize the Google Translate client
-translate_client = translate.Client()
+# 'google' uses Google Translate, 'local' an offline stand-in for benchmarks
+TRANSLATE_BACKEND = os.environ.get('TRANSLATE_BACKEND', 'google')
+
+if TRANSLATE_BACKEND == 'local':
+    from local_translate import LocalTranslateClient
+    translate_client = LocalTranslateClient()
+else:
+    from google.cloud import translate_v2 as translate
+
+    # Set the path to your service account JSON file
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "./starlit-rite-452918-k8-ff712369ea61.json"
+
+    # Initialize the Google Translate client
+    translate_client = translate.Client()
+
+# Translations of the same short phrases are reused across requests and restarts.
+# Only Google's are saved to disk: the local stand-in's "[tl] ..." output is kept in
+# memory, so it never ends up in the file a later run with real translations loads.
+translation_cache = TranslationCache(
+    max_entries=int(os.environ.get('TRANSLATE_CACHE_SIZE', '2000')),
+    path=(os.environ.get('TRANSLATE_CACHE_PATH', os.path.join(BACKEND_DIR, 'translation_cache.json')) or None
+          if TRANSLATE_BACKEND == 'google' else None)
+)
+atexit.register(translation_cache.save)
+
+# Counts served on /metrics: (route, outcome) -> requests, and calls to the translation client
+request_counts = {}
+upstream_stats = {'calls': 0, 'texts': 0, 'seconds': 0.0}
+stats_lock = threading.Lock()
+
+def count_request(route, outcome):
+    with stats_lock:
+        request_counts[(route, outcome)] = request_counts.get((route, outcome), 0) + 1
+
+def translate_many(texts, source, target):
+    """
+    Translate a list of texts, answering from the cache where possible and
+    sending all the misses to the translation client in one request.
+
+    Returns:
+        tuple: (list of translations in the same order as texts, number of cache hits)
+    """
+    translations = [translation_cache.get(text, source, target) for text in texts]
+    hits = sum(1 for translation in translations if translation is not None)
+
+    # Each distinct missing text is translated once, even if it appears several times
+    misses = list(dict.fromkeys(text for text, translation in zip(texts, translations) if translation is None))
+    if misses:
+        start = time.perf_counter()
+        results = translate_client.translate(misses, source_language=source, target_language=target)
+        with stats_lock:
+            upstream_stats['calls'] += 1
+            upstream_stats['texts'] += len(misses)
+            upstream_stats['seconds'] += time.perf_counter() - start
+        translated = {}
+        for text, result in zip(misses, results):
+            translated[text] = result['translatedText']
+            translation_cache.put(text, source, target, result['translatedText'])
+        translations = [translation if translation is not None else translated[text]
+                        for text, translation in zip(texts, translations)]
+
+    return translations, hits
 
 @app.route('/translate', methods=['POST'])
 def translate_text():
@@ -18,23 +80,74 @@ def translate_text():
     text = data.get('text')
     source = data.get('source', 'tl')
     target = data.get('target', 'en')
-    
+
     if not text:
+        count_request('translate', 'invalid')
         return jsonify({'error': 'No text provided'}), 400
 
     try:
-        result = translate_client.translate(text, source_language=source, target_language=target)
-        print(f"Translated '{text}' from {source} to {target}: {result['translatedText']}")
-        return jsonify({'translatedText': result['translatedText']})
+        translations, hits = translate_many([text], source, target)
+        print(f"Translated '{text}' from {source} to {target}: {translations[0]}{' (cached)' if hits else ''}")
+        count_request('translate', 'success')
+        return jsonify({'translatedText': translations[0]})
+    except Exception as e:
+        print(f"Translation error: {str(e)}")
+        count_request('translate', 'error')
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/translate_batch', methods=['POST'])
+def translate_batch():
+    data = request.json
+    texts = data.get('texts')
+    source = data.get('source', 'tl')
+    target = data.get('target', 'en')
+
+    if not isinstance(texts, list) or not texts or not all(isinstance(text, str) and text for text in texts):
+        count_request('translate_batch', 'invalid')
+        return jsonify({'error': 'texts must be a non-empty list of strings'}), 400
+
+    try:
+        translations, hits = translate_many(texts, source, target)
+        print(f"Translated {len(texts)} texts from {source} to {target} ({hits} cached)")
+        count_request('translate_batch', 'success')
+        return jsonify({'translations': translations, 'cached': hits})
     except Exception as e:
         print(f"Translation error: {str(e)}")
+        count_request('translate_batch', 'error')
         return jsonify({'error': str(e)}), 500
 
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    return jsonify(translation_cache.info())
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Request, translation client and cache counters in the Prometheus text format"""
+    cache = translation_cache.info()
+    with stats_lock:
+        counts = sorted(request_counts.items())
+        upstream = dict(upstream_stats)
+
+    lines = ['# HELP translate_requests_total Translation requests by route and outcome',
+             '# TYPE translate_requests_total counter']
+    lines += [f'translate_requests_total{{route="{route}",outcome="{outcome}"}} {count}'
+              for (route, outcome), count in counts]
+    for name, kind, help_text, value in [
+        ('translate_upstream_calls_total', 'counter', 'Requests sent to the translation client', upstream['calls']),
+        ('translate_upstream_texts_total', 'counter', 'Texts sent to the translation client', upstream['texts']),
+        ('translate_upstream_seconds_total', 'counter', 'Time spent waiting for the translation client', upstream['seconds']),
+        ('translate_cache_hits_total', 'counter', 'Translations answered from the cache', cache['hits']),
+        ('translate_cache_misses_total', 'counter', 'Translations missing from the cache', cache['misses']),
+        ('translate_cache_entries', 'gauge', 'Translations held in the cache', cache['size'])
+    ]:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}']
+    return Response('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/test', methods=['GET'])
 def test():
-    return jsonify({'status': 'Backend is running'})
+    return jsonify({'status': 'Backend is running', 'backend': TRANSLATE_BACKEND})
 
 if __name__ == '__main__':
     print("Starting translation backend on http://localhost:5000")
     print("Service account file: starlit-rite-452918-k8-ff712369ea61.json")
-    app.run(port=5000, debug=True) 
\ No newline at end of file
+    app.run(port=5000, debug=True)
@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+class TranslationCache:
+    """
+    Size-bounded LRU cache of translations keyed on (text, source, target).
+
+    The cache is loaded from and saved to a JSON file so translations survive
+    restarts. Entries are written in least to most recently used order, so
+    the LRU order is kept across restarts too.
+    """
+
+    def __init__(self, max_entries=2000, path=None, save_every=50):
+        """
+        Args:
+            max_entries: Entries kept before the least recently used are evicted (0 disables caching)
+            path: JSON file to persist the cache to, or None to keep it in memory only
+            save_every: Save to disk after this many new entries
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.save_every = save_every
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.unsaved = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self.load()
+
+    def get(self, text, source, target):
+        """Return the cached translation, or None"""
+        key = (text, source, target)
+        with self.lock:
+            translation = self.entries.get(key)
+            if translation is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return translation
+
+    def put(self, text, source, target, translation):
+        """Store a translation, evicting the least recently used entries if full"""
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            self.entries[(text, source, target)] = translation
+            self.entries.move_to_end((text, source, target))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+            self.unsaved += 1
+            should_save = self.path and self.unsaved >= self.save_every
+        if should_save:
+            self.save()
+
+    def load(self):
+        """Load entries saved by an earlier run, ignoring a missing or unreadable file"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load translation cache from {self.path}: {str(e)}")
+            return
+
+        with self.lock:
+            for text, source, target, translation in saved[-self.max_entries:] if self.max_entries > 0 else []:
+                self.entries[(text, source, target)] = translation
+        print(f"Loaded {len(self.entries)} cached translations from {self.path}")
+
+    def save(self):
+        """Write the cache to disk atomically"""
+        if not self.path:
+            return
+        with self.lock:
+            saved = [[text, source, target, translation]
+                     for (text, source, target), translation in self.entries.items()]
+            self.unsaved = 0
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(saved, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save translation cache to {self.path}: {str(e)}")
+
+    def info(self):
+        """Return the cache size and hit statistics"""
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats,
+                        size=len(self.entries),
+                        max_entries=self.max_entries,
+                        hit_rate=self.stats['hits'] / lookups if lookups else None)
@@ -0,0 +1,331 @@
+import argparse
+import json
+from collections import deque
+
+import numpy as np
+
+from benchmark_pipeline import time_stage
+from recognition_logic import (
+    SIGNS, CONFIDENCE_THRESHOLD, KEYPOINT_SIZE, HAND_LANDMARKS, FINGERTIPS, actions, add_to_sentence, FrameGeometry
+)
+from sign_decoder import StreamingSignDecoder, decode_stream, decode_streams
+
+# Compares the sign decoder with the sentence state machine it replaced
+# (majority vote over the last 3 predictions, consecutive counts, start times
+# and the iloveyou cooldown) on synthetic score streams with known signs:
+# how many signs each gets right, misses or adds, and what a frame costs, for
+# one client at a time and for many clients decoded in one batch. Both are fed
+# what app.py feeds them: the model scores go through the sign registry with a
+# hand that has the iloveyou shape while that sign is done, and the decoder
+# gets the weighted and gated scores.
+#   python benchmark_decoder.py --clients 100
+
+# The state machine the decoder replaced, as it was
+
+HIGH_CONFIDENCE_THRESHOLD = 0.90
+MIN_PREDICTION_TIME = 0.5
+MIN_CONSECUTIVE_PREDICTIONS = 3
+
+def legacy_buffer():
+    """The sentence fields of the client buffer the state machine used, with an unbounded sentence"""
+    return {
+        'predictions': deque(maxlen=10),
+        'sentence': deque(),
+        'current_action': None,
+        'current_action_start_time': None,
+        'consecutive_predictions': 0,
+        'last_action': None,
+        'last_iloveyou_time': 0,
+        'iloveyou_cooldown': 2.0
+    }
+
+def legacy_update_sentence(buffer, prediction, current_time):
+    """
+    Advance a client's sentence state machine with the latest prediction.
+    A sign is added either right away on a high confidence prediction, or
+    once a majority of recent predictions agree for long enough.
+
+    Args:
+        buffer: The client's buffer from init_client_buffer
+        prediction: (predicted_action, max_score, scores, is_valid_sign) from postprocess_prediction
+        current_time: Timestamp in seconds, used for the cooldowns and minimum sign time
+
+    Returns:
+        bool: True if a sign was added to the sentence
+    """
+    predicted_action, max_score, scores, is_valid_sign = prediction
+    if scores is None:
+        return False
+    
+    # Still consider all predictions, even if sign validation is uncertain
+    buffer['predictions'].append(np.argmax(scores))
+
+    # Check for high confidence predictions
+    if max_score >= HIGH_CONFIDENCE_THRESHOLD:
+        current_action = predicted_action
+
+        # Check cooldown for "iloveyou" sign to prevent rapid repeated detection
+        if current_action == 'iloveyou':
+            last_iloveyou_time = buffer['last_iloveyou_time']
+            cooldown_period = buffer['iloveyou_cooldown']
+
+            # If we're still in cooldown, don't allow another "iloveyou" detection
+            if current_time - last_iloveyou_time < cooldown_period:
+                # Skip this detection
+                current_action = None
+            else:
+                # Update the last detection time
+                buffer['last_iloveyou_time'] = current_time
+
+        # Only add to sentence if it's valid and not in cooldown
+        if current_action and (len(buffer['sentence']) == 0 or 
+            current_action != buffer['sentence'][-1]):
+            buffer['sentence'].append(current_action)
+            buffer['last_action'] = current_action
+            # Reset tracking for next prediction
+            buffer['current_action'] = None
+            buffer['consecutive_predictions'] = 0
+            return True
+
+    # Check if we have consistent predictions
+    elif len(buffer['predictions']) >= 3:  # Reduced from 5 for even faster detection
+        # Use a majority vote from recent predictions
+        recent_preds = list(buffer['predictions'])[-3:]
+        unique_preds, counts = np.unique(recent_preds, return_counts=True)
+        majority_idx = np.argmax(counts)
+        majority_prediction = unique_preds[majority_idx]
+        majority_count = counts[majority_idx]
+
+        # If we have a majority and confidence is high enough - be more lenient
+        if majority_count >= 2 and max_score > CONFIDENCE_THRESHOLD * 0.9:  # Reduced threshold
+            current_action = actions[majority_prediction]
+
+            # Check cooldown for "iloveyou" sign
+            if current_action == 'iloveyou':
+                last_iloveyou_time = buffer['last_iloveyou_time']
+                cooldown_period = buffer['iloveyou_cooldown']
+
+                # If we're still in cooldown, don't allow another "iloveyou" detection
+                if current_time - last_iloveyou_time < cooldown_period:
+                    # Skip this detection
+                    current_action = None
+
+            # Only proceed if we have a valid action after cooldown check
+            if current_action:
+                # Initialize or update prediction tracking
+                if buffer['current_action'] != current_action:
+                    buffer['consecutive_predictions'] = 1
+                    buffer['current_action'] = current_action
+                    buffer['current_action_start_time'] = current_time
+                else:
+                    buffer['consecutive_predictions'] += 1
+
+                    # Only update the sentence if we have enough consecutive predictions
+                    # and enough time has passed (less strict now)
+                    if (buffer['consecutive_predictions'] >= MIN_CONSECUTIVE_PREDICTIONS - 1 and
+                        current_time - buffer['current_action_start_time'] >= MIN_PREDICTION_TIME * 0.8):
+
+                        # Add to sentence if it's a new sign or different from the last one
+                        if (len(buffer['sentence']) == 0 or 
+                            current_action != buffer['sentence'][-1]):
+
+                            # For "iloveyou", update the last detection time
+                            if current_action == 'iloveyou':
+                                buffer['last_iloveyou_time'] = current_time
+
+                            buffer['sentence'].append(current_action)
+                            buffer['last_action'] = current_action
+                            # Reset for next prediction
+                            buffer['current_action'] = None
+                            buffer['consecutive_predictions'] = 0
+                            return True
+    
+    return False
+
+def synthetic_stream(seconds, fps, rng):
+    """
+    Scores of a signer doing a random sign for 1 to 2 seconds, resting for
+    0.5 to 1 second, and so on, with noisy scores and the odd frame where
+    another sign comes out on top
+
+    Returns:
+        tuple: (scores of shape (frames, signs), the signs done in order,
+        index of the sign done in each frame or -1)
+    """
+    classes = len(actions)
+    frames = int(seconds * fps)
+    logits = rng.normal(0, 0.6, (frames, classes))
+    frame_signs = np.full(frames, -1)
+    signs = []
+    frame = int(rng.uniform(0.2, 0.8) * fps)
+    while frame < frames:
+        choices = [index for index in range(classes) if not signs or actions[index] != signs[-1]]
+        sign = int(rng.choice(choices))
+        length = int(rng.uniform(1.0, 2.0) * fps)
+        if frame + length > frames:
+            break
+        # The model's confidence ramps up over the first few windows of the sign
+        ramp = np.minimum(1.0, np.arange(1, length + 1) / (0.3 * fps))
+        logits[frame:frame + length, sign] += 3.5 * ramp
+        frame_signs[frame:frame + length] = sign
+        flicker = frame + np.flatnonzero(rng.random(length) < 0.08)
+        logits[flicker, rng.integers(0, classes, len(flicker))] += 4.0
+        signs.append(actions[sign])
+        frame += length + int(rng.uniform(0.5, 1.0) * fps)
+    scores = np.exp(logits)
+    return (scores / scores.sum(axis=1, keepdims=True)).astype(np.float32), signs, frame_signs
+
+def hand_geometry(raised):
+    """
+    FrameGeometry of a right hand held up below the face with the given
+    fingertips, thumb to pinky, raised and the others curled
+    """
+    keypoints = np.zeros(KEYPOINT_SIZE, dtype=np.float32)
+    keypoints[:4] = (0.5, 0.3, 0.0, 1.0)  # Nose
+    hand = np.tile(np.array([0.5, 0.65, 0.0], dtype=np.float32), (HAND_LANDMARKS, 1))
+    hand[0, 1] = 0.7  # Wrist
+    for tip, up in zip(FINGERTIPS, raised):
+        hand[tip, 1] = 0.7 - (0.2 if up else 0.02)
+    hand[FINGERTIPS[0], 0] = 0.5 - (0.1 if raised[0] else 0.02)
+    keypoints[-HAND_LANDMARKS * 3:] = hand.reshape(-1)
+    return FrameGeometry(keypoints)
+
+# The hand in frames where iloveyou is done, and in all other frames
+ILOVEYOU_HAND = hand_geometry((True, True, False, False, True))
+OPEN_HAND = hand_geometry((True,) * 5)
+
+def postprocess_stream(scores, frame_signs):
+    """
+    Run a stream's scores through the sign registry as app.py does
+
+    Returns:
+        tuple: (the (predicted_action, max_score, scores, is_valid_sign) predictions the
+        state machine was fed, the decision scores of shape (frames, signs) the decoder is fed)
+    """
+    iloveyou = actions.index('iloveyou') if 'iloveyou' in actions else None
+    predictions, decision_scores = [], []
+    for frame_scores, sign in zip(scores, frame_signs):
+        geometry = ILOVEYOU_HAND if sign == iloveyou else OPEN_HAND
+        picked, max_score, _, decided = SIGNS.postprocess(frame_scores, geometry, ())
+        # The state machine read the model's own scores, and no validity
+        predictions.append((picked.name, max_score, frame_scores, True))
+        decision_scores.append(decided)
+    return predictions, np.array(decision_scores)
+
+def edit_counts(truth, emitted):
+    """Signs right, missed and added, from an alignment of the emitted signs with the true ones"""
+    rows, columns = len(truth) + 1, len(emitted) + 1
+    distance = np.zeros((rows, columns), dtype=int)
+    distance[:, 0] = np.arange(rows)
+    distance[0, :] = np.arange(columns)
+    for i in range(1, rows):
+        for j in range(1, columns):
+            distance[i, j] = min(distance[i - 1, j] + 1, distance[i, j - 1] + 1,
+                                 distance[i - 1, j - 1] + (truth[i - 1] != emitted[j - 1]) * 2)
+    # Walk back to count matches
+    i, j, correct = rows - 1, columns - 1, 0
+    while i and j:
+        if truth[i - 1] == emitted[j - 1] and distance[i, j] == distance[i - 1, j - 1]:
+            correct += 1
+            i, j = i - 1, j - 1
+        elif distance[i, j] == distance[i - 1, j] + 1:
+            i -= 1
+        else:
+            j -= 1
+    return {'correct': correct, 'missed': len(truth) - correct, 'added': len(emitted) - correct}
+
+def legacy_decode(predictions, fps):
+    buffer = legacy_buffer()
+    for step, prediction in enumerate(predictions):
+        legacy_update_sentence(buffer, prediction, step / fps)
+    return list(buffer['sentence'])
+
+def decoder_sentences(streams, fps):
+    """Sentences from the decoder, checking that batched updates and single steps emit the same events"""
+    events = decode_streams(StreamingSignDecoder(SIGNS, enter_threshold=CONFIDENCE_THRESHOLD),
+                            {client: scores for client, (scores, _) in streams.items()}, fps)
+    decoder = StreamingSignDecoder(SIGNS, enter_threshold=CONFIDENCE_THRESHOLD)
+    for client, (scores, _) in streams.items():
+        stepped = decode_stream(decoder, scores, np.arange(len(scores)) / fps, client)
+        if [event[1:3] for event in stepped] != [event[1:3] for event in events[client]]:
+            raise AssertionError(f"Batched and single-step decoding differ for client {client}")
+    sentences = {}
+    for client, client_events in events.items():
+        buffer = {'sentence': deque()}
+        for event in client_events:
+            add_to_sentence(buffer, event.sign)
+        sentences[client] = list(buffer['sentence'])
+    return sentences
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sign decoder against the sentence state machine it replaced")
+    parser.add_argument('--clients', type=int, default=100, help="Synthetic clients, each with its own stream")
+    parser.add_argument('--seconds', type=float, default=60.0, help="Length of each stream")
+    parser.add_argument('--fps', type=float, default=20.0, help="Frame rate of the streams")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic streams")
+    parser.add_argument('--iterations', type=int, default=2000, help="Minimum timed calls per measurement")
+    parser.add_argument('--min-seconds', type=float, default=0.5, help="Minimum time spent per measurement")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    # Client -> (decision scores, true signs), and the predictions the state machine is fed
+    streams, predictions = {}, {}
+    for client in range(args.clients):
+        scores, truth, frame_signs = synthetic_stream(args.seconds, args.fps, rng)
+        predictions[client], decision_scores = postprocess_stream(scores, frame_signs)
+        streams[client] = (decision_scores, truth)
+    sentences = decoder_sentences(streams, args.fps)
+
+    report = {'accuracy': {}, 'timing': {}}
+    for name, decode in (('before', lambda client: legacy_decode(predictions[client], args.fps)),
+                         ('after', lambda client: sentences[client])):
+        totals = {'correct': 0, 'missed': 0, 'added': 0}
+        for client, (_, truth) in streams.items():
+            for key, count in edit_counts(truth, decode(client)).items():
+                totals[key] += count
+        report['accuracy'][name] = totals
+    signs = sum(len(truth) for _, truth in streams.values())
+    print(f"{signs} signs in {args.clients} streams of {args.seconds:.0f}s")
+    print(f"{'':<8}{'correct':>9}{'missed':>8}{'added':>7}")
+    for name, totals in report['accuracy'].items():
+        print(f"{name:<8}{totals['correct']:>9}{totals['missed']:>8}{totals['added']:>7}")
+
+    # Per-frame cost, on frames from the middle of the streams
+    frames = [(client, step) for step in range(int(args.fps), 2 * int(args.fps)) for client in streams]
+    buffers = {client: legacy_buffer() for client in streams}
+    decoder = StreamingSignDecoder(SIGNS, enter_threshold=CONFIDENCE_THRESHOLD)
+    all_scores = np.stack([scores for scores, _ in streams.values()])
+    clients = list(streams)
+
+    def legacy_frame(item):
+        client, step = item
+        legacy_update_sentence(buffers[client], predictions[client][step], step / args.fps)
+
+    def decoder_frame(item):
+        client, step = item
+        decoder.step(client, streams[client][0][step], step / args.fps)
+
+    batch_decoder = StreamingSignDecoder(SIGNS, enter_threshold=CONFIDENCE_THRESHOLD)
+    steps = list(range(all_scores.shape[1]))
+
+    def batch_frame(step):
+        batch_decoder.update(clients, all_scores[:, step], [step / args.fps] * len(clients))
+
+    timings = {
+        'before': time_stage(legacy_frame, frames, args.iterations, args.min_seconds)['median_ms'],
+        'after': time_stage(decoder_frame, frames, args.iterations, args.min_seconds)['median_ms'],
+        'after, batched': time_stage(batch_frame, steps, args.iterations // 10, args.min_seconds)['median_ms']
+                          / len(clients)
+    }
+    report['timing'] = timings
+    print(f"\n{'ms per client frame':<22}")
+    for name, ms in timings.items():
+        print(f"{name:<22}{ms:>9.4f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,376 @@
+import argparse
+import json
+
+import numpy as np
+
+from benchmark_pipeline import synthetic_keypoints, time_stage
+from recognition_logic import (
+    actions, SIGN_TYPES, MOTION_THRESHOLD, POSE_LANDMARKS, FACE_LANDMARKS, HAND_LANDMARKS,
+    SIGNS, KeypointResults, FrameGeometry, check_sign_validity
+)
+
+# Compares the per-frame geometry stage (FrameGeometry and the rules reading
+# it) with the functions it replaced, which walked MediaPipe landmark objects
+# point by point: the hand motion, check_sign_validity and the iloveyou finger
+# check in postprocess_prediction. Checks both give the same motion and
+# decisions on synthetic frames shaped like each sign, then times them:
+#   python benchmark_geometry.py
+
+# The functions FrameGeometry replaced, as they were, working on Holistic
+# results (or KeypointResults)
+
+def legacy_calculate_hand_motion(current_hand, previous_hand):
+    """Calculate the amount of motion between two hand landmark frames"""
+    if current_hand is None or previous_hand is None:
+        return 0
+    
+    # Calculate Euclidean distance for each landmark point
+    total_motion = 0
+    for i in range(len(current_hand.landmark)):
+        curr = current_hand.landmark[i]
+        prev = previous_hand.landmark[i]
+        
+        # Distance in 3D space
+        dist = np.sqrt((curr.x - prev.x)**2 + (curr.y - prev.y)**2 + (curr.z - prev.z)**2)
+        total_motion += dist
+    
+    # Return average motion
+    return total_motion / len(current_hand.landmark)
+
+def legacy_check_sign_validity(predicted_sign, current_results, previous_results, motion_history):
+    """Check if the predicted sign meets the criteria for its type (dynamic vs static)"""
+    sign_type = SIGN_TYPES.get(predicted_sign, 'dynamic')
+    
+    # Convert any NumPy values in motion_history to Python float
+    motion_history = [float(m) if hasattr(m, 'dtype') else m for m in motion_history]
+    
+    # Special handling for specific signs
+    if predicted_sign == 'hello':
+        # For "hello" we expect hand near forehead 
+        if current_results and current_results.right_hand_landmarks:
+            landmarks = current_results.right_hand_landmarks.landmark
+            # Check if hand is near the forehead height (y position)
+            if len(landmarks) >= 21:
+                wrist = landmarks[0]
+                # Get nose position as reference for face/head
+                nose_y = None
+                if current_results.pose_landmarks:
+                    nose = current_results.pose_landmarks.landmark[0]  # Nose landmark
+                    nose_y = nose.y
+                
+                # Check if hand is near forehead height (above nose)
+                hand_near_forehead = False
+                if nose_y:
+                    # Hand should be near or above nose height
+                    hand_near_forehead = wrist.y <= nose_y + 0.05
+                
+                # Check for some motion but not too much
+                if len(motion_history) >= 3:
+                    avg_motion = sum(motion_history[-3:]) / 3
+                    good_motion = MOTION_THRESHOLD * 0.5 < avg_motion < MOTION_THRESHOLD * 2.0
+                    
+                    return bool(hand_near_forehead and good_motion)
+        
+        # Fallback to motion-only check
+        if len(motion_history) >= 3:
+            avg_motion = sum(motion_history[-3:]) / 3
+            return bool(avg_motion > MOTION_THRESHOLD * 0.8)
+    
+    elif predicted_sign == 'thanks':
+        # For "thanks" we expect fingers tapping on chin, potentially with both hands
+        
+        # Check if hands are near chin height
+        hands_near_chin = False
+        if current_results:
+            # Check for chin/mouth position in face landmarks
+            chin_y = None
+            if current_results.face_landmarks:
+                # Use bottom lip as reference for chin
+                lips = [current_results.face_landmarks.landmark[i] for i in range(0, 17)]  # Lower face contour
+                if lips:
+                    chin_y = max(lip.y for lip in lips)  # Bottom of face
+            
+            # Check if either or both hands are near chin
+            left_hand_near_chin = False
+            right_hand_near_chin = False
+            
+            if current_results.left_hand_landmarks and chin_y:
+                left_fingers = [current_results.left_hand_landmarks.landmark[i] for i in range(8, 21, 4)]  # Fingertips
+                left_hand_near_chin = any(abs(finger.y - chin_y) < 0.1 for finger in left_fingers)
+                
+            if current_results.right_hand_landmarks and chin_y:
+                right_fingers = [current_results.right_hand_landmarks.landmark[i] for i in range(8, 21, 4)]  # Fingertips
+                right_hand_near_chin = any(abs(finger.y - chin_y) < 0.1 for finger in right_fingers)
+                
+            hands_near_chin = left_hand_near_chin or right_hand_near_chin
+            
+            # Check for appropriate motion (tapping)
+            if len(motion_history) >= 3:
+                avg_motion = sum(motion_history[-3:]) / 3
+                good_motion = MOTION_THRESHOLD * 0.6 < avg_motion < MOTION_THRESHOLD * 1.5
+                
+                return bool(hands_near_chin and good_motion)
+        
+        # Fallback to motion-only check
+        if len(motion_history) >= 3:
+            avg_motion = sum(motion_history[-3:]) / 3
+            return bool(MOTION_THRESHOLD * 0.5 < avg_motion < MOTION_THRESHOLD * 1.5)
+    
+    elif predicted_sign == 'iloveyou':
+        # For "iloveyou" we expect extended thumb, index, and pinky - static pose
+        if len(motion_history) >= 3:
+            avg_motion = sum(motion_history[-3:]) / 3
+            
+            # Low motion threshold for this static sign
+            low_motion = avg_motion < MOTION_THRESHOLD * 0.5
+            
+            # Check for proper hand configuration - specific to "iloveyou" sign
+            proper_hand_config = False
+            
+            # Check if we have hand landmarks to verify
+            if current_results and (current_results.left_hand_landmarks or current_results.right_hand_landmarks):
+                # Preferably check right hand first, then left
+                hand_landmarks = current_results.right_hand_landmarks or current_results.left_hand_landmarks
+                
+                # Check for "I love you" sign configuration
+                if hand_landmarks:
+                    landmarks = hand_landmarks.landmark
+                    if len(landmarks) >= 21:
+                        # Check specific finger extensions for the ILY sign
+                        thumb_tip = landmarks[4]   # Thumb tip
+                        index_tip = landmarks[8]   # Index finger tip
+                        middle_tip = landmarks[12] # Middle finger tip
+                        ring_tip = landmarks[16]   # Ring finger tip
+                        pinky_tip = landmarks[20]  # Pinky tip
+                        wrist = landmarks[0]       # Wrist reference
+                        
+                        # Critical finger positions for ILY sign
+                        thumb_extended = thumb_tip.y < wrist.y - 0.05  # Thumb must be clearly extended upward
+                        index_extended = index_tip.y < wrist.y - 0.1   # Index must be clearly extended upward
+                        middle_curled = middle_tip.y > index_tip.y + 0.05  # Middle must be clearly curled
+                        ring_curled = ring_tip.y > index_tip.y + 0.05      # Ring must be clearly curled
+                        pinky_extended = pinky_tip.y < ring_tip.y - 0.08  # Pinky must be clearly extended
+                        
+                        # All conditions must be met for a proper hand configuration
+                        proper_hand_config = (thumb_extended and 
+                                             index_extended and 
+                                             middle_curled and 
+                                             ring_curled and 
+                                             pinky_extended)
+                            
+            # Need BOTH low motion AND proper hand configuration for "iloveyou"
+            return bool(low_motion and proper_hand_config)
+    
+    # Default handling for sign types
+    if sign_type == 'static':
+        # For generic static signs, we want hands to be stable with minimal motion
+        if len(motion_history) >= 2:
+            avg_motion = sum(motion_history[-2:]) / 2
+            return bool(avg_motion < MOTION_THRESHOLD * 1.5)
+        return True
+    
+    elif sign_type == 'dynamic':
+        # For generic dynamic signs, we expect some motion
+        if len(motion_history) >= 2:
+            avg_motion = sum(motion_history[-2:]) / 2
+            return bool(avg_motion > MOTION_THRESHOLD * 0.5)
+        return True
+    
+    return True
+
+def legacy_calculate_frame_motion(results, previous_results):
+    """Motion between two frames: the larger of the left and right hand motion"""
+    if not previous_results or not results:
+        return 0
+    left_motion = legacy_calculate_hand_motion(results.left_hand_landmarks, previous_results.left_hand_landmarks) if results.left_hand_landmarks and previous_results.left_hand_landmarks else 0
+    right_motion = legacy_calculate_hand_motion(results.right_hand_landmarks, previous_results.right_hand_landmarks) if results.right_hand_landmarks and previous_results.right_hand_landmarks else 0
+    return max(left_motion, right_motion)
+
+def legacy_iloveyou_fingers(current_results):
+    """The iloveyou finger check postprocess_prediction made on Holistic results"""
+    has_sufficient_fingers = False
+    if current_results.right_hand_landmarks:
+        # For "iloveyou" sign, typically the pinky, index and thumb should be extended
+        # Check visibility and position of these key landmarks
+        landmarks = current_results.right_hand_landmarks.landmark
+
+        # More strict verification of finger positions
+        if len(landmarks) >= 21:  # Make sure we have enough landmarks
+            # Check positions of thumb tip, index tip, and pinky tip relative to palm
+            thumb_tip = landmarks[4]    # Thumb tip
+            index_tip = landmarks[8]    # Index finger tip
+            middle_tip = landmarks[12]  # Middle finger tip
+            ring_tip = landmarks[16]    # Ring finger tip
+            pinky_tip = landmarks[20]   # Pinky tip
+            wrist = landmarks[0]        # Wrist/palm center
+
+            # Much stricter check for proper finger configuration
+            if (index_tip.y < wrist.y - 0.1 and      # Index clearly extended up
+                pinky_tip.y < wrist.y - 0.08 and     # Pinky clearly extended up
+                abs(thumb_tip.x - wrist.x) > 0.08 and # Thumb clearly extended to side
+                middle_tip.y > index_tip.y + 0.05 and # Middle clearly curled
+                ring_tip.y > index_tip.y + 0.05):     # Ring clearly curled
+                has_sufficient_fingers = True
+    return has_sufficient_fingers
+
+HAND_SIZE = HAND_LANDMARKS * 3
+LEFT_START = POSE_LANDMARKS * 4 + FACE_LANDMARKS * 3
+RIGHT_START = LEFT_START + HAND_SIZE
+
+def place_hand(keypoints, start, wrist, tips):
+    """Put a hand's wrist and fingertips (thumb to pinky) at the given (x, y) positions"""
+    hand = keypoints[start:start + HAND_SIZE].reshape(HAND_LANDMARKS, 3)
+    hand[0, :2] = wrist
+    for landmark, tip in zip((4, 8, 12, 16, 20), tips):
+        hand[landmark, :2] = tip
+
+def shaped_frames(count):
+    """
+    Synthetic frames, cycling through shapes that exercise every rule: the
+    iloveyou hand shape (thumb up or out), fingertips at the chin, a hand
+    above the nose, and frames missing a hand, both hands, the face or the pose
+    """
+    frames = []
+    for seed in range(count):
+        keypoints = synthetic_keypoints(seed)
+        rng = np.random.default_rng(seed)
+        jitter = rng.normal(0, 0.02, 2)
+        shape = seed % 8
+        if shape in (0, 1):
+            # I love you: index and pinky up, middle and ring curled, thumb up (0) or out to the side (1)
+            wrist = np.array([0.6, 0.7]) + jitter
+            thumb = wrist + ((0.02, -0.08) if shape == 0 else (0.12, -0.02))
+            place_hand(keypoints, RIGHT_START, wrist,
+                       [thumb, wrist + (0, -0.2), wrist + (0.01, -0.05), wrist + (0.02, -0.05), wrist + (0.03, -0.16)])
+        elif shape == 2:
+            # Thanks: fingertips at the lowest point of the face contour
+            chin_y = keypoints[POSE_LANDMARKS * 4 + 1:POSE_LANDMARKS * 4 + 17 * 3:3].max()
+            wrist = np.array([0.5, chin_y + 0.15]) + jitter
+            place_hand(keypoints, LEFT_START, wrist, [wrist + (dx, -0.15 + jitter[0]) for dx in (-0.04, -0.02, 0, 0.02, 0.04)])
+        elif shape == 3:
+            # Hello: right wrist above the nose
+            nose_y = keypoints[1]
+            place_hand(keypoints, RIGHT_START, (0.6, nose_y - 0.02 + jitter[1]),
+                       [(0.6 + dx, nose_y - 0.12) for dx in (-0.04, -0.02, 0, 0.02, 0.04)])
+        elif shape == 4:
+            keypoints[RIGHT_START:] = 0
+        elif shape == 5:
+            keypoints[LEFT_START:] = 0
+        elif shape == 6:
+            keypoints[POSE_LANDMARKS * 4:LEFT_START] = 0
+        else:
+            keypoints[:POSE_LANDMARKS * 4] = 0
+        frames.append(keypoints)
+    return frames
+
+# Motion histories that reach each motion band the rules check: still, moving, too short to judge
+MOTION_HISTORIES = [
+    [MOTION_THRESHOLD * 0.2] * 10,
+    [MOTION_THRESHOLD * 1.0] * 10,
+    [MOTION_THRESHOLD * 1.8] * 10,
+    [MOTION_THRESHOLD]
+]
+
+def has_iloveyou_fingers(geometry):
+    """The iloveyou finger check, now the gate of iloveyou in the sign registry"""
+    return SIGNS.by_name['iloveyou'].gate.conditions.holds(geometry)
+
+def check_equivalence(frames):
+    """
+    Run the old and new implementations over consecutive frames
+
+    Returns:
+        dict: Largest motion difference, and the number of decisions compared and differing
+    """
+    results = [KeypointResults(keypoints) for keypoints in frames]
+    geometries = [FrameGeometry(frames[0])]
+    for keypoints in frames[1:]:
+        geometries.append(FrameGeometry(keypoints, previous=geometries[-1]))
+
+    motion_diff = 0.0
+    decisions = mismatches = 0
+    for index in range(1, len(frames)):
+        legacy_motion = legacy_calculate_frame_motion(results[index], results[index - 1])
+        motion_diff = max(motion_diff, abs(legacy_motion - geometries[index].motion))
+
+        checks = [(legacy_iloveyou_fingers(results[index]), has_iloveyou_fingers(geometries[index]))]
+        for sign in list(actions) + ['unknown']:
+            for history in MOTION_HISTORIES:
+                checks.append((legacy_check_sign_validity(sign, results[index], results[index - 1], history),
+                               check_sign_validity(sign, geometries[index], history)))
+        decisions += len(checks)
+        mismatches += sum(old != new for old, new in checks)
+    return {'max_motion_diff': motion_diff, 'decisions': decisions, 'mismatches': mismatches}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-frame geometry stage against the code it replaced")
+    parser.add_argument('--frames', type=int, default=400, help="Synthetic frames to check and time")
+    parser.add_argument('--iterations', type=int, default=200, help="Minimum timed calls per stage")
+    parser.add_argument('--min-seconds', type=float, default=0.5, help="Minimum time spent per stage")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    frames = shaped_frames(args.frames)
+    equivalence = check_equivalence(frames)
+    print(f"Checked {equivalence['decisions']} decisions: {equivalence['mismatches']} differ, "
+          f"largest motion difference {equivalence['max_motion_diff']:.2e}")
+
+    results = [KeypointResults(keypoints) for keypoints in frames]
+    result_pairs = list(zip(results[1:], results[:-1]))
+    geometries = [FrameGeometry(keypoints) for keypoints in frames]
+    geometry_inputs = list(zip(frames[1:], geometries[:-1]))
+    keypoint_pairs = list(zip(frames[1:], frames[:-1]))
+    history = MOTION_HISTORIES[1]
+
+    def legacy_rules(item):
+        current, previous = item
+        legacy_iloveyou_fingers(current)
+        for sign in actions:
+            legacy_check_sign_validity(sign, current, previous, history)
+
+    def rules(geometry):
+        has_iloveyou_fingers(geometry)
+        for sign in actions:
+            check_sign_validity(sign, geometry, history)
+
+    def legacy_frame(item):
+        legacy_calculate_frame_motion(*item)
+        legacy_rules(item)
+
+    def frame(item):
+        rules(FrameGeometry(item[0], previous=item[1]))
+
+    # Offline tools (evaluate_model.py) start from keypoint vectors, so the old
+    # code first had to rebuild landmark objects for both frames
+    def legacy_offline_frame(pair):
+        legacy_frame((KeypointResults(pair[0]), KeypointResults(pair[1])))
+
+    def offline_frame(pair):
+        rules(FrameGeometry(pair[0], previous=FrameGeometry(pair[1])))
+
+    stages = [
+        ('motion', 'legacy_calculate_frame_motion', lambda item: legacy_calculate_frame_motion(*item), result_pairs,
+         'FrameGeometry', lambda item: FrameGeometry(item[0], previous=item[1]), geometry_inputs),
+        ('rules', 'legacy rules on results', legacy_rules, result_pairs,
+         'rules on FrameGeometry', rules, geometries[1:]),
+        ('per frame', 'legacy motion + rules', legacy_frame, result_pairs,
+         'FrameGeometry + rules', frame, geometry_inputs),
+        ('offline', 'KeypointResults + motion + rules', legacy_offline_frame, keypoint_pairs,
+         '2 FrameGeometry + rules', offline_frame, keypoint_pairs)
+    ]
+
+    report = {'equivalence': equivalence, 'stages': {}}
+    print(f"\n{'stage':<12}{'before':<32}{'ms':>9}  {'after':<26}{'ms':>9}{'speedup':>9}")
+    for stage, old_name, old_fn, old_inputs, new_name, new_fn, new_inputs in stages:
+        old = time_stage(old_fn, old_inputs, args.iterations, args.min_seconds)
+        new = time_stage(new_fn, new_inputs, args.iterations, args.min_seconds)
+        speedup = old['median_ms'] / new['median_ms'] if new['median_ms'] else float('inf')
+        report['stages'][stage] = {'before': old, 'after': new, 'speedup': speedup}
+        print(f"{stage:<12}{old_name:<32}{old['median_ms']:>9.4f}  {new_name:<26}{new['median_ms']:>9.4f}{speedup:>8.1f}x")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import gc
+import json
+import tracemalloc
+
+import numpy as np
+
+from benchmark_pipeline import synthetic_keypoints
+from recognition_logic import (
+    KEYPOINT_LAYOUTS, FrameGeometry, KeypointResults, assemble_window, extract_keypoints, get_layout, init_client_buffer
+)
+
+# Measures what app.py keeps in memory for each client session and for each
+# window waiting in the prediction queue, now and as it was when it kept
+# MediaPipe results objects around:
+#   - before: float64 keypoint vectors, the previous frame's results object in
+#     the session, and a stacked float64 window plus two results objects per
+#     queued window
+#   - now: float32 keypoint vectors, the previous frame's FrameGeometry, and
+#     references to the window's keypoint vectors plus a FrameGeometry per
+#     queued window
+# KeypointResults stands in for MediaPipe results; the real protobuf landmark
+# graphs live outside the Python heap, so tracemalloc can't see them.
+#   python benchmark_memory.py
+
+def synthetic_stream(count):
+    """Keypoints of a stream of frames with everything detected"""
+    return [synthetic_keypoints(seed) for seed in range(count)]
+
+def legacy_frame(buffer, results, layout):
+    """What /predict kept of a frame before: float64 keypoints and the results object itself"""
+    keypoints = extract_keypoints(results, layout).astype(np.float64)
+    buffer['frames'].append(keypoints)
+    buffer['motion_history'].append(0.0)
+    previous_results = buffer.get('previous_results')
+    buffer['previous_results'] = results
+    return keypoints, previous_results
+
+def legacy_queue_item(buffer, results, previous_results, frame_seq):
+    return ('client', assemble_window(buffer['frames']).astype(np.float64), results, previous_results,
+            list(buffer['motion_history']), frame_seq, 0.0, 0.0)
+
+def current_frame(buffer, results, layout):
+    """What /predict keeps of a frame now: float32 keypoints and their geometry"""
+    keypoints = extract_keypoints(results, layout)
+    geometry = FrameGeometry(keypoints, layout, buffer['previous_geometry'])
+    buffer['frames'].append(keypoints)
+    buffer['motion_history'].append(geometry.motion)
+    buffer['previous_geometry'] = geometry
+    return geometry
+
+def current_queue_item(buffer, geometry, frame_seq):
+    return ('client', tuple(buffer['frames']), geometry, list(buffer['motion_history']), frame_seq, 0.0, 0.0)
+
+def measure(fn):
+    """Bytes still allocated after fn() returns, counting what it returns"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = fn()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return size
+
+def session_bytes(stream, layout, legacy):
+    """Memory held by one client session after a stream of frames"""
+    def run():
+        buffer = init_client_buffer()
+        for keypoints in stream:
+            # A fresh results object per frame, as the detector returns
+            results = KeypointResults(keypoints)
+            if legacy:
+                legacy_frame(buffer, results, layout)
+            else:
+                current_frame(buffer, results, layout)
+        return buffer
+    return measure(run)
+
+def queue_item_bytes(stream, layout, legacy, backlog):
+    """
+    Memory held per queued window, for a backlog of windows queued on
+    consecutive frames of one client (as when the worker falls behind),
+    on top of the session itself
+    """
+    def run(queue_items):
+        buffer = init_client_buffer()
+        queue = []
+        for frame_seq, keypoints in enumerate(stream, 1):
+            results = KeypointResults(keypoints)
+            if legacy:
+                _, previous_results = legacy_frame(buffer, results, layout)
+                item = legacy_queue_item(buffer, results, previous_results, frame_seq)
+            else:
+                item = current_queue_item(buffer, current_frame(buffer, results, layout), frame_seq)
+            if queue_items and len(buffer['frames']) == 30:
+                queue.append(item)
+        return buffer, queue[-backlog:]
+    return (measure(lambda: run(True)) - measure(lambda: run(False))) / backlog
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per client session and per queued prediction window")
+    parser.add_argument('--layouts', nargs='*', default=list(KEYPOINT_LAYOUTS), help="Keypoint layouts to measure")
+    parser.add_argument('--backlog', type=int, default=20, help="Queued windows to average over")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    stream = synthetic_stream(30 + args.backlog)
+    report = {}
+    print(f"{'layout':<18}{'':<16}{'before KiB':>12}{'now KiB':>10}{'ratio':>8}")
+    for name in args.layouts:
+        layout = get_layout(name)
+        rows = {
+            'session': (session_bytes(stream, layout, True), session_bytes(stream, layout, False)),
+            'queued window': (queue_item_bytes(stream, layout, True, args.backlog),
+                              queue_item_bytes(stream, layout, False, args.backlog))
+        }
+        report[name] = {}
+        for row, (before, now) in rows.items():
+            report[name][row] = {'before_bytes': before, 'now_bytes': now}
+            print(f"{name:<18}{row:<16}{before / 1024:>12.1f}{now / 1024:>10.1f}{before / now:>7.1f}x")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+import argparse
+import base64
+import glob
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from frame_pipeline import decode_data_url, decode_frame, to_rgb, crop, map_landmarks_to_frame, draw_overlay, encode_frame
+from recognition_logic import (
+    actions, KEYPOINT_SIZE, POSE_LANDMARKS, FACE_LANDMARKS, HAND_LANDMARKS,
+    KeypointResults, FrameGeometry, extract_keypoints, assemble_window, check_sign_validity
+)
+
+# Times each stage of app.py's /predict in isolation, on synthetic frames and
+# optionally on frames from session recordings (see session_recorder.py).
+# Needs no camera or GPU. Typical use:
+#   python benchmark_pipeline.py --save        (record baselines on this machine)
+#   python benchmark_pipeline.py               (compare against them, exit 1 on regression)
+
+DEFAULT_BASELINE = 'benchmark_baselines.json'
+
+def synthetic_frame(width=640, height=480, seed=0):
+    """A deterministic camera-like frame: gradients, shapes and sensor noise"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    frame = np.stack([(x * 255 // width), (y * 255 // height), ((x + y) * 255 // (width + height))], axis=2).astype(np.uint8)
+    cv2.circle(frame, (width // 2, height // 3), height // 6, (190, 160, 140), -1)          # A face
+    cv2.rectangle(frame, (width // 4, height // 2), (3 * width // 4, height), (60, 60, 120), -1)  # A body
+    cv2.ellipse(frame, (2 * width // 3, height // 2), (40, 60), 20, 0, 360, (180, 150, 130), -1)  # A hand
+    noise = rng.normal(0, 6, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+def to_data_url(frame, quality=70):
+    """Encode a frame the way index.html sends it (canvas.toDataURL('image/jpeg', 0.7))"""
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return f"data:image/jpeg;base64,{base64.b64encode(buffer).decode('ascii')}"
+
+def synthetic_keypoints(seed=0):
+    """A keypoint vector with pose, face and both hands present in plausible positions"""
+    rng = np.random.default_rng(seed)
+    pose = np.column_stack([rng.uniform(0.3, 0.7, POSE_LANDMARKS), rng.uniform(0.1, 0.9, POSE_LANDMARKS),
+                            rng.uniform(-0.5, 0.5, POSE_LANDMARKS), rng.uniform(0.5, 1.0, POSE_LANDMARKS)])
+    face = np.column_stack([rng.uniform(0.4, 0.6, FACE_LANDMARKS), rng.uniform(0.15, 0.4, FACE_LANDMARKS),
+                            rng.uniform(-0.05, 0.05, FACE_LANDMARKS)])
+    hands = [np.column_stack([rng.uniform(x - 0.08, x + 0.08, HAND_LANDMARKS), rng.uniform(0.3, 0.5, HAND_LANDMARKS),
+                              rng.uniform(-0.05, 0.05, HAND_LANDMARKS)]) for x in (0.35, 0.65)]
+    vector = np.concatenate([pose.ravel(), face.ravel(), hands[0].ravel(), hands[1].ravel()]).astype(np.float32)
+    assert vector.shape == (KEYPOINT_SIZE,)
+    return vector
+
+def recorded_data_urls(paths, limit):
+    """Frames from session recordings, as the data URLs the browser sent"""
+    from session_recorder import load_session
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, '*.rec'))) if os.path.isdir(path) else [path])
+    urls = []
+    for path in files:
+        for _, image_bytes, prefix, _ in load_session(path)['frames']:
+            if decode_frame(image_bytes) is None:
+                continue
+            urls.append(f"{prefix},{base64.b64encode(image_bytes).decode('ascii')}")
+            if len(urls) >= limit:
+                return urls
+    return urls
+
+def create_holistic():
+    """The Holistic detector configured like app.py, or None if MediaPipe's solutions API is unavailable"""
+    try:
+        import mediapipe as mp
+        return mp.solutions.holistic.Holistic(
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+            model_complexity=0,
+            enable_segmentation=False,
+            refine_face_landmarks=False,
+            static_image_mode=False
+        )
+    except (ImportError, AttributeError):
+        return None
+
+def time_stage(fn, inputs, min_iterations, min_seconds, warmup=3):
+    """
+    Call fn on the inputs in turn until both min_iterations and min_seconds are reached
+
+    Returns:
+        dict with the median, p95 and mean time per call in milliseconds
+    """
+    for i in range(warmup):
+        fn(inputs[i % len(inputs)])
+
+    timings = []
+    start = time.perf_counter()
+    i = 0
+    while len(timings) < min_iterations or time.perf_counter() - start < min_seconds:
+        item = inputs[i % len(inputs)]
+        call_start = time.perf_counter()
+        fn(item)
+        timings.append((time.perf_counter() - call_start) * 1000)
+        i += 1
+
+    timings.sort()
+    return {
+        'median_ms': statistics.median(timings),
+        'p95_ms': timings[min(len(timings) - 1, int(0.95 * len(timings)))],
+        'mean_ms': statistics.fmean(timings),
+        'iterations': len(timings)
+    }
+
+def run_suite(data_urls, model, holistic, min_iterations, min_seconds):
+    """Time every stage of /predict on one set of input frames"""
+    image_bytes = [decode_data_url(url)[1] for url in data_urls]
+    frames = [decode_frame(data) for data in image_bytes]
+    rgb_frames = [to_rgb(frame) for frame in frames]
+
+    # Keypoint stages use Holistic output when available, synthetic keypoints otherwise
+    results = [KeypointResults(synthetic_keypoints(seed)) for seed in range(8)]
+    if holistic is not None:
+        detected = [holistic.process(rgb) for rgb in rgb_frames[:8]]
+        if any(r.left_hand_landmarks or r.right_hand_landmarks for r in detected):
+            results = detected
+    keypoints = [extract_keypoints(r) for r in results]
+    geometries = [FrameGeometry(k) for k in keypoints]
+    geometry_inputs = list(zip(keypoints, geometries[1:] + geometries[:1]))
+    window_frames = deque((synthetic_keypoints(seed) for seed in range(30)), maxlen=30)
+    window = assemble_window(window_frames)
+    motion_history = [0.01, 0.02, 0.03, 0.02, 0.01, 0.015, 0.02, 0.025, 0.02, 0.01]
+    validity_inputs = [(sign, g) for sign in actions for g in geometries]
+    # A signer-sized crop like RoiTracker picks, in the middle of the frame
+    height, width = frames[0].shape[:2]
+    roi = (width // 4, height // 8, 3 * width // 4, 7 * height // 8)
+    sentence = deque(['hello', 'thanks'], maxlen=5)
+
+    stages = [
+        ('base64_decode', decode_data_url, data_urls),
+        ('imdecode', decode_frame, image_bytes),
+        ('imdecode_reduced_2', lambda data: decode_frame(data, 2), image_bytes),
+        ('cvtColor', to_rgb, frames),
+        ('cvtColor_roi', lambda frame: to_rgb(crop(frame, roi)), frames),
+        ('holistic_process', holistic.process if holistic else None, rgb_frames),
+        ('roi_map_landmarks', lambda r: map_landmarks_to_frame(r, (0, 0, width, height), frames[0].shape), results),
+        ('extract_keypoints', extract_keypoints, results),
+        ('frame_geometry', lambda item: FrameGeometry(item[0], previous=item[1]), geometry_inputs),
+        ('window_assembly', assemble_window, [window_frames]),
+        ('model_predict', lambda w: model.predict(w, verbose=0), [window]),
+        ('check_sign_validity', lambda item: check_sign_validity(item[0], item[1], motion_history), validity_inputs),
+        ('overlay', lambda frame: draw_overlay(frame, sentence, 'hello', 0.93, True, 0.0213), [f.copy() for f in frames]),
+        ('imencode', encode_frame, frames)
+    ]
+
+    report = {}
+    for name, fn, inputs in stages:
+        if fn is None:
+            report[name] = {'skipped': 'MediaPipe Holistic is not available'}
+            continue
+        report[name] = time_stage(fn, inputs, min_iterations, min_seconds)
+    return report
+
+def compare(results, baseline, tolerance):
+    """
+    Compare median stage times against a baseline
+
+    Returns:
+        list of (key, baseline ms, current ms, ratio) for stages slower than the tolerance allows
+    """
+    regressions = []
+    for key, stats in results.items():
+        base = baseline.get('stages', {}).get(key)
+        if not base or 'median_ms' not in base or 'median_ms' not in stats:
+            continue
+        ratio = stats['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+        stats['baseline_median_ms'] = base['median_ms']
+        stats['ratio'] = ratio
+        if ratio > 1 + tolerance:
+            regressions.append((key, base['median_ms'], stats['median_ms'], ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage benchmarks for the /predict pipeline")
+    parser.add_argument('--recordings', nargs='*', default=[], help="Session recordings (.rec files or directories) to also benchmark")
+    parser.add_argument('--model', default='tfjs_model/model.json',
+                        help="Keras .h5 model, or a tfjs model.json run with numpy (default)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--save', action='store_true', help="Write the results as the new baseline instead of comparing")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown of a stage's median over its baseline (0.25 = 25%%)")
+    parser.add_argument('--iterations', type=int, default=50, help="Minimum timed calls per stage")
+    parser.add_argument('--min-seconds', type=float, default=0.5, help="Minimum time spent per stage")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    from evaluate_model import load_model
+    model = load_model(args.model)
+    holistic = create_holistic()
+
+    inputs = {'synthetic': [to_data_url(synthetic_frame(seed=seed)) for seed in range(4)]}
+    if args.recordings:
+        recorded = recorded_data_urls(args.recordings, limit=200)
+        if recorded:
+            inputs['recorded'] = recorded
+
+    results = {}
+    for input_name, data_urls in inputs.items():
+        print(f"Benchmarking {len(data_urls)} {input_name} frames...")
+        for stage, stats in run_suite(data_urls, model, holistic, args.iterations, args.min_seconds).items():
+            results[f"{input_name}/{stage}"] = stats
+
+    meta = {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'model': args.model,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+    regressions = []
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+    print(f"\n{'stage':<36}{'median ms':>12}{'p95 ms':>12}{'baseline':>12}{'ratio':>8}")
+    for key, stats in results.items():
+        if 'skipped' in stats:
+            print(f"{key:<36}{'skipped':>12}  ({stats['skipped']})")
+            continue
+        baseline = f"{stats['baseline_median_ms']:.3f}" if 'baseline_median_ms' in stats else '-'
+        ratio = f"{stats['ratio']:.2f}" if 'ratio' in stats else '-'
+        print(f"{key:<36}{stats['median_ms']:>12.3f}{stats['p95_ms']:>12.3f}{baseline:>12}{ratio:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'meta': meta, 'stages': results}, f, indent=2)
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump({'meta': meta, 'stages': results}, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+    elif not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save to create one")
+    elif regressions:
+        print(f"\n{len(regressions)} stage(s) regressed by more than {args.tolerance:.0%}:")
+        for key, base, current, ratio in regressions:
+            print(f"  {key}: {base:.3f} ms -> {current:.3f} ms ({ratio:.2f}x)")
+        sys.exit(1)
+    else:
+        print(f"\nNo stage regressed by more than {args.tolerance:.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+import argparse
+import copy
+import json
+import logging
+
+import numpy as np
+
+from benchmark_geometry import MOTION_HISTORIES, shaped_frames
+from benchmark_pipeline import time_stage
+from recognition_logic import (
+    actions, SIGN_TYPES, SIGN_WEIGHTS, CONFIDENCE_THRESHOLD, MOTION_THRESHOLD, SIGN_REGISTRY_PATH,
+    FrameGeometry, postprocess_prediction
+)
+from sign_registry import SignRegistry
+
+logger = logging.getLogger(__name__)
+
+# Compares the sign registry's post-processing with the hardcoded
+# postprocess_prediction and check_sign_validity it replaced: checks both pick
+# the same sign with the same validity on synthetic frames and scores, then
+# times one prediction for vocabularies of growing size, made of copies of
+# the signs in signs.json with shifted thresholds:
+#   python benchmark_registry.py --sizes 3 30 300 1000
+
+# The functions the registry replaced, as they were, with the sign names,
+# types and weights as arguments so they can run on larger vocabularies
+
+def legacy_check_sign_validity(predicted_sign, geometry, motion_history, sign_types=SIGN_TYPES):
+    """Check if the predicted sign meets the criteria for its type (dynamic vs static)"""
+    sign_type = sign_types.get(predicted_sign, 'dynamic')
+    
+    # Convert any NumPy values in motion_history to Python float
+    motion_history = [float(m) if hasattr(m, 'dtype') else m for m in motion_history]
+    
+    # Special handling for specific signs
+    if predicted_sign == 'hello':
+        # For "hello" we expect hand near forehead 
+        if geometry and geometry.present[1]:
+            # Check if the right hand is near or above nose height
+            hand_near_forehead = geometry.nose_offset[1] <= 0.05
+            
+            # Check for some motion but not too much
+            if len(motion_history) >= 3:
+                avg_motion = sum(motion_history[-3:]) / 3
+                good_motion = MOTION_THRESHOLD * 0.5 < avg_motion < MOTION_THRESHOLD * 2.0
+                
+                return bool(hand_near_forehead and good_motion)
+        
+        # Fallback to motion-only check
+        if len(motion_history) >= 3:
+            avg_motion = sum(motion_history[-3:]) / 3
+            return bool(avg_motion > MOTION_THRESHOLD * 0.8)
+    
+    elif predicted_sign == 'thanks':
+        # For "thanks" we expect fingers tapping on chin, potentially with both hands
+        if geometry:
+            # Check if either or both hands have a fingertip near chin height
+            hands_near_chin = any(distance < 0.1 for distance in geometry.chin_distance)
+            
+            # Check for appropriate motion (tapping)
+            if len(motion_history) >= 3:
+                avg_motion = sum(motion_history[-3:]) / 3
+                good_motion = MOTION_THRESHOLD * 0.6 < avg_motion < MOTION_THRESHOLD * 1.5
+                
+                return bool(hands_near_chin and good_motion)
+        
+        # Fallback to motion-only check
+        if len(motion_history) >= 3:
+            avg_motion = sum(motion_history[-3:]) / 3
+            return bool(MOTION_THRESHOLD * 0.5 < avg_motion < MOTION_THRESHOLD * 1.5)
+    
+    elif predicted_sign == 'iloveyou':
+        # For "iloveyou" we expect extended thumb, index, and pinky - static pose
+        if len(motion_history) >= 3:
+            avg_motion = sum(motion_history[-3:]) / 3
+            
+            # Low motion threshold for this static sign
+            low_motion = avg_motion < MOTION_THRESHOLD * 0.5
+            
+            # Check for proper hand configuration - specific to "iloveyou" sign,
+            # preferably on the right hand, then the left
+            proper_hand_config = False
+            if geometry and any(geometry.present):
+                thumb, index, middle, ring, pinky = geometry.extension[1 if geometry.present[1] else 0]
+                
+                # All of the critical finger positions for ILY sign must be met
+                proper_hand_config = bool(
+                    thumb > 0.05 and           # Thumb must be clearly extended upward
+                    index > 0.1 and            # Index must be clearly extended upward
+                    index - middle > 0.05 and  # Middle must be clearly curled
+                    index - ring > 0.05 and    # Ring must be clearly curled
+                    pinky - ring > 0.08        # Pinky must be clearly extended
+                )
+                            
+            # Need BOTH low motion AND proper hand configuration for "iloveyou"
+            return bool(low_motion and proper_hand_config)
+    
+    # Default handling for sign types
+    if sign_type == 'static':
+        # For generic static signs, we want hands to be stable with minimal motion
+        if len(motion_history) >= 2:
+            avg_motion = sum(motion_history[-2:]) / 2
+            return bool(avg_motion < MOTION_THRESHOLD * 1.5)
+        return True
+    
+    elif sign_type == 'dynamic':
+        # For generic dynamic signs, we expect some motion
+        if len(motion_history) >= 2:
+            avg_motion = sum(motion_history[-2:]) / 2
+            return bool(avg_motion > MOTION_THRESHOLD * 0.5)
+        return True
+    
+    return True
+
+def legacy_has_iloveyou_fingers(geometry):
+    """Whether the right hand clearly shows the iloveyou hand shape: index and pinky up, thumb out, middle and ring curled"""
+    if not geometry or not geometry.present[1]:
+        return False
+    _, index, middle, ring, pinky = geometry.extension[1]
+    return bool(
+        index > 0.1 and                     # Index clearly extended up
+        pinky > 0.08 and                    # Pinky clearly extended up
+        geometry.thumb_spread[1] > 0.08 and # Thumb clearly extended to side
+        index - middle > 0.05 and           # Middle clearly curled
+        index - ring > 0.05                 # Ring clearly curled
+    )
+
+def legacy_postprocess_prediction(scores, geometry, motion_history, sign_weights, actions=actions, sign_types=SIGN_TYPES):
+    """
+    Turn the model scores for one window into the prediction shown to the user,
+    applying the sign weights, the iloveyou gating and the sign validity checks.
+
+    Args:
+        scores: Model output for the window
+        geometry: FrameGeometry of the newest frame
+        motion_history: Recent per-frame hand motion values
+        sign_weights: Weights to apply; the iloveyou weight is updated in place
+                      like the live worker did
+
+    Returns:
+        tuple: (predicted_action, display_max_score, scores_list, is_valid_sign)
+    """
+    # Get the raw prediction first - before applying any weights
+    raw_max_score = float(np.max(scores))
+    raw_predicted_idx = int(np.argmax(scores))
+    raw_predicted_action = actions[raw_predicted_idx]
+
+    # Add stricter validation for the iloveyou sign
+    # Only apply weight adjustments if the confidence isn't extremely high already
+    if raw_predicted_action == 'iloveyou' and raw_max_score < 0.95:
+        # Check if there's enough finger visibility for iloveyou sign
+        has_sufficient_fingers = legacy_has_iloveyou_fingers(geometry)
+
+        # If we don't have proper finger configuration, reduce the weight further
+        if not has_sufficient_fingers:
+            sign_weights['iloveyou'] = 0.7  # Much lower weight if fingers don't match
+        else:
+            sign_weights['iloveyou'] = 0.85  # Regular reduced weight with good finger config
+
+    # Apply weights to balance sign detection
+    weighted_scores = scores.copy()
+    for i, action in enumerate(actions):
+        weighted_scores[i] *= sign_weights.get(action, 1.0)
+
+    # Get top prediction
+    max_score = float(np.max(weighted_scores))
+    predicted_idx = int(np.argmax(weighted_scores))
+    predicted_action = actions[predicted_idx]
+
+    # Add extra validation for "iloveyou" sign to prevent over-detection
+    if predicted_action == 'iloveyou':
+        # If the raw score for "iloveyou" is very close to other signs, be more skeptical
+        if raw_predicted_action != 'iloveyou' and raw_max_score > 0.65:  # Lower threshold to reject more easily
+            # Use raw prediction instead
+            predicted_action = raw_predicted_action
+            predicted_idx = raw_predicted_idx
+            max_score = raw_max_score
+
+        # Require higher confidence threshold for iloveyou
+        if max_score < CONFIDENCE_THRESHOLD * 1.25:  # Even higher confidence needed (25% more)
+            # Reduce confidence even more
+            max_score *= 0.8  # Further reduce confidence for borderline cases
+
+    # Add protection against invalid predictions
+    if predicted_idx >= len(actions):
+        logger.error(f"Invalid prediction index: {predicted_idx}, max allowed: {len(actions)-1}")
+        # Fall back to highest unweighted score
+        predicted_idx = int(np.argmax(scores))
+        predicted_action = actions[predicted_idx]
+        max_score = float(scores[predicted_idx])
+
+    # Check if the predicted sign is valid based on its type (static vs dynamic)
+    is_valid_sign = legacy_check_sign_validity(predicted_action, geometry, motion_history, sign_types)
+
+    # Add extra validation for "iloveyou" - require near stillness
+    if predicted_action == 'iloveyou' and is_valid_sign:
+        # If there's too much movement, it's probably not a static sign
+        recent_motion = sum(motion_history[-3:]) / 3 if len(motion_history) >= 3 else 0
+        if recent_motion > MOTION_THRESHOLD * 0.5:  # Even stricter motion threshold (reduced from 0.8)
+            is_valid_sign = False
+
+    # Adjust confidence for invalid signs
+    if not is_valid_sign:
+        max_score *= 0.65  # Further reduce confidence for invalid signs (from 0.7)
+
+    # Convert NumPy types to Python types to avoid serialization issues
+    max_score = float(max_score)
+    is_valid_sign = bool(is_valid_sign)
+
+    # Store the original scores for confidence display
+    display_max_score = float(np.max(scores))
+
+    # Copy scores to a regular Python list to avoid NumPy serialization issues
+    scores_list = [float(s) for s in scores]
+
+    return predicted_action, display_max_score, scores_list, is_valid_sign
+
+def synthetic_spec(size, seed=0):
+    """A registry spec of size signs, copies of the signs in signs.json with thresholds shifted by up to 10%"""
+    with open(SIGN_REGISTRY_PATH, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    if size <= len(spec['signs']):
+        spec['signs'] = spec['signs'][:size]
+        return spec
+    rng = np.random.default_rng(seed)
+    base = spec['signs']
+    signs = []
+    for index in range(size):
+        sign = copy.deepcopy(base[index % len(base)])
+        sign['name'] = f"{sign['name']}_{index}"
+        for check in sign.get('checks', []) + [sign['gate']] if 'gate' in sign else sign.get('checks', []):
+            check['conditions'] = [[expression, comparison, value * rng.uniform(0.9, 1.1)]
+                                   for expression, comparison, value in check.get('conditions', [])]
+        signs.append(sign)
+    spec['signs'] = signs
+    return spec
+
+def synthetic_scores(count, classes, seed=0):
+    """Softmax-like score vectors, from flat to confident, with every class on top"""
+    rng = np.random.default_rng(seed)
+    scores = rng.dirichlet(np.full(classes, 0.3), count).astype(np.float32)
+    # Confident predictions of each class, around the gates' 0.95
+    for index in range(0, count, 4):
+        top = index // 4 % classes
+        scores[index] *= 0.05 / scores[index].sum()
+        scores[index, top] = rng.uniform(0.85, 1.0)
+        scores[index] /= scores[index].sum()
+    return scores
+
+def check_equivalence(frames, scores):
+    """
+    Run the old and new post-processing on every frame with every motion
+    history and score vector, carrying the old code's weights across calls
+    like the live worker did
+
+    Returns:
+        dict: The number of predictions compared and differing
+    """
+    geometries = [FrameGeometry(frames[0])]
+    for keypoints in frames[1:]:
+        geometries.append(FrameGeometry(keypoints, previous=geometries[-1]))
+
+    sign_weights = dict(SIGN_WEIGHTS)
+    compared = mismatches = 0
+    for geometry in geometries:
+        for history in MOTION_HISTORIES:
+            for window_scores in scores:
+                old = legacy_postprocess_prediction(window_scores, geometry, history, sign_weights)
+                new = postprocess_prediction(window_scores, geometry, history)
+                compared += 1
+                mismatches += (old[0], old[1], old[3]) != (new[0], new[1], new[3])
+    return {'predictions': compared, 'mismatches': mismatches}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sign registry post-processing against the code it replaced")
+    parser.add_argument('--sizes', type=int, nargs='*', default=[3, 30, 300, 1000], help="Vocabulary sizes to time")
+    parser.add_argument('--frames', type=int, default=200, help="Synthetic frames to check and time on")
+    parser.add_argument('--iterations', type=int, default=200, help="Minimum timed calls per measurement")
+    parser.add_argument('--min-seconds', type=float, default=0.5, help="Minimum time spent per measurement")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    frames = shaped_frames(args.frames)
+    equivalence = check_equivalence(frames, synthetic_scores(64, len(actions)))
+    print(f"Checked {equivalence['predictions']} predictions: {equivalence['mismatches']} differ")
+
+    geometries = [FrameGeometry(keypoints) for keypoints in frames]
+    history = MOTION_HISTORIES[1]
+    report = {'equivalence': equivalence, 'sizes': {}}
+    # "decision" leaves out copying the scores into the list sent to the
+    # browser, the one part that has to grow with the vocabulary
+    print(f"\n{'signs':>6}{'before ms':>12}{'after ms':>11}{'speedup':>9}{'decision ms':>14}")
+    for size in args.sizes:
+        spec = synthetic_spec(size)
+        registry = SignRegistry(spec, MOTION_THRESHOLD)
+        sign_weights = {sign.name: sign.weight for sign in registry.signs}
+        sign_types = {sign.name: sign.type for sign in registry.signs}
+        inputs = list(zip(synthetic_scores(len(geometries), size), geometries))
+
+        before = time_stage(lambda item: legacy_postprocess_prediction(
+            item[0], item[1], history, sign_weights, registry.names, sign_types), inputs,
+            args.iterations, args.min_seconds)
+        after = time_stage(lambda item: postprocess_prediction(item[0], item[1], history, registry), inputs,
+                           args.iterations, args.min_seconds)
+        decision = time_stage(lambda item: registry.postprocess(item[0], item[1], history), inputs,
+                              args.iterations, args.min_seconds)
+        report['sizes'][size] = {'before': before, 'after': after, 'decision': decision}
+        print(f"{size:>6}{before['median_ms']:>12.4f}{after['median_ms']:>11.4f}"
+              f"{before['median_ms'] / after['median_ms']:>8.1f}x{decision['median_ms']:>14.4f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+
+from benchmark_pipeline import create_holistic, recorded_data_urls, synthetic_frame, synthetic_keypoints, time_stage, to_data_url
+from evaluate_model import evaluate, load_dataset, load_model
+from frame_pipeline import decode_data_url, decode_frame, to_rgb
+from recognition_logic import KEYPOINT_LAYOUTS, KeypointResults, extract_keypoints, get_layout
+
+# Compares keypoint layouts on accuracy and latency. Each model is given as
+# layout=path, e.g. after running train_layout_model.py:
+#   python compare_layouts.py MP_Data --recordings recordings \
+#       --model full=tfjs_model/model.json --model pose_hands=tfjs_model_pose_hands/model.json
+# Detector timings need frames with a person in them to be meaningful, so pass
+# session recordings (see session_recorder.py); synthetic frames only give a lower bound.
+
+def default_models():
+    """The tfjs models on disk for each layout: tfjs_model for full, tfjs_model_<layout> for the others"""
+    models = {}
+    for name in KEYPOINT_LAYOUTS:
+        path = 'tfjs_model/model.json' if name == 'full' else f'tfjs_model_{name}/model.json'
+        if os.path.exists(path):
+            models[name] = path
+    return models
+
+def create_pose_hands():
+    """A PoseHandsDetector, or None if MediaPipe's solutions API is unavailable"""
+    try:
+        from frame_pipeline import PoseHandsDetector
+        return PoseHandsDetector()
+    except (ImportError, AttributeError):
+        return None
+
+def time_detectors(data_urls, iterations, min_seconds):
+    """Median per-frame time of Holistic and of the pose and hands models, None where unavailable"""
+    rgb_frames = [to_rgb(decode_frame(decode_data_url(url)[1])) for url in data_urls]
+    timings = {}
+    for name, detector in (('holistic', create_holistic()), ('pose_hands', create_pose_hands())):
+        timings[name] = time_stage(detector.process, rgb_frames, iterations, min_seconds)['median_ms'] if detector else None
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare keypoint layouts on accuracy and latency")
+    parser.add_argument('paths', nargs='+', help="Full-layout .npy/.npz recordings or directories of them")
+    parser.add_argument('--model', action='append', default=[], metavar='LAYOUT=PATH',
+                        help="Model for a layout (.json tfjs or .h5); repeat for each layout")
+    parser.add_argument('--recordings', nargs='*', default=[], help="Session recordings to time the detectors on")
+    parser.add_argument('--batch-size', type=int, default=256, help="Windows per model call when evaluating")
+    parser.add_argument('--stride', type=int, default=1, help="Frames between windows cut from longer recordings")
+    parser.add_argument('--fps', type=float, default=20.0, help="Frame rate used to time the sign decoder")
+    parser.add_argument('--iterations', type=int, default=50, help="Minimum timed calls per latency measurement")
+    parser.add_argument('--min-seconds', type=float, default=0.5, help="Minimum time spent per latency measurement")
+    parser.add_argument('--json', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    models = default_models()
+    for entry in args.model:
+        name, _, path = entry.partition('=')
+        get_layout(name)
+        models[name] = path
+    if not models:
+        parser.error("No models found; pass --model LAYOUT=PATH")
+
+    windows, labels, streams = load_dataset(args.paths, args.stride)
+    print(f"Loaded {len(windows)} windows in {streams.max() + 1} streams")
+
+    data_urls = recorded_data_urls(args.recordings, limit=100) if args.recordings else []
+    if not data_urls:
+        print("Timing detectors on synthetic frames without a person; pass --recordings for realistic numbers")
+        data_urls = [to_data_url(synthetic_frame(seed=seed)) for seed in range(4)]
+    detector_ms = time_detectors(data_urls, args.iterations, args.min_seconds)
+
+    results = [KeypointResults(synthetic_keypoints(seed)) for seed in range(8)]
+    report = {'detector_ms': detector_ms, 'layouts': {}}
+    for name, path in models.items():
+        layout = get_layout(name)
+        model = load_model(path)
+        if model.input_shape[-1] != layout.size:
+            parser.error(f"{path} expects {model.input_shape[-1]} features per frame, but layout {name} has {layout.size}")
+
+        metrics = evaluate(model, windows, labels, streams, args.batch_size, args.fps, layout)
+        # The live server predicts one window at a time
+        window = layout.select(windows[:1])
+        metrics['model_ms'] = time_stage(lambda w: model.predict(w, verbose=0), [window],
+                                         args.iterations, args.min_seconds)['median_ms']
+        metrics['extract_keypoints_ms'] = time_stage(lambda r: extract_keypoints(r, layout), results,
+                                                     args.iterations, args.min_seconds)['median_ms']
+        metrics['detector_ms'] = detector_ms['holistic' if layout.uses_face_mesh else 'pose_hands']
+        metrics['model'] = path
+        report['layouts'][name] = metrics
+
+    def ms(value):
+        return f"{value:.2f}" if value is not None else '-'
+
+    print(f"\n{'layout':<18}{'features':>9}{'accuracy':>10}{'raw acc':>9}{'streams':>9}"
+          f"{'model ms':>10}{'extract ms':>12}{'detect ms':>11}")
+    for name, metrics in report['layouts'].items():
+        print(f"{name:<18}{metrics['features']:>9}{metrics['accuracy']:>10.3f}{metrics['raw_accuracy']:>9.3f}"
+              f"{metrics['stream_detection_rate']:>9.3f}{ms(metrics['model_ms']):>10}"
+              f"{ms(metrics['extract_keypoints_ms']):>12}{ms(metrics['detector_ms']):>11}")
+    if None in detector_ms.values():
+        print("\nDetector timings marked '-' need MediaPipe's solutions API")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote report to {args.json}")
+
+if __name__ == '__main__':
+    main()
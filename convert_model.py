@@ -1,22 +1,96 @@
+import argparse
+import json
 import tensorflow as tf
 import tensorflowjs as tfjs
 import os
 
-def main():
+from tfjs_artifacts import QUANTIZATION_DTYPES, accuracy_report, format_report, report_windows, write_variants
+from tflite_artifacts import (
+    TFLITE_QUANTIZATIONS, calibration_windows, fastest_within, format_quantization_report, labels_of,
+    quantization_report, split_calibration, write_tflite_variants
+)
+
+def convert(model_path='action.h5', output_dir='tfjs_model', variants=QUANTIZATION_DTYPES):
+    """
+    Convert a Keras .h5 model to TensorFlow.js format in output_dir, with
+    content-hashed weight shards and a quantized variant next to it for each
+    dtype in variants (output_dir_float16, output_dir_uint8)
+
+    Returns:
+        tuple: (the Keras model, dict of variant name -> model.json path)
+    """
     # Create output directory if it doesn't exist
-    output_dir = 'tfjs_model'
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
     # Load the Keras model
-    print("Loading Keras model...")
-    model = tf.keras.models.load_model('action.h5')
+    print(f"Loading Keras model {model_path}...")
+    model = tf.keras.models.load_model(model_path)
 
     # Convert and save the model
     print("Converting model to TensorFlow.js format...")
     tfjs.converters.save_keras_model(model, output_dir)
+    models = write_variants(output_dir, variants)
 
     print(f"Model converted and saved to {output_dir}")
+    return model, models
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a Keras model to TensorFlow.js")
+    parser.add_argument('--model', default='action.h5', help="Keras .h5 model to convert")
+    parser.add_argument('--output', default='tfjs_model', help="Directory for model.json and its weights")
+    parser.add_argument('--variants', nargs='*', default=list(QUANTIZATION_DTYPES), choices=QUANTIZATION_DTYPES,
+                        help="Quantized variants to write next to the float32 model")
+    parser.add_argument('--data', nargs='*',
+                        help="Report each variant's accuracy against the Keras model on these recordings "
+                             "(synthetic frames, without accuracy, if given no paths)")
+    parser.add_argument('--report', help="Also write the accuracy report to this JSON file")
+    parser.add_argument('--tflite', nargs='*', choices=TFLITE_QUANTIZATIONS,
+                        help="Also write TensorFlow Lite models: float32 and these quantized variants "
+                             "(all of them if given none)")
+    parser.add_argument('--tflite-output', default='tflite_model', help="Directory for the .tflite files")
+    parser.add_argument('--calibration', nargs='*',
+                        help="Recordings to calibrate full_integer quantization on "
+                             "(default: recordings held out of --data)")
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01,
+                        help="Accuracy a TensorFlow Lite variant may lose, overall and per sign, to be recommended")
+    parser.add_argument('--tflite-report', help="Also write the TensorFlow Lite accuracy and latency report here")
+    args = parser.parse_args()
+    model, models = convert(args.model, args.output, args.variants)
+    features = model.input_shape[-1]
+
+    if args.data is not None:
+        windows, labels, streams = report_windows(args.data, features)
+        report = accuracy_report(model, models, windows, labels)
+        print(format_report(report))
+        if args.report:
+            with open(args.report, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    if args.tflite is not None:
+        quantizations = args.tflite or TFLITE_QUANTIZATIONS
+        if args.calibration is not None:
+            calibration, calibration_labels, _ = report_windows(args.calibration, features)
+        elif args.data is not None:
+            # Calibrate on recordings the TensorFlow Lite report then leaves out
+            calibration_mask, report_mask = split_calibration(streams)
+            calibration, calibration_labels = windows[calibration_mask], labels_of(labels, calibration_mask)
+            windows, labels = windows[report_mask], labels_of(labels, report_mask)
+        else:
+            print("No --calibration or --data given: calibrating on synthetic keypoints")
+            calibration, calibration_labels, _ = report_windows(None, features)
+        tflite_models = write_tflite_variants(model, args.tflite_output, quantizations,
+                                              calibration_windows(calibration, calibration_labels))
+
+        if args.data is not None:
+            report = quantization_report(model, tflite_models, windows, labels, num_threads=2)
+            print(format_quantization_report(report))
+            if labels is not None:
+                best = fastest_within(report, args.max_accuracy_drop)
+                print(f"Fastest within {args.max_accuracy_drop:.2%} accuracy: {best or 'none'}")
+            if args.tflite_report:
+                with open(args.tflite_report, 'w') as f:
+                    json.dump(report, f, indent=2)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
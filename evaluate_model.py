@@ -0,0 +1,296 @@
+import argparse
+import glob
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from recognition_logic import (
+    SIGNS, actions, english_labels, KEYPOINT_SIZE, KEYPOINT_LAYOUTS, FULL_LAYOUT, CONFIDENCE_THRESHOLD,
+    get_layout, FrameGeometry, keypoint_motion, postprocess_prediction, add_to_sentence
+)
+from sign_decoder import StreamingSignDecoder, decode_streams
+
+# Frames per model window, as collected by app.py
+SEQUENCE_LENGTH = 30
+
+def load_model(path):
+    """Load a Keras .h5 model, a tfjs model.json evaluated with numpy, or a .tflite model"""
+    if path.endswith('.json'):
+        from tfjs_numpy_model import NumpyLayersModel
+        return NumpyLayersModel(path)
+    if path.endswith('.tflite'):
+        from tflite_model import TFLiteModel
+        return TFLiteModel(path)
+    import tensorflow as tf
+    return tf.keras.models.load_model(path)
+
+def label_index(label):
+    """Map an integer, English or Tagalog label to its index in actions"""
+    if isinstance(label, (int, np.integer)):
+        return int(label)
+    label = str(label)
+    label = english_labels.get(label, label)
+    if label not in actions:
+        raise ValueError(f"Unknown label {label!r}, expected one of {actions}")
+    return actions.index(label)
+
+def windows_from_sequence(sequence, stride):
+    """Cut a (frames, 1662) recording into 30-frame windows every stride frames"""
+    if len(sequence) < SEQUENCE_LENGTH:
+        return []
+    return [sequence[start:start + SEQUENCE_LENGTH]
+            for start in range(0, len(sequence) - SEQUENCE_LENGTH + 1, stride)]
+
+def load_shard(path, default_label=None):
+    """
+    Load one .npz or .npy shard
+
+    .npz shards hold 'sequences' (or 'X') of shape (n, frames, 1662) or
+    (frames, 1662) and 'labels' (or 'y') with one label per sequence.
+    .npy shards hold a single array of either shape; their label comes from
+    the name of the folder they are in (e.g. MP_Data/hello/...).
+
+    Returns:
+        list of (sequences, labels) where each sequence is (frames, 1662)
+    """
+    if path.endswith('.npz'):
+        with np.load(path, allow_pickle=False) as data:
+            sequences = data['sequences'] if 'sequences' in data else data['X']
+            labels = data['labels'] if 'labels' in data else data['y']
+        if sequences.ndim == 2:
+            sequences = sequences[np.newaxis]
+            labels = np.atleast_1d(labels)
+    else:
+        sequences = np.load(path, allow_pickle=False)
+        if sequences.ndim == 2:
+            sequences = sequences[np.newaxis]
+        labels = [default_label] * len(sequences)
+
+    if sequences.shape[-1] != KEYPOINT_SIZE:
+        raise ValueError(f"{path}: expected {KEYPOINT_SIZE} keypoints per frame, got shape {sequences.shape}")
+    return list(zip(sequences.astype(np.float32), labels))
+
+def folder_label(path):
+    """Find the sign label in the folders of a path, e.g. MP_Data/hello/3/0.npy"""
+    for part in reversed(os.path.normpath(os.path.dirname(path)).split(os.sep)):
+        if english_labels.get(part, part) in actions:
+            return part
+    return None
+
+def load_dataset(paths, stride):
+    """
+    Load every shard under the given files and directories into windows
+
+    Per-frame .npy files (shape (1662,), as in the MP_Data training layout)
+    are stacked into one recording per folder in numeric file order.
+
+    Returns:
+        tuple: (windows array (n, 30, 1662), label indices (n,), stream ids (n,))
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '**', '*.np[yz]'), recursive=True)))
+        else:
+            files.append(path)
+
+    recordings = []
+    frame_files = {}
+    for path in files:
+        if path.endswith('.npy'):
+            array = np.load(path, mmap_mode='r')
+            if array.ndim == 1:
+                frame_files.setdefault(os.path.dirname(path), []).append(path)
+                continue
+        for sequence, label in load_shard(path, folder_label(path)):
+            recordings.append((path, sequence, label))
+
+    for folder, paths_in_folder in sorted(frame_files.items()):
+        paths_in_folder.sort(key=lambda p: int(os.path.splitext(os.path.basename(p))[0])
+                             if os.path.splitext(os.path.basename(p))[0].isdigit() else 0)
+        sequence = np.stack([np.load(p) for p in paths_in_folder]).astype(np.float32)
+        recordings.append((folder, sequence, folder_label(paths_in_folder[0])))
+
+    windows, labels, streams = [], [], []
+    previous_key = None
+    stream = -1
+    for source, sequence, label in recordings:
+        if label is None:
+            raise ValueError(f"No label for {source}; put it in a folder named after the sign or use .npz labels")
+        index = label_index(label)
+        # Consecutive windows of the same sign from the same shard form one stream,
+        # like a signer holding the sign in front of the camera
+        if (source, index) != previous_key:
+            stream += 1
+            previous_key = (source, index)
+        for window in windows_from_sequence(sequence, stride):
+            windows.append(window)
+            labels.append(index)
+            streams.append(stream)
+
+    if not windows:
+        raise ValueError("No windows of 30 frames found in the given paths")
+    return np.stack(windows), np.array(labels), np.array(streams)
+
+def postprocess_windows(windows, scores, layout=FULL_LAYOUT):
+    """
+    Apply the live post-processing to every window's scores. Windows are
+    in the given keypoint layout.
+
+    Returns:
+        list of (predicted_action, display_max_score, scores_list, is_valid_sign)
+    """
+    predictions = []
+    for window, window_scores in zip(windows, scores):
+        # app.py keeps the motion of the last 10 frames
+        motion_history = [float(m) for m in keypoint_motion(window[-11:], layout)[1:]]
+        predictions.append(postprocess_prediction(
+            window_scores, FrameGeometry(window[-1], layout), motion_history))
+    return predictions
+
+def simulate_sentences(predictions, streams, fps):
+    """
+    Run each stream's predictions through the sign decoder, as if each
+    stream were a client sending one window per frame at the given frame
+    rate; all streams are decoded together, one batched update per frame.
+    The decoder gets the weighted and gated scores in the predictions, as in app.py.
+
+    Returns:
+        dict of stream id -> list of signs added to the sentence
+    """
+    stream_scores = {}
+    for (_, _, scores, _), stream in zip(predictions, streams):
+        stream_scores.setdefault(int(stream), []).append(scores)
+    decoder = StreamingSignDecoder(SIGNS, enter_threshold=CONFIDENCE_THRESHOLD)
+    events = decode_streams(decoder, {stream: np.array(scores) for stream, scores in stream_scores.items()}, fps)
+
+    emitted = {}
+    for stream, stream_events in events.items():
+        # Unbounded so every sign emitted during the stream is counted
+        buffer = {'sentence': deque()}
+        for event in stream_events:
+            add_to_sentence(buffer, event.sign)
+        if buffer['sentence']:
+            emitted[stream] = list(buffer['sentence'])
+    return emitted
+
+def confusion_matrix(true, predicted, classes):
+    matrix = np.zeros((classes, classes), dtype=int)
+    for t, p in zip(true, predicted):
+        matrix[t, p] += 1
+    return matrix
+
+def per_class_metrics(matrix):
+    """Precision and recall per class from a confusion matrix"""
+    metrics = {}
+    for i, action in enumerate(actions):
+        predicted = matrix[:, i].sum()
+        actual = matrix[i].sum()
+        metrics[action] = {
+            'precision': float(matrix[i, i] / predicted) if predicted else None,
+            'recall': float(matrix[i, i] / actual) if actual else None,
+            'support': int(actual)
+        }
+    return metrics
+
+def format_matrix(matrix):
+    width = max(len(action) for action in actions) + 2
+    lines = [' ' * width + ''.join(action.rjust(width) for action in actions)]
+    for action, row in zip(actions, matrix):
+        lines.append(action.ljust(width) + ''.join(str(count).rjust(width) for count in row))
+    return '\n'.join(lines)
+
+def evaluate(model, windows, labels, streams, batch_size, fps, layout=FULL_LAYOUT):
+    """
+    Run the model and the post-processing over all windows and collect the metrics
+
+    windows are full-layout keypoints; the model is fed the given layout's features.
+    """
+    windows = layout.select(windows)
+    start = time.time()
+    scores = model.predict(windows, batch_size=batch_size, verbose=0)
+    inference_seconds = time.time() - start
+
+    start = time.time()
+    predictions = postprocess_windows(windows, scores, layout)
+    postprocess_seconds = time.time() - start
+
+    raw = np.argmax(scores, axis=1)
+    final = np.array([actions.index(action) for action, _, _, _ in predictions])
+    valid = np.array([is_valid for _, _, _, is_valid in predictions])
+    raw_matrix = confusion_matrix(labels, raw, len(actions))
+    final_matrix = confusion_matrix(labels, final, len(actions))
+
+    emitted = simulate_sentences(predictions, streams, fps)
+    stream_labels = {int(stream): int(label) for stream, label in zip(streams, labels)}
+    detected = sum(1 for stream, label in stream_labels.items() if actions[label] in emitted.get(stream, []))
+    false_signs = sum(1 for stream, signs in emitted.items()
+                      for sign in signs if sign != actions[stream_labels[stream]])
+
+    total_seconds = inference_seconds + postprocess_seconds
+    return {
+        'layout': layout.name,
+        'features': layout.size,
+        'windows': int(len(windows)),
+        'streams': len(stream_labels),
+        'raw_accuracy': float((raw == labels).mean()),
+        'accuracy': float((final == labels).mean()),
+        'valid_sign_rate': float(valid.mean()),
+        'valid_correct_rate': float(((final == labels) & valid).mean()),
+        'per_class': per_class_metrics(final_matrix),
+        'raw_confusion': raw_matrix.tolist(),
+        'confusion': final_matrix.tolist(),
+        'stream_detection_rate': detected / len(stream_labels),
+        'false_signs_emitted': false_signs,
+        'inference_windows_per_sec': len(windows) / inference_seconds if inference_seconds else None,
+        'postprocess_windows_per_sec': len(windows) / postprocess_seconds if postprocess_seconds else None,
+        'windows_per_sec': len(windows) / total_seconds if total_seconds else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the sign model and post-processing on recorded keypoints")
+    parser.add_argument('paths', nargs='+', help=".npy/.npz shards or directories of them")
+    parser.add_argument('--model', default='tfjs_model/model.json',
+                        help="Keras .h5 model, .tflite model, or a tfjs model.json run with numpy (default)")
+    parser.add_argument('--layout', default='full', choices=list(KEYPOINT_LAYOUTS),
+                        help="Keypoint layout the model was trained on")
+    parser.add_argument('--batch-size', type=int, default=256, help="Windows per model call")
+    parser.add_argument('--stride', type=int, default=1, help="Frames between windows cut from longer recordings")
+    parser.add_argument('--fps', type=float, default=20.0,
+                        help="Frame rate used to time the sign decoder (index.html sends about 20)")
+    parser.add_argument('--json', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    windows, labels, streams = load_dataset(args.paths, args.stride)
+    print(f"Loaded {len(windows)} windows in {streams.max() + 1} streams")
+
+    model = load_model(args.model)
+    layout = get_layout(args.layout)
+    if model.input_shape[-1] != layout.size:
+        parser.error(f"{args.model} expects {model.input_shape[-1]} features per frame, "
+                     f"but layout {layout.name} has {layout.size}")
+    report = evaluate(model, windows, labels, streams, args.batch_size, args.fps, layout)
+
+    print(f"Raw accuracy:            {report['raw_accuracy']:.3f}")
+    print(f"Post-processed accuracy: {report['accuracy']:.3f}")
+    print(f"Valid sign rate:         {report['valid_sign_rate']:.3f}")
+    print(f"Streams detected:        {report['stream_detection_rate']:.3f} ({report['false_signs_emitted']} wrong signs emitted)")
+    print(f"Windows/sec:             {report['windows_per_sec']:.0f} "
+          f"(model {report['inference_windows_per_sec']:.0f}, post-processing {report['postprocess_windows_per_sec']:.0f})")
+    print("\nConfusion (rows: true sign, columns: predicted sign)")
+    print(format_matrix(np.array(report['confusion'])))
+    for action, metrics in report['per_class'].items():
+        precision = f"{metrics['precision']:.3f}" if metrics['precision'] is not None else '-'
+        recall = f"{metrics['recall']:.3f}" if metrics['recall'] is not None else '-'
+        print(f"{action:>10}: precision {precision}, recall {recall}, support {metrics['support']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote report to {args.json}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+import threading
+import time
+
+from recognition_logic import MAX_EMPTY_FRAMES, MOTION_THRESHOLD
+
+# Flow control for /predict. The browser sends its next frame no sooner than
+# the interval the last response asked for, so the server decides how many
+# frames each client sends: fewer while its signer is idle, and fewer for
+# idle clients when the server can't keep up. The model reads 30-frame windows
+# recorded at the page's full rate, so a signing client is only ever slowed
+# down a little, and its window starts over from its last few frames when it
+# picks up after a slow stretch rather than spanning seconds of idle frames.
+
+class FramePacer:
+    """
+    Works out how long each client should wait before sending its next frame.
+
+    A client's own pace follows its signer: full rate while the hands move or
+    a sign is being tracked, a slower rate once the hands have been still for
+    longer than a static sign is held, and a trickle while no hands are in
+    view, just enough to notice them coming back. Frames from all clients go through one detector, so if the frames
+    the active clients would send at their own pace take longer to process
+    than there is time for, every client is slowed down by the same factor.
+    Windows piling up in front of the prediction worker slow them down too.
+    Clients at the signing pace are slowed down to max_signing_interval_ms
+    at most, so their windows stay close to the span the model was trained on.
+    """
+
+    def __init__(self, min_interval_ms=50, idle_interval_ms=150, absent_interval_ms=500, max_interval_ms=1000,
+                 max_signing_interval_ms=75, still_motion=MOTION_THRESHOLD / 2, still_frames=5, hold_seconds=1.5,
+                 restart_keep_frames=10, headroom=1.25, active_seconds=2.0, smoothing=0.1):
+        """
+        Args:
+            min_interval_ms: Interval while signing, the page's full rate
+            idle_interval_ms: Interval while the hands are in view but still
+            absent_interval_ms: Interval while no hands are in view
+            max_interval_ms: Longest interval ever asked for, however loaded the server is
+            max_signing_interval_ms: Longest interval asked of a client while signing
+            still_motion: Hand motion per frame below which the hands count as still
+            still_frames: Consecutive still frames before the hands count as still
+            hold_seconds: How long still hands in view keep the signing rate, as they may be
+                          holding a static sign; by default a 30-frame window at 50 ms
+            restart_keep_frames: Most recent frames kept when a client's window starts over
+            headroom: Spare capacity kept, as a factor on the measured processing time
+            active_seconds: Clients that sent no frame for this long no longer count towards the load
+            smoothing: Weight of each new timing in the moving averages
+        """
+        self.min_interval_ms = min_interval_ms
+        self.idle_interval_ms = idle_interval_ms
+        self.absent_interval_ms = absent_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.max_signing_interval_ms = max(min_interval_ms, max_signing_interval_ms)
+        self.still_motion = still_motion
+        self.still_frames = still_frames
+        self.hold_seconds = hold_seconds
+        self.restart_keep_frames = restart_keep_frames
+        self.headroom = headroom
+        self.active_seconds = active_seconds
+        self.smoothing = smoothing
+        self.clients = {}  # client id -> (time of its last frame, its own interval, interval asked of it) in ms
+        self.still_since = {}  # client id -> time its hands went still, while they are
+        self.request_seconds = None  # Moving average of the time to answer /predict
+        self.prediction_seconds = None  # Moving average of the prediction worker's time per window
+        self.load_factor = 1.0
+        self.lock = threading.Lock()
+
+    def _average(self, average, value):
+        return value if average is None else average + self.smoothing * (value - average)
+
+    def observe_request(self, seconds):
+        """Record how long a /predict request took"""
+        with self.lock:
+            self.request_seconds = self._average(self.request_seconds, seconds)
+
+    def observe_prediction(self, seconds):
+        """Record how long the prediction worker spent on a window"""
+        with self.lock:
+            self.prediction_seconds = self._average(self.prediction_seconds, seconds)
+
+    def client_interval(self, client_id, buffer, now=None):
+        """The interval in ms a client's signer calls for, whatever the server load"""
+        now = time.monotonic() if now is None else now
+        still = False
+        if buffer['empty_frame_counter'] == 0 and buffer['current_action'] is None:
+            recent = list(buffer['motion_history'])[-self.still_frames:]
+            still = len(recent) == self.still_frames and max(recent) < self.still_motion
+        with self.lock:
+            if not still:
+                self.still_since.pop(client_id, None)
+                since = now
+            else:
+                since = self.still_since.setdefault(client_id, now)
+        if buffer['empty_frame_counter'] > MAX_EMPTY_FRAMES * 2:
+            return self.absent_interval_ms
+        if still and now - since >= self.hold_seconds:
+            return self.idle_interval_ms
+        return self.min_interval_ms
+
+    def restart_window(self, client_id, buffer, now=None):
+        """
+        Cut a client's buffered frames down to the last restart_keep_frames
+        when its signer calls for the signing rate again after frames were
+        asked for slower than signing allows, or after it sent none for a
+        while. Call it once the new frame's motion and empty frame count are
+        in the buffer, before the frame is added to the window, so its next
+        window is mostly frames at the signing rate.
+
+        Returns:
+            bool: True if frames were dropped
+        """
+        if self.client_interval(client_id, buffer, now) != self.min_interval_ms:
+            return False
+        with self.lock:
+            last = self.clients.get(client_id)
+        if last is not None and last[2] <= self.max_signing_interval_ms:
+            return False
+        frames = buffer['frames']
+        if len(frames) <= self.restart_keep_frames:
+            return False
+        for _ in range(len(frames) - self.restart_keep_frames):
+            frames.popleft()
+        return True
+
+    def _load_factor(self, queue_depth, now):
+        """How much slower than their own pace all clients need to go, at least 1"""
+        for client_id, (last_seen, _, _) in list(self.clients.items()):
+            if now - last_seen > self.active_seconds:
+                del self.clients[client_id]
+                self.still_since.pop(client_id, None)
+        frames_per_second = sum(1000 / interval for _, interval, _ in self.clients.values())
+        seconds_per_frame = max(self.request_seconds or 0, self.prediction_seconds or 0)
+        factor = max(1.0, frames_per_second * seconds_per_frame * self.headroom)
+        # Each client has at most one window waiting unless the worker is falling behind
+        if self.clients and queue_depth > len(self.clients):
+            factor *= queue_depth / len(self.clients)
+        return factor
+
+    def target_interval(self, client_id, buffer, queue_depth, now=None):
+        """
+        The interval the client should wait before sending its next frame
+
+        Args:
+            client_id: The client the frame came from
+            buffer: The client's sequence buffer, after the frame was added
+            queue_depth: Windows waiting for the prediction worker
+            now: Current time.monotonic(), for testing
+
+        Returns:
+            int: Interval in milliseconds
+        """
+        now = time.monotonic() if now is None else now
+        own_interval = self.client_interval(client_id, buffer, now)
+        with self.lock:
+            self.clients[client_id] = (now, own_interval, own_interval)
+            self.load_factor = self._load_factor(queue_depth, now)
+            interval = own_interval * self.load_factor
+            if own_interval == self.min_interval_ms:
+                interval = min(interval, self.max_signing_interval_ms)
+            interval = int(round(min(interval, self.max_interval_ms)))
+            self.clients[client_id] = (now, own_interval, interval)
+        return interval
+
+    def forget(self, client_id):
+        """Stop counting a client towards the load"""
+        with self.lock:
+            self.clients.pop(client_id, None)
+            self.still_since.pop(client_id, None)
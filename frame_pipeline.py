@@ -0,0 +1,301 @@
+import base64
+import cv2
+import numpy as np
+
+# The image stages of /predict: decoding the frame the browser sent, cropping
+# it to the signer, drawing the overlay and encoding the annotated frame sent back.
+
+# cv2.imdecode flags that decode a JPEG straight to 1/2, 1/4 or 1/8 size,
+# skipping most of the work of a full decode
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+# Holistic results fields holding normalized landmarks
+LANDMARK_FIELDS = ('pose_landmarks', 'face_landmarks', 'left_hand_landmarks', 'right_hand_landmarks')
+
+def decode_data_url(data_url):
+    """
+    Split an image data URL into its prefix and decoded bytes
+
+    Returns:
+        tuple: (prefix such as "data:image/jpeg;base64", image bytes)
+    """
+    prefix, image_data = data_url.split(',', 1)
+    return prefix, base64.b64decode(image_data)
+
+def decode_frame(image_bytes, reduction=1):
+    """
+    Decode JPEG/PNG bytes into a BGR frame
+
+    Args:
+        image_bytes: The encoded image
+        reduction: 1 for full size, or 2, 4 or 8 to decode at that fraction of the size
+    """
+    if reduction not in REDUCED_DECODE_FLAGS:
+        raise ValueError(f"Unsupported decode reduction {reduction}, expected one of {sorted(REDUCED_DECODE_FLAGS)}")
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    return cv2.imdecode(nparr, REDUCED_DECODE_FLAGS[reduction])
+
+def to_rgb(frame):
+    """Convert a BGR frame to RGB for MediaPipe"""
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+def crop(frame, roi):
+    """The part of the frame inside roi (x0, y0, x1, y1 in pixels), or the whole frame if roi is None"""
+    if roi is None:
+        return frame
+    x0, y0, x1, y1 = roi
+    return frame[y0:y1, x0:x1]
+
+def map_landmarks_to_frame(results, roi, frame_shape):
+    """
+    Map landmarks detected on a crop back to normalized coordinates of the
+    full frame, in place, so they match a detection on the whole frame
+
+    Args:
+        results: Holistic results (or KeypointResults) from the cropped image
+        roi: The crop (x0, y0, x1, y1) in pixels, or None if the full frame was used
+        frame_shape: Shape of the full frame
+
+    Returns:
+        The same results object
+    """
+    if roi is None:
+        return results
+    height, width = frame_shape[:2]
+    x0, y0, x1, y1 = roi
+    scale_x = (x1 - x0) / width
+    scale_y = (y1 - y0) / height
+    offset_x = x0 / width
+    offset_y = y0 / height
+    for field in LANDMARK_FIELDS:
+        landmarks = getattr(results, field, None)
+        if not landmarks:
+            continue
+        for landmark in landmarks.landmark:
+            landmark.x = landmark.x * scale_x + offset_x
+            landmark.y = landmark.y * scale_y + offset_y
+            # MediaPipe scales depth like x
+            landmark.z = landmark.z * scale_x
+    return results
+
+class RoiTracker:
+    """
+    Follows one signer's upper body and hands from frame to frame, so
+    detection can run on a padded crop around them instead of the whole frame.
+
+    The crop comes from the previous frame's landmarks (already mapped back
+    to the full frame). It is kept while the signer stays well inside it, so
+    it doesn't jitter, and the full frame is used whenever the pose is lost,
+    the crop would cover most of the frame anyway, or every refresh_interval
+    frames to pick up hands that entered outside the crop.
+
+    Holistic in tracking mode seeds each frame from the previous one's
+    landmarks, which are in the previous crop's coordinates, so the detector
+    has to be reset whenever the crop changes.
+    """
+
+    # Pose landmarks from the face down to the hips, including both arms and hands
+    UPPER_BODY = range(25)
+
+    def __init__(self, padding=0.35, min_visibility=0.3, refresh_interval=30, min_size=96, max_area=0.8):
+        """
+        Args:
+            padding: Margin added around the landmarks, as a fraction of their larger extent
+            min_visibility: Pose landmarks less visible than this are ignored
+            refresh_interval: Frames between full-frame detections
+            min_size: Smallest landmark extent in pixels used for padding
+            max_area: Fraction of the frame above which the full frame is used instead
+        """
+        self.padding = padding
+        self.min_visibility = min_visibility
+        self.refresh_interval = refresh_interval
+        self.min_size = min_size
+        self.max_area = max_area
+        self.roi = None
+        self.frames_since_full = 0
+
+    def next_roi(self):
+        """The crop to run the next detection on, or None for the full frame"""
+        if self.roi is None or self.frames_since_full >= self.refresh_interval:
+            self.frames_since_full = 0
+            return None
+        self.frames_since_full += 1
+        return self.roi
+
+    def _landmark_box(self, results, width, height):
+        """Pixel bounding box (x0, y0, x1, y1) of the upper body and hands, or None without a pose"""
+        if not results or not results.pose_landmarks:
+            return None
+        pose = results.pose_landmarks.landmark
+        points = [(pose[i].x, pose[i].y) for i in self.UPPER_BODY if pose[i].visibility >= self.min_visibility]
+        for hand in (results.left_hand_landmarks, results.right_hand_landmarks):
+            if hand:
+                points.extend((landmark.x, landmark.y) for landmark in hand.landmark)
+        if len(points) < 3:
+            return None
+        points = np.clip(np.array(points, dtype=np.float32), 0.0, 1.0) * (width, height)
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        return x0, y0, x1, y1
+
+    def update(self, results, frame_shape):
+        """Work out the crop for the next frame from this frame's full-frame landmarks"""
+        height, width = frame_shape[:2]
+        box = self._landmark_box(results, width, height)
+        if box is None:
+            self.roi = None
+            return
+
+        x0, y0, x1, y1 = box
+        pad = self.padding * max(x1 - x0, y1 - y0, self.min_size)
+
+        # Keep the current crop while the landmarks stay at least half the padding inside it
+        if self.roi is not None:
+            rx0, ry0, rx1, ry1 = self.roi
+            inner = pad / 2
+            fits = rx0 <= x0 - inner and ry0 <= y0 - inner and rx1 >= x1 + inner and ry1 >= y1 + inner
+            target_area = (x1 - x0 + 2 * pad) * (y1 - y0 + 2 * pad)
+            if fits and (rx1 - rx0) * (ry1 - ry0) <= 1.5 * target_area:
+                return
+
+        roi = (max(0, int(x0 - pad)), max(0, int(y0 - pad)),
+               min(width, int(np.ceil(x1 + pad))), min(height, int(np.ceil(y1 + pad))))
+        if (roi[2] - roi[0]) * (roi[3] - roi[1]) > self.max_area * width * height:
+            self.roi = None
+        else:
+            self.roi = roi
+
+class DetectionResults:
+    """Detection results with the same fields as MediaPipe Holistic results"""
+    __slots__ = ('pose_landmarks', 'face_landmarks', 'left_hand_landmarks', 'right_hand_landmarks')
+
+    def __init__(self, pose_landmarks=None, face_landmarks=None, left_hand_landmarks=None, right_hand_landmarks=None):
+        self.pose_landmarks = pose_landmarks
+        self.face_landmarks = face_landmarks
+        self.left_hand_landmarks = left_hand_landmarks
+        self.right_hand_landmarks = right_hand_landmarks
+
+def assign_hands(pose_landmarks, hands, handedness):
+    """
+    Decide which detected hand is the signer's left and which the right
+
+    Each hand goes to the pose wrist (15 left, 16 right) nearest its own
+    wrist, as Holistic does. Without a pose, MediaPipe's handedness label is
+    used; Hands assumes a mirrored selfie image, so on the unmirrored camera
+    frames the browser sends its "Left" is the signer's right hand.
+
+    Returns:
+        tuple: (left hand landmarks or None, right hand landmarks or None)
+    """
+    left = right = None
+    if pose_landmarks:
+        pose = pose_landmarks.landmark
+        wrists = {'left': (pose[15].x, pose[15].y), 'right': (pose[16].x, pose[16].y)}
+        candidates = []
+        for hand in hands:
+            wrist = hand.landmark[0]
+            for side, (x, y) in wrists.items():
+                candidates.append(((wrist.x - x) ** 2 + (wrist.y - y) ** 2, side, id(hand), hand))
+        # Closest pairs first, each side and each hand used once
+        taken = set()
+        for _, side, hand_id, hand in sorted(candidates, key=lambda c: c[0]):
+            if side in taken or hand_id in taken:
+                continue
+            taken.update((side, hand_id))
+            if side == 'left':
+                left = hand
+            else:
+                right = hand
+        return left, right
+
+    for hand, label in zip(hands, handedness):
+        if label.classification[0].label == 'Left':
+            right = right or hand
+        else:
+            left = left or hand
+    return left, right
+
+class PoseHandsDetector:
+    """
+    Runs only MediaPipe's pose and hand models, for keypoint layouts that
+    don't use the face mesh. process() returns results with the same fields
+    as Holistic, with face_landmarks always None.
+    """
+
+    def __init__(self, min_detection_confidence=0.5, min_tracking_confidence=0.5, model_complexity=0,
+                 static_image_mode=False):
+        import mediapipe as mp
+        self.pose = mp.solutions.pose.Pose(
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            model_complexity=model_complexity,
+            enable_segmentation=False,
+            static_image_mode=static_image_mode
+        )
+        self.hands = mp.solutions.hands.Hands(
+            max_num_hands=2,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            model_complexity=model_complexity,
+            static_image_mode=static_image_mode
+        )
+
+    def process(self, frame_rgb):
+        pose_landmarks = self.pose.process(frame_rgb).pose_landmarks
+        hand_results = self.hands.process(frame_rgb)
+        left, right = assign_hands(pose_landmarks, hand_results.multi_hand_landmarks or [],
+                                   hand_results.multi_handedness or [])
+        return DetectionResults(pose_landmarks, None, left, right)
+
+    def reset(self):
+        """Forget the tracked landmarks, like Holistic's reset(), so the next frame is detected afresh"""
+        self.pose.reset()
+        self.hands.reset()
+
+    def close(self):
+        self.pose.close()
+        self.hands.close()
+
+# Frame height the overlay's positions and font sizes are laid out for; other sizes scale them
+OVERLAY_HEIGHT = 480
+
+def draw_overlay(frame, sentence, predicted_action, max_score, is_valid_sign, motion_value):
+    """Draw the sentence, prediction and motion indicator onto the frame in place"""
+    height, width = frame.shape[:2]
+    scale = height / OVERLAY_HEIGHT
+
+    def px(value):
+        return int(round(value * scale))
+
+    def thickness(value):
+        return max(1, px(value))
+
+    # Add prediction text and background for better visibility
+    cv2.rectangle(frame, (0,0), (width, px(40)), (245, 117, 16), -1)
+    sentence_text = ' '.join(sentence)
+    cv2.putText(frame, sentence_text, (px(3), px(30)),
+               cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), thickness(2), cv2.LINE_AA)
+
+    # Add prediction and confidence
+    prediction_text = f"{predicted_action} ({max_score:.2f})"
+    color = (0, 255, 0) if is_valid_sign else (0, 165, 255)  # Green if valid, orange if not
+    cv2.putText(frame, prediction_text, (max(0, width - px(250)), px(70)),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.7 * scale, color, thickness(2))
+
+    # Add motion indicator (for debugging)
+    motion_text = f"Motion: {motion_value:.4f}"
+    cv2.putText(frame, motion_text, (px(10), height - px(10)),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.5 * scale, (255, 255, 255), thickness(1))
+    return frame
+
+def encode_frame(frame, quality=80):
+    """Encode a frame as a base64 JPEG data URL"""
+    # Convert frame back to base64 with reduced quality
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    frame_base64 = base64.b64encode(buffer).decode('utf-8')
+    return f'data:image/jpeg;base64,{frame_base64}'
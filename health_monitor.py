@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class HealthMonitor:
+    """
+    Probes a set of services concurrently in the background and caches
+    their status, so callers can answer status requests instantly.
+
+    Each probe is a callable returning True when its service is up. The
+    on_change callback is called with the new status only when it changes.
+    """
+
+    def __init__(self, probes, interval=5.0, ttl=15.0, on_change=None):
+        """
+        Args:
+            probes: dict of status name -> probe callable
+            interval: Seconds between background probe rounds
+            ttl: Seconds after which the cached status is considered stale
+            on_change: Called with the status dict whenever it changes
+        """
+        self.probes = probes
+        self.interval = interval
+        self.ttl = ttl
+        self.on_change = on_change
+        self.status = {name: False for name in probes}
+        self.checked_at = 0
+        self.lock = threading.Lock()
+        self.in_flight = None  # Future of the probe round running now, if any
+        self.executor = ThreadPoolExecutor(max_workers=len(probes), thread_name_prefix='health')
+        self.refresh_event = threading.Event()
+        self.thread = None
+        self.is_running = False
+
+    def start(self):
+        """Start the background probing thread if not already running"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        logger.info(f"Started health monitor for {list(self.probes)} every {self.interval}s")
+
+    def _run(self):
+        """Background loop that refreshes the status every interval or on request"""
+        while self.is_running:
+            self.refresh()
+            # Wait for either the normal interval or an immediate refresh request
+            self.refresh_event.wait(timeout=self.interval)
+            self.refresh_event.clear()
+
+    def _probe(self, name):
+        """Run one probe, treating any exception as the service being down"""
+        try:
+            return bool(self.probes[name]())
+        except Exception as e:
+            logger.warning(f"Health probe {name} failed: {str(e)}")
+            return False
+
+    def refresh(self):
+        """
+        Run all probes concurrently and update the cached status
+
+        Returns:
+            dict: The new status
+        """
+        # Concurrent callers share one probe round instead of starting their own:
+        # the first runs it, the others wait for its result
+        with self.lock:
+            probe_round = self.in_flight
+            if probe_round is None:
+                probe_round = self.in_flight = Future()
+                running = True
+            else:
+                running = False
+        if not running:
+            return dict(probe_round.result())
+
+        try:
+            names = list(self.probes)
+            status = dict(zip(names, self.executor.map(self._probe, names)))
+        except Exception as e:
+            with self.lock:
+                self.in_flight = None
+            probe_round.set_exception(e)
+            raise
+
+        with self.lock:
+            changed = status != self.status
+            self.status = status
+            self.checked_at = time.time()
+            self.in_flight = None
+        probe_round.set_result(status)
+
+        if changed:
+            logger.info(f"Service status changed: {status}")
+            if self.on_change:
+                try:
+                    self.on_change(dict(status))
+                except Exception as e:
+                    logger.warning(f"Health status change callback failed: {str(e)}")
+        return dict(status)
+
+    def snapshot(self):
+        """Return the cached status without probing"""
+        with self.lock:
+            return dict(self.status)
+
+    def is_stale(self):
+        """True if the cached status is older than the TTL"""
+        return time.time() - self.checked_at > self.ttl
+
+    def request_refresh(self):
+        """Ask the background thread to probe again as soon as possible"""
+        self.refresh_event.set()
+
+    def stop(self):
+        """Stop the background thread"""
+        self.is_running = False
+        self.refresh_event.set()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Sentences the recognizer can produce, cycled through by the load test
+SENTENCES = [
+    ["hello"],
+    ["thanks"],
+    ["iloveyou"],
+    ["hello", "thanks"],
+    ["hello", "iloveyou"],
+    ["hello", "thanks", "iloveyou"]
+]
+
+def percentile(values, pct):
+    """Return the given percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def send_request(base_url, sentence, stream):
+    """Send one conversation turn to integrate_gemini.py and time it"""
+    start = time.time()
+    first_partial = None
+
+    if not stream:
+        response = requests.post(f"{base_url}/process_sign_sentence",
+                                 json={"sentence": sentence, "clientId": "load-test"}, timeout=30)
+        response.raise_for_status()
+        reply = response.json().get('response')
+    else:
+        reply = None
+        with requests.post(f"{base_url}/process_sign_sentence_stream",
+                           json={"sentence": sentence, "clientId": "load-test"},
+                           stream=True, timeout=30) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                if first_partial is None:
+                    first_partial = time.time() - start
+                event = json.loads(line[len('data:'):].strip())
+                reply = event.get('response', reply)
+
+    return time.time() - start, first_partial, reply
+
+def send_in_process(handler, sentence, stream):
+    """Run one conversation turn through a GeminiHandler in this process and time it"""
+    start = time.time()
+    first_partial = None
+    if not stream:
+        reply = handler.get_response(" ".join(sentence))
+    else:
+        reply = None
+        for partial in handler.stream_response(" ".join(sentence)):
+            if first_partial is None:
+                first_partial = time.time() - start
+            reply = partial
+    return time.time() - start, first_partial, reply
+
+def run_load_test(send, total_requests, concurrency):
+    """Send total_requests turns with the given concurrency and collect timings"""
+    latencies = []
+    first_partials = []
+    replies = {}
+    errors = []
+    lock = threading.Lock()
+
+    def worker(i):
+        sentence = SENTENCES[i % len(SENTENCES)]
+        try:
+            latency, first_partial, reply = send(sentence)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        with lock:
+            latencies.append(latency)
+            if first_partial is not None:
+                first_partials.append(first_partial)
+            replies[reply] = replies.get(reply, 0) + 1
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(total_requests)))
+    elapsed = time.time() - start
+
+    return {
+        'requests': total_requests,
+        'concurrency': concurrency,
+        'errors': len(errors),
+        'elapsed_seconds': elapsed,
+        'throughput_rps': len(latencies) / elapsed if elapsed else None,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95),
+        'latency_p99': percentile(latencies, 99),
+        'first_partial_p50': percentile(first_partials, 50),
+        'first_partial_p95': percentile(first_partials, 95),
+        'replies': replies
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Gemini conversation path")
+    parser.add_argument('--url', default="http://127.0.0.1:5002", help="Base URL of integrate_gemini.py")
+    parser.add_argument('--requests', type=int, default=200, help="Total number of conversation turns")
+    parser.add_argument('--concurrency', type=int, default=20, help="Number of turns in flight at once")
+    parser.add_argument('--stream', action='store_true', help="Use the streaming endpoint and time the first partial reply")
+    parser.add_argument('--in-process', action='store_true',
+                        help="Drive a GeminiHandler in this process instead of the HTTP service")
+    args = parser.parse_args()
+
+    if args.in_process:
+        # Default to the offline stand-in so the benchmark never needs network access
+        os.environ.setdefault('RESPONDER_BACKEND', 'local')
+        from gemini_handler import GeminiHandler
+        handler = GeminiHandler(model="gemini-pro", max_words=5)
+        send = lambda sentence: send_in_process(handler, sentence, args.stream)
+    else:
+        send = lambda sentence: send_request(args.url, sentence, args.stream)
+
+    print(f"Sending {args.requests} turns with concurrency {args.concurrency}...")
+    results = run_load_test(send, args.requests, args.concurrency)
+    print(json.dumps(results, indent=2))
+
+    if args.in_process:
+        handler.shutdown()
+
+if __name__ == "__main__":
+    main()
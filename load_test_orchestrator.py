@@ -0,0 +1,196 @@
+import eventlet
+eventlet.monkey_patch()
+
+import argparse
+import json
+import threading
+import time
+import uuid
+
+import requests
+import socketio
+
+# Run the orchestrator offline and cooperatively for this test, e.g.:
+#   ORCHESTRATOR_ASYNC_MODE=eventlet EMBEDDED_GEMINI=1 RESPONDER_BACKEND=local \
+#   SOCKETIO_VERBOSE_LOGS=0 python sign_conversation.py
+
+def percentile(values, pct):
+    """Return the given percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def new_client_id():
+    """Unique recognition clientId, so concurrent turns use separate sessions"""
+    return f"load-{uuid.uuid4().hex[:12]}"
+
+def connect_client(url, transports, client_id=None, client=None):
+    """Open one Socket.IO connection watching client_id and return (client, seconds taken)"""
+    client = client or socketio.Client(reconnection=False)
+    start = time.time()
+    client.connect(f"{url}?clientId={client_id or new_client_id()}", transports=transports, wait_timeout=30)
+    return client, time.time() - start
+
+def open_idle_clients(url, count, transports, ramp_concurrency, make_client=None):
+    """Open count idle connections, each watching its own client, at most ramp_concurrency at a time"""
+    clients = []
+    connect_times = []
+    errors = 0
+    pool = eventlet.GreenPool(ramp_concurrency)
+    for result in pool.imap(lambda _: _try_connect(url, transports, make_client), range(count)):
+        if result is None:
+            errors += 1
+        else:
+            clients.append(result[0])
+            connect_times.append(result[1])
+    return clients, connect_times, errors
+
+def _try_connect(url, transports, make_client=None):
+    try:
+        return connect_client(url, transports, client=make_client() if make_client else None)
+    except Exception:
+        return None
+
+def run_turn(url, transports, sentence):
+    """Push a sentence and run one conversation turn over its own connection, timing the turn"""
+    client_id = new_client_id()
+    client, _ = connect_client(url, transports, client_id)
+    try:
+        requests.post(f"{url}/api/sentence_update", json={"sentence": sentence, "clientId": client_id}, timeout=30)
+        start = time.time()
+        result = client.call('send_conversation', timeout=60)
+        return time.time() - start, bool(result and result.get('success'))
+    finally:
+        client.disconnect()
+
+def measure_status_latency(url, samples=20):
+    """Time /api/status, which should answer from the health cache while the server is loaded"""
+    latencies = []
+    for _ in range(samples):
+        start = time.time()
+        requests.get(f"{url}/api/status", timeout=30)
+        latencies.append(time.time() - start)
+    return latencies
+
+def measure_update_delivery(url, transports, samples=20):
+    """
+    Time how long a sentence update takes to reach a socket watching its client
+
+    Returns:
+        list of seconds from posting /api/sentence_update to receiving sentence_update
+    """
+    client_id = new_client_id()
+    client = socketio.Client(reconnection=False)
+    received = threading.Event()
+    expected = {}
+
+    @client.on('sentence_update')
+    def on_update(data):
+        if data.get('sentence') == expected.get('sentence'):
+            received.set()
+
+    connect_client(url, transports, client_id, client)
+    latencies = []
+    try:
+        for i in range(samples):
+            expected['sentence'] = ["hello", f"n{i}"]
+            received.clear()
+            start = time.time()
+            requests.post(f"{url}/api/sentence_update",
+                          json={"sentence": expected['sentence'], "clientId": client_id}, timeout=30)
+            if received.wait(timeout=10):
+                latencies.append(time.time() - start)
+    finally:
+        client.disconnect()
+    return latencies
+
+def counting_client(counter):
+    """Socket.IO client that counts the sentence updates it receives for other clients"""
+    client = socketio.Client(reconnection=False)
+    first_update = {}
+
+    @client.on('sentence_update')
+    def on_update(data):
+        # The initial sentence sent on connect is expected; anything after it leaked from another client
+        if first_update.setdefault('seen', False):
+            counter['unrelated_updates'] += 1
+        first_update['seen'] = True
+
+    return client
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency test for the Socket.IO orchestrator")
+    parser.add_argument('--url', default="http://127.0.0.1:5001", help="Base URL of sign_conversation.py")
+    parser.add_argument('--idle', type=int, default=2000, help="Number of idle sockets to hold open")
+    parser.add_argument('--turns', type=int, default=200, help="Number of conversation turns in flight at once")
+    parser.add_argument('--ramp', type=int, default=100, help="Connections opened concurrently while ramping up")
+    parser.add_argument('--transport', default='websocket', choices=['websocket', 'polling'],
+                        help="Socket.IO transport (websocket needs the websocket-client package)")
+    parser.add_argument('--samples', type=int, default=20, help="Sentence updates timed for the delivery test")
+    args = parser.parse_args()
+    transports = [args.transport]
+
+    # Delivery latency for one client before the unrelated sessions exist
+    print("Timing sentence update delivery with no other sessions...")
+    quiet_delivery = measure_update_delivery(args.url, transports, args.samples)
+
+    print(f"Opening {args.idle} idle sockets...")
+    counter = {'unrelated_updates': 0}
+    start = time.time()
+    idle_clients, connect_times, connect_errors = open_idle_clients(args.url, args.idle, transports, args.ramp,
+                                                                    lambda: counting_client(counter))
+    ramp_seconds = time.time() - start
+
+    print("Timing sentence update delivery with the other sessions connected...")
+    loaded_delivery = measure_update_delivery(args.url, transports, args.samples)
+
+    print(f"Running {args.turns} concurrent conversation turns...")
+    pool = eventlet.GreenPool(args.turns)
+    start = time.time()
+    outcomes = []
+    for outcome in pool.imap(lambda _: _try_turn(args.url, transports), range(args.turns)):
+        outcomes.append(outcome)
+    turns_seconds = time.time() - start
+
+    status_latencies = measure_status_latency(args.url)
+    still_connected = sum(1 for client in idle_clients if client.connected)
+
+    turn_latencies = [latency for latency, ok in outcomes if ok]
+    results = {
+        'idle_requested': args.idle,
+        'idle_connected': len(idle_clients),
+        'idle_connect_errors': connect_errors,
+        'idle_still_connected': still_connected,
+        'ramp_seconds': ramp_seconds,
+        'connect_p50': percentile(connect_times, 50),
+        'connect_p95': percentile(connect_times, 95),
+        'turns_requested': args.turns,
+        'turns_succeeded': len(turn_latencies),
+        'turns_seconds': turns_seconds,
+        'turn_p50': percentile(turn_latencies, 50),
+        'turn_p95': percentile(turn_latencies, 95),
+        'turn_p99': percentile(turn_latencies, 99),
+        'status_p50': percentile(status_latencies, 50),
+        'status_p95': percentile(status_latencies, 95),
+        'delivery_quiet_p50': percentile(quiet_delivery, 50),
+        'delivery_quiet_p95': percentile(quiet_delivery, 95),
+        'delivery_loaded_p50': percentile(loaded_delivery, 50),
+        'delivery_loaded_p95': percentile(loaded_delivery, 95),
+        # Updates the idle sockets received for clients they were not watching; should be 0
+        'unrelated_updates_received': counter['unrelated_updates']
+    }
+    print(json.dumps(results, indent=2))
+
+    for client in idle_clients:
+        client.disconnect()
+
+def _try_turn(url, transports):
+    try:
+        return run_turn(url, transports, ["hello", "thanks"])
+    except Exception:
+        return None, False
+
+if __name__ == "__main__":
+    main()
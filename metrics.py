@@ -0,0 +1,236 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Counters, gauges and histograms rendered in the Prometheus text exposition
+# format, so every service can serve /metrics without extra dependencies.
+# Metrics are created through counter(), gauge() and histogram(), which
+# register them in REGISTRY; creating one that already exists returns it,
+# so modules loaded into the same process can share metrics.
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Latency buckets in seconds, from 1ms to 10s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """A metric family: one value (or histogram) per combination of label values"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        if not self.labelnames:
+            # Unlabelled metrics are exposed from the start, reading zero
+            self.values[()] = self._initial()
+
+    def _initial(self):
+        return 0
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def samples(self):
+        """Yield (suffix, label string, value) for every sample of the family"""
+        with self.lock:
+            items = list(self.values.items())
+        for key, value in items:
+            yield '', self._labels(key), value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    """A value that only goes up, such as a number of requests or seconds spent"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(self._key(labels), 0)
+
+class Gauge(Metric):
+    """
+    A value that goes up and down. An unlabelled gauge can instead read its
+    value from a function each time the metrics are rendered.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        """Read the gauge's value from function() whenever it is rendered"""
+        self.function = function
+
+    def samples(self):
+        if self.function is not None:
+            try:
+                yield '', '', float(self.function())
+            except Exception:
+                # A gauge that cannot be read is left out rather than failing the scrape
+                return
+            return
+        yield from super().samples()
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _initial(self):
+        return {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = self._initial()
+            state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the time spent in a with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self.lock:
+            items = [(key, list(state['buckets']), state['sum'], state['count']) for key, state in self.values.items()]
+        for key, buckets, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), buckets):
+                cumulative += bucket_count
+                yield '_bucket', self._labels(key, [('le', _format_value(bound))]), cumulative
+            yield '_sum', self._labels(key), total
+            yield '_count', self._labels(key), count
+
+class Registry:
+    """The metrics one process exposes on /metrics"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def get_or_create(self, cls, name, documentation, labelnames=(), **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+    def render(self):
+        """The text exposition of every registered metric"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.get_or_create(Counter, name, documentation, labelnames)
+
+def gauge(name, documentation, labelnames=(), function=None):
+    metric = REGISTRY.get_or_create(Gauge, name, documentation, labelnames)
+    if function is not None:
+        metric.set_function(function)
+    return metric
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+class StageTimer:
+    """
+    Times the consecutive stages of one request. Each mark() ends the stage
+    running since the previous mark, records it in the histogram (labelled
+    by stage) and keeps it for the request's Server-Timing header.
+    """
+
+    def __init__(self, histogram=None):
+        self.histogram = histogram
+        self.start = self.last = time.perf_counter()
+        self.stages = []
+
+    def mark(self, stage):
+        """End the current stage under the given name and return its duration in seconds"""
+        now = time.perf_counter()
+        duration = now - self.last
+        self.last = now
+        self.stages.append((stage, duration))
+        if self.histogram is not None:
+            self.histogram.observe(duration, stage=stage)
+        return duration
+
+    def total(self):
+        return time.perf_counter() - self.start
+
+    def server_timing(self):
+        """Server-Timing header value with every stage and the total in milliseconds"""
+        entries = [f"{stage};dur={duration * 1000:.2f}" for stage, duration in self.stages]
+        entries.append(f"total;dur={self.total() * 1000:.2f}")
+        return ', '.join(entries)
@@ -0,0 +1,406 @@
+import logging
+import math
+import operator
+import os
+import numpy as np
+from collections import deque
+
+from sign_registry import HAND_FEATURES, load_sign_registry
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pure sign recognition logic shared by app.py and the offline tools. Only
+# numpy is needed, so it can run without TensorFlow, MediaPipe or OpenCV.
+
+MOTION_THRESHOLD = 0.025  # Increased from 0.02 - requiring more motion for dynamic signs
+
+# The signs the model was trained on, with their translations, weights and
+# rules (see sign_registry.py). A model with other signs needs its own file.
+SIGN_REGISTRY_PATH = os.environ.get('SIGN_REGISTRY', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'signs.json'))
+SIGNS = load_sign_registry(SIGN_REGISTRY_PATH, MOTION_THRESHOLD)
+
+# Define actions and colors for visualization
+actions = list(SIGNS.names)
+colors = [sign.color for sign in SIGNS.signs]
+
+# Define Tagalog translations
+tagalog_labels = SIGNS.translations('tagalog')
+
+# For converting back from Tagalog to English (for model processing)
+english_labels = {word: sign for sign, word in tagalog_labels.items()}
+
+# Initialize client buffer safely with explicit types
+def init_client_buffer():
+    """Create a new buffer for a client with proper data types"""
+    return {
+        'frames': deque(maxlen=30),
+        'sentence': deque(maxlen=5),
+        'last_prediction': ('Waiting for hands...', 0.0, None, False),
+        'frame_seq': 0,  # Sequence number of the last frame received
+        'last_prediction_frame': None,  # (frame sequence number, arrival time) the last prediction was made from
+        'current_action': None,  # Sign the client's sign decoder is holding
+        'decoded_frame': None,  # last_prediction_frame of the last prediction fed to the sign decoder
+        'empty_frame_counter': 0,
+        'previous_geometry': None,  # FrameGeometry of the last frame, for the hand motion
+        'motion_history': deque(maxlen=10)
+    }
+
+# Constants for prediction stability
+CONFIDENCE_THRESHOLD = 0.65  # Lowered threshold to detect more quickly
+MAX_EMPTY_FRAMES = 5  # Maximum number of frames without hands before resetting
+VALID_HAND_VISIBILITY_THRESHOLD = 0.2  # Reduced from 0.8 - much more lenient visibility requirement
+
+# Sign types and weights as configured in the sign registry; read-only, the
+# worker no longer adjusts them per prediction
+SIGN_TYPES = {sign.name: sign.type for sign in SIGNS.signs}
+SIGN_WEIGHTS = {sign.name: sign.weight for sign in SIGNS.signs}
+
+# Layout of the keypoint vector built by extract_keypoints
+POSE_LANDMARKS = 33
+FACE_LANDMARKS = 468
+HAND_LANDMARKS = 21
+KEYPOINT_SIZE = POSE_LANDMARKS * 4 + FACE_LANDMARKS * 3 + HAND_LANDMARKS * 3 * 2  # 1662
+
+# The only face mesh points the rules read: the lower face contour used to find the chin
+FACE_SUBSET = tuple(range(17))
+
+# Pose landmarks at the corners of the mouth, where the chin height is read without a face
+POSE_MOUTH = (9, 10)
+
+class KeypointLayout:
+    """
+    Which landmarks a keypoint vector holds. Every layout keeps the order of
+    the full layout (pose, face, left hand, right hand) and only leaves out
+    face mesh points, so its vectors can be cut from full-layout recordings.
+    """
+
+    def __init__(self, name, face_points):
+        """
+        Args:
+            name: Name used to select the layout, e.g. in KEYPOINT_LAYOUT
+            face_points: Indices of the face mesh points kept, in order
+        """
+        self.name = name
+        self.face_points = tuple(face_points)
+        self.pose_size = POSE_LANDMARKS * 4
+        self.face_size = len(self.face_points) * 3
+        self.hands_start = self.pose_size + self.face_size
+        self.size = self.hands_start + HAND_LANDMARKS * 3 * 2
+
+        # Positions of this layout's features in a full-layout vector
+        full_face = self.pose_size + np.array([[3 * i, 3 * i + 1, 3 * i + 2] for i in self.face_points], dtype=int).reshape(-1)
+        self.indices = np.concatenate([
+            np.arange(self.pose_size),
+            full_face,
+            np.arange(self.pose_size + FACE_LANDMARKS * 3, KEYPOINT_SIZE)
+        ])
+
+    @property
+    def uses_face_mesh(self):
+        return bool(self.face_points)
+
+    def select(self, keypoints):
+        """Cut this layout's features out of full-layout keypoints of any leading shape"""
+        keypoints = np.asarray(keypoints)
+        if keypoints.shape[-1] != KEYPOINT_SIZE:
+            raise ValueError(f"Expected full-layout keypoints of size {KEYPOINT_SIZE}, got shape {keypoints.shape}")
+        if self.size == KEYPOINT_SIZE:
+            return keypoints
+        return keypoints[..., self.indices]
+
+    def __repr__(self):
+        return f"KeypointLayout({self.name!r}, {self.size} features)"
+
+KEYPOINT_LAYOUTS = {
+    'full': KeypointLayout('full', range(FACE_LANDMARKS)),        # 1662 features
+    'pose_hands': KeypointLayout('pose_hands', ()),                # 258 features, no face mesh needed
+    'pose_hands_face': KeypointLayout('pose_hands_face', FACE_SUBSET)  # 309 features
+}
+FULL_LAYOUT = KEYPOINT_LAYOUTS['full']
+
+def get_layout(name):
+    """Look up a keypoint layout by name"""
+    if isinstance(name, KeypointLayout):
+        return name
+    if name not in KEYPOINT_LAYOUTS:
+        raise ValueError(f"Unknown keypoint layout {name!r}, expected one of {list(KEYPOINT_LAYOUTS)}")
+    return KEYPOINT_LAYOUTS[name]
+
+class Landmark:
+    """One landmark with the same attributes as a MediaPipe landmark"""
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z, visibility=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+class LandmarkList:
+    """A list of landmarks with the same shape as a MediaPipe NormalizedLandmarkList"""
+    __slots__ = ('landmark',)
+
+    def __init__(self, values, width):
+        if width == 4:
+            self.landmark = [Landmark(float(x), float(y), float(z), float(v)) for x, y, z, v in values]
+        else:
+            self.landmark = [Landmark(float(x), float(y), float(z)) for x, y, z in values]
+
+class KeypointResults:
+    """
+    Stand-in for MediaPipe Holistic results rebuilt from a keypoint vector.
+
+    extract_keypoints writes zeros for missing parts, so an all-zero block
+    becomes None here, just like a missing part in the live results. With a
+    reduced layout, face_landmarks holds only the layout's face points
+    (FACE_SUBSET keeps points 0-16 at their usual positions), or is None.
+    """
+
+    def __init__(self, keypoints, layout=FULL_LAYOUT):
+        keypoints = np.asarray(keypoints, dtype=np.float32)
+        if keypoints.shape != (layout.size,):
+            raise ValueError(f"Expected a keypoint vector of size {layout.size}, got shape {keypoints.shape}")
+
+        lh_end = layout.hands_start + HAND_LANDMARKS * 3
+        self.pose_landmarks = self._landmarks(keypoints[:layout.pose_size], 4)
+        self.face_landmarks = self._landmarks(keypoints[layout.pose_size:layout.hands_start], 3)
+        self.left_hand_landmarks = self._landmarks(keypoints[layout.hands_start:lh_end], 3)
+        self.right_hand_landmarks = self._landmarks(keypoints[lh_end:], 3)
+
+    @staticmethod
+    def _landmarks(block, width):
+        if not block.size or not block.any():
+            return None
+        return LandmarkList(block.reshape(-1, width), width)
+
+def extract_keypoints(results, layout=FULL_LAYOUT):
+    """
+    Flatten detection results into a float32 keypoint vector in the given
+    layout. The vector is all the pipeline keeps of a frame, so the results
+    object can be dropped as soon as this returns.
+    """
+    try:
+        keypoints = np.zeros(layout.size, dtype=np.float32)
+        if results.pose_landmarks:
+            keypoints[:layout.pose_size] = [value for res in results.pose_landmarks.landmark
+                                            for value in (res.x, res.y, res.z, res.visibility)]
+        if layout.face_points and results.face_landmarks:
+            face_landmarks = results.face_landmarks.landmark
+            if layout.size != KEYPOINT_SIZE:
+                face_landmarks = [face_landmarks[i] for i in layout.face_points]
+            keypoints[layout.pose_size:layout.hands_start] = [value for res in face_landmarks
+                                                              for value in (res.x, res.y, res.z)]
+        lh_end = layout.hands_start + HAND_LANDMARKS * 3
+        if results.left_hand_landmarks:
+            keypoints[layout.hands_start:lh_end] = [value for res in results.left_hand_landmarks.landmark
+                                                    for value in (res.x, res.y, res.z)]
+        if results.right_hand_landmarks:
+            keypoints[lh_end:] = [value for res in results.right_hand_landmarks.landmark
+                                  for value in (res.x, res.y, res.z)]
+        return keypoints
+    except Exception as e:
+        logger.error(f"Error extracting keypoints: {e}")
+        return None
+
+def assemble_window(frames):
+    """Stack a client's buffered keypoint frames into a (1, frames, features) float32 model input"""
+    return np.array(frames, dtype=np.float32)[np.newaxis]
+
+# Hand landmarks of the fingertips, thumb to pinky; the wrist is landmark 0
+FINGERTIPS = (4, 8, 12, 16, 20)
+
+# Length of one hand's part of a keypoint vector, and the fingertip heights in it
+_HAND_SIZE = HAND_LANDMARKS * 3
+_fingertip_heights = operator.itemgetter(*(3 * tip + 1 for tip in FINGERTIPS))
+
+# FrameGeometry's extension, thumb_spread, chin_distance and nose_offset for a missing hand
+_MISSING_HAND = ((math.nan,) * len(FINGERTIPS), math.nan, math.nan, math.nan)
+
+class FrameGeometry:
+    """
+    The per-frame geometry that motion tracking and the sign rules read,
+    computed once from the frame's keypoint vector.
+
+    Per-hand values are (left, right) pairs. They are NaN for a missing hand,
+    or when the face or pose they are measured against is missing, so
+    comparisons with them are False.
+
+    Attributes:
+        present: (left, right) whether each hand was detected
+        hands: The hand landmark coordinates, left then right, as a flat list
+        extension: Per hand, how far each fingertip (thumb to pinky) is above the wrist
+        thumb_spread: Per hand, horizontal distance from the thumb tip to the wrist
+        nose_y: Height of the nose pose landmark, or None without a pose
+        chin_y: Height of the lowest point of the face contour (face points 0-16); in a layout
+                without face points, of the lower pose mouth corner. None when neither is detected
+        chin_distance: Per hand, vertical distance from the chin to the nearest index to pinky fingertip
+        nose_offset: Per hand, how far the wrist is below the nose
+        motion: Mean landmark movement since the previous frame of the hand that moved most,
+                0 without a previous frame or a hand present in both
+        hand_features: (left, right) tuples of the per-hand values the sign registry's
+                       rules compare, in the order of HAND_FEATURES, followed by a 0
+    """
+    __slots__ = ('present', 'hands', 'extension', 'thumb_spread', 'nose_y', 'chin_y', 'chin_distance',
+                 'nose_offset', 'motion', 'hand_features')
+
+    def __init__(self, keypoints, layout=FULL_LAYOUT, previous=None):
+        """
+        Args:
+            keypoints: Keypoint vector of the frame, in the given layout
+            layout: The KeypointLayout of the vector
+            previous: FrameGeometry of the client's previous frame, for the motion
+        """
+        # A single live frame is cheaper to take apart as Python floats than with numpy calls on tiny arrays
+        keypoints = np.asarray(keypoints, dtype=np.float32)
+        self.hands = keypoints[layout.hands_start:layout.size].tolist()
+        self.present = (any(self.hands[:_HAND_SIZE]), any(self.hands[_HAND_SIZE:]))
+
+        # Heights of the pose landmarks up to the mouth corners; a detected pose has none at exactly 0
+        pose_heights = keypoints[1:(max(POSE_MOUTH) + 1) * 4:4].tolist()
+        self.nose_y = pose_heights[0] if any(pose_heights) else None
+        # Heights of the face contour points, the first FACE_SUBSET points of every layout that has a face
+        contour_heights = keypoints[layout.pose_size + 1:layout.pose_size + min(layout.face_size, len(FACE_SUBSET) * 3):3].tolist()
+        if any(contour_heights):
+            self.chin_y = max(contour_heights)
+        elif self.nose_y is not None and not layout.face_points:
+            # Face points 0-16 are on the lips, so the mouth corners land within a lip's height of them.
+            # Only layouts without face points need this; the others decide on the face alone, as before
+            self.chin_y = max(pose_heights[i] for i in POSE_MOUTH)
+        else:
+            self.chin_y = None
+
+        nose_y = math.nan if self.nose_y is None else self.nose_y
+        chin_y = math.nan if self.chin_y is None else self.chin_y
+        features = []
+        for hand, present in enumerate(self.present):
+            if not present:
+                features.append(_MISSING_HAND)
+                continue
+            landmarks = self.hands[hand * _HAND_SIZE:(hand + 1) * _HAND_SIZE]
+            wrist_x, wrist_y = landmarks[:2]
+            thumb_x = landmarks[FINGERTIPS[0] * 3]
+            thumb_y, index_y, middle_y, ring_y, pinky_y = _fingertip_heights(landmarks)
+            features.append((
+                (wrist_y - thumb_y, wrist_y - index_y, wrist_y - middle_y, wrist_y - ring_y, wrist_y - pinky_y),
+                abs(thumb_x - wrist_x),
+                min(abs(index_y - chin_y), abs(middle_y - chin_y), abs(ring_y - chin_y), abs(pinky_y - chin_y)),
+                wrist_y - nose_y
+            ))
+        self.extension, self.thumb_spread, self.chin_distance, self.nose_offset = zip(*features)
+        # In the order of HAND_FEATURES
+        self.hand_features = tuple(extension + (spread, chin, nose, 0.0) for extension, spread, chin, nose in features)
+
+        self.motion = 0.0
+        if previous is not None:
+            for hand in (0, 1):
+                if self.present[hand] and previous.present[hand]:
+                    now = self.hands[hand * _HAND_SIZE:(hand + 1) * _HAND_SIZE]
+                    before = previous.hands[hand * _HAND_SIZE:(hand + 1) * _HAND_SIZE]
+                    distance = sum(map(math.dist, zip(*[iter(now)] * 3), zip(*[iter(before)] * 3))) / HAND_LANDMARKS
+                    self.motion = max(self.motion, distance)
+
+def has_hands(results):
+    """Check if hands are present in the frame with simpler, more lenient detection"""
+    # Most basic check - are any hand landmarks detected?
+    if results.left_hand_landmarks is None and results.right_hand_landmarks is None:
+        return False
+    
+    # If we have hands, do some basic validation but be very lenient
+    if results.left_hand_landmarks:
+        # Just check that some fingers are visible (not just wrist)
+        return True
+    
+    if results.right_hand_landmarks:
+        # Just check that some fingers are visible (not just wrist)
+        return True
+    
+    return False
+
+def check_sign_validity(predicted_sign, geometry, motion_history, registry=SIGNS):
+    """Check if the predicted sign meets the criteria of its checks in the sign registry"""
+    return registry.is_valid(predicted_sign, geometry, motion_history)
+
+def keypoint_motion(frames, layout=FULL_LAYOUT):
+    """
+    Per-frame hand motion for a sequence of keypoint vectors, matching
+    FrameGeometry.motion on consecutive frames. The first frame has no
+    previous frame and gets 0.
+
+    Args:
+        frames: Array of shape (frames, layout.size)
+        layout: The KeypointLayout of the frames
+
+    Returns:
+        numpy array of shape (frames,)
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    hands_start = layout.hands_start
+    motion = np.zeros(len(frames), dtype=np.float32)
+    if len(frames) < 2:
+        return motion
+
+    hand_motions = []
+    for start in (hands_start, hands_start + HAND_LANDMARKS * 3):
+        hand = frames[:, start:start + HAND_LANDMARKS * 3].reshape(len(frames), HAND_LANDMARKS, 3)
+        present = hand.any(axis=(1, 2))
+        distance = np.sqrt(((hand[1:] - hand[:-1]) ** 2).sum(axis=2)).mean(axis=1)
+        hand_motions.append(np.where(present[1:] & present[:-1], distance, 0))
+    motion[1:] = np.maximum(*hand_motions)
+    return motion
+
+def postprocess_prediction(scores, geometry, motion_history, registry=SIGNS):
+    """
+    Turn the model scores for one window into the prediction shown to the user,
+    applying the sign weights, gates and validity checks of the sign registry.
+
+    Args:
+        scores: Model output for the window
+        geometry: FrameGeometry of the newest frame
+        motion_history: Recent per-frame hand motion values
+        registry: SignRegistry of the model's signs
+
+    Returns:
+        tuple: (predicted_action, display_max_score, scores_list, is_valid_sign), where
+        scores_list holds the weighted and gated scores the sign was picked by, which
+        are what the sign decoder is fed
+    """
+    sign, display_max_score, is_valid_sign, decision_scores = registry.postprocess(scores, geometry, motion_history)
+
+    # Copy scores to a regular Python list to avoid NumPy serialization issues
+    scores_list = decision_scores.tolist()
+
+    return sign.name, display_max_score, scores_list, is_valid_sign
+
+def track_hands(buffer, hands_present):
+    """
+    Count frames without hands and reset the sign tracking after too many
+
+    Returns:
+        bool: True if the tracking was reset, so the client's sign decoder should be too
+    """
+    # Track empty frames (no hands) - but be more lenient
+    if not hands_present:
+        buffer['empty_frame_counter'] += 1
+    else:
+        buffer['empty_frame_counter'] = 0
+        
+    # Reset if too many empty frames - increased from 5 to be more lenient
+    if buffer['empty_frame_counter'] > MAX_EMPTY_FRAMES * 2:
+        buffer['current_action'] = None
+        return True
+    return False
+
+def add_to_sentence(buffer, sign):
+    """
+    Add a sign emitted by the sign decoder to a client's sentence, unless the
+    sentence already ends with it
+
+    Returns:
+        bool: True if the sign was added
+    """
+    if buffer['sentence'] and buffer['sentence'][-1] == sign:
+        return False
+    buffer['sentence'].append(sign)
+    return True
@@ -0,0 +1,142 @@
+import argparse
+import base64
+import glob
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from session_recorder import load_session
+
+# Record sessions by starting app.py with SESSION_RECORD_DIR=recordings, then e.g.:
+#   python replay_session.py recordings --speed 1      (original timing)
+#   python replay_session.py recordings --speed 4      (4x faster)
+#   python replay_session.py recordings --speed 0      (as fast as the server answers)
+
+def percentile(values, pct):
+    """Return the given percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def replay(url, session, speed):
+    """
+    Send a recorded session's frames to /predict one at a time, like the
+    browser does, under a fresh clientId
+
+    Args:
+        url: Base URL of app.py
+        session: A recording from load_session
+        speed: 1 for the original timing, >1 to speed up, 0 to send as fast as possible
+
+    Returns:
+        dict with the per-frame latencies, error count and final sentences
+    """
+    client_id = f"replay-{uuid.uuid4().hex[:8]}"
+    http = requests.Session()
+    latencies = []
+    prediction_ages = []
+    errors = 0
+    sentence = []
+    start = time.time()
+
+    for offset, image_bytes, prefix, language in session['frames']:
+        if speed > 0:
+            delay = start + offset / speed - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        payload = {
+            'image': f"{prefix},{base64.b64encode(image_bytes).decode('ascii')}",
+            'clientId': client_id,
+            'language': language
+        }
+        request_start = time.time()
+        try:
+            response = http.post(f"{url}/predict", json=payload, timeout=30)
+            data = response.json()
+            if response.status_code != 200 or not data.get('success'):
+                errors += 1
+                continue
+            sentence = data.get('sentence', sentence)
+            if data.get('prediction_age_ms') is not None:
+                prediction_ages.append(data['prediction_age_ms'])
+        except (requests.RequestException, ValueError):
+            errors += 1
+            continue
+        latencies.append(time.time() - request_start)
+
+    recorded_sentence = session['sentences'][-1][1] if session['sentences'] else []
+    return {
+        'path': session['path'],
+        'frames': len(session['frames']),
+        'duration': time.time() - start,
+        'latencies': latencies,
+        'prediction_ages': prediction_ages,
+        'errors': errors,
+        'recorded_sentence': recorded_sentence,
+        'replayed_sentence': sentence,
+        'sentence_matches': sentence == recorded_sentence
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded /predict sessions against app.py")
+    parser.add_argument('paths', nargs='+', help="Recording files or directories of .rec files")
+    parser.add_argument('--url', default="http://127.0.0.1:5000", help="Base URL of app.py")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="Playback speed: 1 = original timing, 4 = 4x faster, 0 = as fast as possible")
+    parser.add_argument('--concurrency', type=int, default=1, help="Sessions replayed at the same time")
+    parser.add_argument('--repeat', type=int, default=1, help="Times to replay each session")
+    parser.add_argument('--json', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        files.extend(sorted(glob.glob(os.path.join(path, '*.rec'))) if os.path.isdir(path) else [path])
+    sessions = [load_session(path) for path in files] * args.repeat
+    total_frames = sum(len(session['frames']) for session in sessions)
+    print(f"Replaying {len(sessions)} sessions ({total_frames} frames) at "
+          f"{'max' if args.speed <= 0 else f'{args.speed}x'} speed, {args.concurrency} at a time...")
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda session: replay(args.url, session, args.speed), sessions))
+    elapsed = time.time() - start
+
+    latencies = [latency for result in results for latency in result['latencies']]
+    prediction_ages = [age for result in results for age in result['prediction_ages']]
+    report = {
+        'sessions': len(results),
+        'frames': total_frames,
+        'errors': sum(result['errors'] for result in results),
+        'elapsed_seconds': elapsed,
+        'throughput_fps': len(latencies) / elapsed if elapsed else None,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95),
+        'latency_p99': percentile(latencies, 99),
+        'latency_max': max(latencies) if latencies else None,
+        # How old the frame behind each returned prediction was, in milliseconds
+        'prediction_age_ms_p50': percentile(prediction_ages, 50),
+        'prediction_age_ms_p95': percentile(prediction_ages, 95),
+        'sentences_matched': sum(1 for result in results if result['sentence_matches']),
+        'sessions_detail': [{key: value for key, value in result.items() if key not in ('latencies', 'prediction_ages')}
+                            for result in results]
+    }
+
+    print(json.dumps({key: value for key, value in report.items() if key != 'sessions_detail'}, indent=2))
+    for result in results:
+        if not result['sentence_matches']:
+            print(f"Sentence mismatch in {result['path']}: recorded {result['recorded_sentence']}, "
+                  f"replayed {result['replayed_sentence']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import logging
+import os
+import random
+import threading
+import time
+import zlib
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ResponseUnavailable(Exception):
+    """
+    Raised instead of returning a canned reply when no backend could answer,
+    by callers that asked for real responses only (e.g. prefetches, which
+    must not keep a placeholder as the answer to a sentence)
+    """
+
+class Responder:
+    """
+    Interface for the text generation backends used by GeminiHandler.
+
+    Errors are raised as exceptions whose text follows the Gemini API
+    conventions ("429 ... quota ... retry_delay { seconds: N }",
+    "404 ... not found"), so callers can handle every backend the same way.
+    """
+
+    name = 'base'
+
+    def generate(self, model_name, prompt, system_instruction=None, generation_config=None, stream=False):
+        """
+        Generate a response to a prompt
+
+        Args:
+            model_name: The model to use
+            prompt: The user's input text
+            system_instruction: Optional instruction describing the response format
+            generation_config: Optional dict of generation settings
+            stream: If True, return an iterator of text chunks instead of a string
+
+        Returns:
+            The response text, or an iterator of text chunks when streaming
+        """
+        raise NotImplementedError
+
+    def list_models(self):
+        """Return the names of the models that support content generation"""
+        raise NotImplementedError
+
+
+class GeminiResponder(Responder):
+    """Responder backed by the Google Gemini API"""
+
+    name = 'gemini'
+
+    def __init__(self, api_key=None):
+        # Set API key directly or from environment variable; there is no built-in key
+        self.api_key = api_key or os.environ.get("GEMINI_API_KEY")
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY is not set; set it to a Gemini API key, "
+                             "or set RESPONDER_BACKEND=local to run with the offline responder")
+        os.environ["GEMINI_API_KEY"] = self.api_key
+
+        import google.generativeai as genai
+        self.genai = genai
+
+        # Initialize the Gemini client
+        genai.configure(api_key=self.api_key)
+
+    def generate(self, model_name, prompt, system_instruction=None, generation_config=None, stream=False):
+        model = self.genai.GenerativeModel(
+            model_name=model_name,
+            generation_config=generation_config,
+            system_instruction=system_instruction
+        )
+
+        if not stream:
+            return model.generate_content(prompt).text
+        return (chunk.text for chunk in model.generate_content(prompt, stream=True))
+
+    def list_models(self):
+        return [m.name for m in self.genai.list_models() if 'generateContent' in m.supported_generation_methods]
+
+
+class LocalResponder(Responder):
+    """
+    Deterministic offline stand-in for Gemini, for load testing and benchmarks.
+
+    Latency is drawn from a seeded distribution ('constant', 'uniform' or
+    'lognormal') and quota errors can be injected at a given rate with the
+    same retry_delay format as the real API. The reply to a prompt only
+    depends on the prompt itself.
+    """
+
+    name = 'local'
+
+    REPLIES = {
+        'hello': "Hello there friend",
+        'thanks': "You are welcome",
+        'iloveyou': "I love you too",
+        'ping': "pong"
+    }
+
+    GENERIC_REPLIES = [
+        "That is great",
+        "Nice to meet you",
+        "Happy to help you",
+        "Thank you friend",
+        "Hello there"
+    ]
+
+    MODELS = [
+        "models/gemini-1.5-flash-8b",
+        "models/gemini-1.5-flash-8b-latest",
+        "models/gemini-1.5-flash-latest",
+        "models/gemini-1.5-pro-latest",
+        "models/gemini-pro"
+    ]
+
+    def __init__(self, latency='lognormal', latency_mean=0.3, latency_jitter=0.5,
+                 quota_rate=0.0, retry_delay=30, chunk_delay=0.02, seed=0):
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.latency_jitter = latency_jitter
+        self.quota_rate = quota_rate
+        self.retry_delay = retry_delay
+        self.chunk_delay = chunk_delay
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        logger.info(f"Using local responder: {latency} latency around {latency_mean}s, quota error rate {quota_rate}")
+
+    def _sample_latency(self):
+        """Draw the time to first token from the configured distribution"""
+        with self.rng_lock:
+            if self.latency == 'constant':
+                return self.latency_mean
+            if self.latency == 'uniform':
+                return max(0.0, self.rng.uniform(self.latency_mean - self.latency_jitter,
+                                                 self.latency_mean + self.latency_jitter))
+            if self.latency == 'lognormal':
+                # Median of latency_mean with latency_jitter as the log-space sigma
+                return self.latency_mean * self.rng.lognormvariate(0, self.latency_jitter)
+        raise ValueError(f"Unknown latency distribution: {self.latency}")
+
+    def _maybe_raise_quota_error(self):
+        """Raise a quota error in the same format as the Gemini API at the configured rate"""
+        with self.rng_lock:
+            exceeded = self.quota_rate > 0 and self.rng.random() < self.quota_rate
+        if exceeded:
+            raise RuntimeError(f"429 Resource has been exhausted (e.g. check quota). "
+                               f"retry_delay {{ seconds: {self.retry_delay} }}")
+
+    def _reply_for(self, prompt):
+        """Pick a reply that only depends on the prompt"""
+        words = prompt.lower().split()
+        if words and words[-1] in self.REPLIES:
+            return self.REPLIES[words[-1]]
+        return self.GENERIC_REPLIES[zlib.crc32(prompt.encode('utf-8')) % len(self.GENERIC_REPLIES)]
+
+    def generate(self, model_name, prompt, system_instruction=None, generation_config=None, stream=False):
+        if model_name not in self.MODELS and f"models/{model_name}" not in self.MODELS:
+            raise RuntimeError(f"404 Model {model_name} not found")
+
+        self._maybe_raise_quota_error()
+        reply = self._reply_for(prompt)
+        time.sleep(self._sample_latency())
+
+        if not stream:
+            return reply
+        return self._stream(reply)
+
+    def _stream(self, reply):
+        """Yield the reply one word at a time"""
+        for word in reply.split():
+            yield word + " "
+            time.sleep(self.chunk_delay)
+
+    def list_models(self):
+        return list(self.MODELS)
+
+
+def create_responder(backend=None, api_key=None):
+    """
+    Create the responder selected by the RESPONDER_BACKEND environment variable
+    ('gemini' by default, or 'local' for the offline stand-in). The Gemini
+    backend needs the api_key argument or GEMINI_API_KEY, and raises ValueError
+    without either.
+
+    The local responder is configured with RESPONDER_LATENCY, RESPONDER_LATENCY_MEAN,
+    RESPONDER_LATENCY_JITTER, RESPONDER_QUOTA_RATE, RESPONDER_RETRY_DELAY and RESPONDER_SEED.
+    """
+    backend = backend or os.environ.get('RESPONDER_BACKEND', 'gemini')
+
+    if backend == 'gemini':
+        return GeminiResponder(api_key=api_key)
+    if backend == 'local':
+        return LocalResponder(
+            latency=os.environ.get('RESPONDER_LATENCY', 'lognormal'),
+            latency_mean=float(os.environ.get('RESPONDER_LATENCY_MEAN', '0.3')),
+            latency_jitter=float(os.environ.get('RESPONDER_LATENCY_JITTER', '0.5')),
+            quota_rate=float(os.environ.get('RESPONDER_QUOTA_RATE', '0')),
+            retry_delay=int(os.environ.get('RESPONDER_RETRY_DELAY', '30')),
+            seed=int(os.environ.get('RESPONDER_SEED', '0'))
+        )
+    raise ValueError(f"Unknown responder backend: {backend}")
@@ -0,0 +1,106 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ResponsePrefetcher:
+    """
+    Speculatively fetches the response to the current sentence once it has
+    been stable for a debounce interval, so that sending it can reuse the
+    in-flight or completed result instead of starting a new request.
+
+    Prefetches run on a small background pool, one worker by default, which
+    can be shared between prefetchers. A prefetch superseded by a newer
+    sentence is cancelled if it has not started yet, and its result is
+    discarded otherwise.
+
+    fetch should raise, not return a placeholder, when it gets no real
+    response, so the caller of take() sees the error and asks again live
+    instead of reusing the placeholder as the answer.
+    """
+
+    def __init__(self, fetch, debounce=0.8, executor=None):
+        """
+        Args:
+            fetch: Called with the sentence as a string, returns the response or raises
+            debounce: Seconds a sentence must stay unchanged before it is prefetched
+            executor: Optional shared executor to run prefetches on
+        """
+        self.fetch = fetch
+        self.debounce = debounce
+        self.lock = threading.Lock()
+        self.owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+        self.sentence = ()
+        self.timer = None
+        self.future = None
+        self.generation = 0
+        self.stats = {'started': 0, 'superseded': 0, 'hits': 0, 'misses': 0}
+
+    def sentence_changed(self, sentence):
+        """Schedule a prefetch for a new sentence, superseding any earlier one"""
+        sentence = tuple(sentence)
+        with self.lock:
+            if sentence == self.sentence:
+                return
+            self._cancel()
+            self.sentence = sentence
+            if not sentence:
+                return
+
+            self.generation += 1
+            self.timer = threading.Timer(self.debounce, self._start, args=(sentence, self.generation))
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _start(self, sentence, generation):
+        """Start the prefetch once the debounce interval has passed without changes"""
+        with self.lock:
+            if generation != self.generation or self.future is not None:
+                return
+            logger.info(f"Prefetching response for stable sentence: {list(sentence)}")
+            self.stats['started'] += 1
+            self.future = self.executor.submit(self.fetch, " ".join(sentence))
+
+    def _cancel(self):
+        """Drop the pending timer and prefetch. Must be called with the lock held."""
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        if self.future is not None:
+            if not self.future.done():
+                self.stats['superseded'] += 1
+            self.future.cancel()
+            self.future = None
+        self.generation += 1
+
+    def take(self, sentence):
+        """
+        Claim the prefetched response for a sentence
+
+        Returns:
+            A Future for the response if one was started for exactly this
+            sentence, otherwise None. Either way the prefetcher is reset.
+        """
+        sentence = tuple(sentence)
+        with self.lock:
+            future = self.future if sentence == self.sentence else None
+            self.future = None
+            self._cancel()
+            self.sentence = ()
+
+            if future is None:
+                self.stats['misses'] += 1
+            else:
+                self.stats['hits'] += 1
+            return future
+
+    def shutdown(self):
+        """Cancel any pending prefetch and stop the worker if it is not shared"""
+        with self.lock:
+            self._cancel()
+        if self.owns_executor:
+            self.executor.shutdown(wait=False)
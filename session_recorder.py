@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Recording file layout: MAGIC, then records of
+#   kind (1 byte) | seconds since the session started (float64) | payload length (uint32) | payload
+# Frames are stored as the raw image bytes the browser sent (no base64), the
+# other records as UTF-8 JSON.
+MAGIC = b'SIGNREC1'
+RECORD_HEADER = struct.Struct('<cdI')
+
+HEADER = b'H'     # Session metadata: client id, start time, user agent
+META = b'M'       # Frame metadata when it changes: image data URL prefix and language
+FRAME = b'F'      # One image posted to /predict
+SENTENCE = b'S'   # The sentence returned to the client, written when it changes
+
+class SessionRecorder:
+    """
+    Records the frame stream each client sends to /predict, one file per
+    client session, so the session can be replayed later with replay_session.py.
+
+    Files are named <client id>-<start time>.rec in the recording directory.
+    Sessions idle for longer than idle_timeout are closed, and a client
+    sending frames again starts a new file.
+    """
+
+    def __init__(self, directory, idle_timeout=60.0):
+        self.directory = directory
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        logger.info(f"Recording /predict sessions to {directory}")
+
+    def _session(self, client_id, metadata):
+        """Return the open session for a client, starting a new file if needed. Call with the lock held."""
+        now = time.time()
+        for other_id, other in list(self.sessions.items()):
+            if now - other['last_write'] > self.idle_timeout:
+                self._close(other_id)
+        session = self.sessions.get(client_id)
+
+        if session is None:
+            safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', client_id)[:64]
+            path = os.path.join(self.directory, f"{safe_id}-{int(now * 1000)}.rec")
+            session = {
+                'file': open(path, 'wb'),
+                'path': path,
+                'started': now,
+                'last_write': now,
+                'meta': None,
+                'sentence': None,
+                'frames': 0,
+                'lock': threading.Lock()
+            }
+            session['file'].write(MAGIC)
+            self._write(session, HEADER, json.dumps(dict(metadata or {}, clientId=client_id, started=now)).encode('utf-8'))
+            self.sessions[client_id] = session
+        return session
+
+    @staticmethod
+    def _write(session, kind, payload):
+        now = time.time()
+        session['file'].write(RECORD_HEADER.pack(kind, now - session['started'], len(payload)))
+        session['file'].write(payload)
+        session['last_write'] = now
+
+    def record_frame(self, client_id, image_bytes, prefix, language, metadata=None):
+        """
+        Record one frame posted by a client
+
+        Args:
+            client_id: The client that sent the frame
+            image_bytes: The decoded image bytes
+            prefix: The data URL prefix the image was sent with, e.g. "data:image/jpeg;base64"
+            language: The language the client asked for
+            metadata: Extra client details stored when the session starts
+        """
+        with self.lock:
+            session = self._session(client_id, metadata)
+        with session['lock']:
+            meta = {'prefix': prefix, 'language': language}
+            if meta != session['meta']:
+                self._write(session, META, json.dumps(meta).encode('utf-8'))
+                session['meta'] = meta
+            self._write(session, FRAME, image_bytes)
+            session['frames'] += 1
+
+    def record_sentence(self, client_id, sentence):
+        """Record the sentence returned to a client if it changed since the last frame"""
+        with self.lock:
+            session = self.sessions.get(client_id)
+        if session is None:
+            return
+        with session['lock']:
+            if session['file'].closed:
+                return
+            if sentence != session['sentence']:
+                self._write(session, SENTENCE, json.dumps(sentence).encode('utf-8'))
+                session['sentence'] = list(sentence)
+
+    def _close(self, client_id):
+        session = self.sessions.pop(client_id)
+        with session['lock']:
+            session['file'].close()
+        logger.info(f"Closed recording {session['path']} with {session['frames']} frames")
+
+    def close(self):
+        """Close every open recording"""
+        with self.lock:
+            for client_id in list(self.sessions):
+                self._close(client_id)
+
+def read_records(path):
+    """Yield (kind, seconds since start, payload) for every record in a recording"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                # A recording cut off mid-record (e.g. the server was killed) ends here
+                return
+            kind, offset, length = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield kind, offset, payload
+
+def load_session(path):
+    """
+    Load a recording
+
+    Returns:
+        dict with 'header', 'frames' as a list of (seconds, image bytes, prefix, language)
+        and 'sentences' as a list of (seconds, sentence)
+    """
+    session = {'path': path, 'header': {}, 'frames': [], 'sentences': []}
+    meta = {'prefix': 'data:image/jpeg;base64', 'language': 'english'}
+    for kind, offset, payload in read_records(path):
+        if kind == HEADER:
+            session['header'] = json.loads(payload)
+        elif kind == META:
+            meta = json.loads(payload)
+        elif kind == FRAME:
+            session['frames'].append((offset, payload, meta['prefix'], meta['language']))
+        elif kind == SENTENCE:
+            session['sentences'].append((offset, json.loads(payload)))
+    return session
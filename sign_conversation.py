@@ -1,14 +1,31 @@
+import os
+
+# Set ORCHESTRATOR_ASYNC_MODE=eventlet to serve Socket.IO cooperatively. The
+# standard library is monkey patched before anything else is imported, so
+# outbound requests, sleeps and background threads in handlers yield instead
+# of tying up an OS thread each.
+ASYNC_MODE = os.environ.get('ORCHESTRATOR_ASYNC_MODE', 'threading')
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
 import subprocess
 import time
 import threading
 import requests
-from flask import Flask, request, jsonify, render_template, redirect
+from flask import Flask, request, jsonify, render_template, redirect, Response
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import logging
-import os
 import json
 import sys
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from health_monitor import HealthMonitor
+from response_prefetcher import ResponsePrefetcher
+from responders import ResponseUnavailable
+from metrics import REGISTRY, CONTENT_TYPE, counter, gauge, histogram
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,11 +34,13 @@ logger = logging.getLogger(__name__)
 # Create the Flask app for orchestration
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)  # More permissive CORS
+# Per-packet Socket.IO logging can be turned off with SOCKETIO_VERBOSE_LOGS=0 under load
+SOCKETIO_VERBOSE_LOGS = os.environ.get('SOCKETIO_VERBOSE_LOGS', '1') == '1'
 socketio = SocketIO(app, 
                    cors_allowed_origins="*", 
-                   async_mode='threading', 
-                   logger=True, 
-                   engineio_logger=True,
+                   async_mode=ASYNC_MODE, 
+                   logger=SOCKETIO_VERBOSE_LOGS, 
+                   engineio_logger=SOCKETIO_VERBOSE_LOGS,
                    ping_timeout=60,
                    ping_interval=25)
 
@@ -39,15 +58,34 @@ angular_process = None
 
 # Gemini settings - point to our Gemini integration service
 GEMINI_URL = "http://127.0.0.1:5002/process_sign_sentence"
+GEMINI_STREAM_URL = "http://127.0.0.1:5002/process_sign_sentence_stream"
 GEMINI_STATUS_URL = "http://127.0.0.1:5002/test"  # Use the test endpoint which is working
 
+# Set EMBEDDED_GEMINI=1 to host GeminiHandler in this process instead of
+# calling the integration service on port 5002
+EMBEDDED_GEMINI = os.environ.get('EMBEDDED_GEMINI', '0') == '1'
+embedded_gemini = None
+embedded_gemini_lock = threading.Lock()
+
 # Flask app and Angular app URLs
 SIGN_APP_URL = "http://127.0.0.1:5000"
 ANGULAR_APP_URL = "http://127.0.0.1:4200"
 
-# Variable to store the current sentence
-current_sentence = []
-last_update_time = time.time()
+# Conversation state per recognition client, keyed by the clientId app.py uses
+client_sessions = {}
+client_sessions_lock = threading.Lock()
+
+# Socket.IO session id -> clientId of the conversation that socket is viewing
+socket_clients = {}
+
+# Sessions without viewers or updates for this long are dropped
+SESSION_IDLE_TIMEOUT = float(os.environ.get('SESSION_IDLE_TIMEOUT', '600'))
+
+# Sentence changes within this many seconds are sent to sockets as one update
+SENTENCE_BATCH_WINDOW = float(os.environ.get('SENTENCE_BATCH_WINDOW', '0.05'))
+
+# Identifies this server run, so clients can tell versions from before a restart apart
+SENTENCE_EPOCH = uuid.uuid4().hex[:8]
 
 # Thread for polling current sentence
 sentence_polling_thread = None
@@ -56,6 +94,39 @@ stop_polling = False
 # Track last successful Gemini request
 last_successful_gemini_request = time.time()
 
+# Speculatively fetch the response once the sentence has been stable this long
+PREFETCH_ENABLED = os.environ.get('PREFETCH_ENABLED', '1') == '1'
+PREFETCH_DEBOUNCE_SECONDS = float(os.environ.get('PREFETCH_DEBOUNCE_SECONDS', '0.8'))
+
+# Thread pool for the post-response fan-out (Angular translation and sentence clear).
+# Each turn in flight holds two workers for up to the sign app's timeout; under
+# eventlet the workers are green threads, so the pool is sized for hundreds of turns.
+FANOUT_WORKERS = int(os.environ.get('ORCHESTRATOR_FANOUT_WORKERS', '512' if ASYNC_MODE == 'eventlet' else '8'))
+fanout_executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix='fanout')
+
+# Recent end-to-end conversation turn timings
+turn_timings = deque(maxlen=200)
+
+# Metrics served on /metrics (with the Gemini handler's own metrics when EMBEDDED_GEMINI=1)
+GEMINI_CALL_SECONDS = histogram('orchestrator_gemini_seconds',
+                                "Latency of calls to the Gemini integration service", ('mode', 'outcome'))
+GEMINI_CALL_RETRIES = counter('orchestrator_gemini_retries_total', "Calls to the Gemini integration service retried")
+TURN_SECONDS = histogram('conversation_turn_seconds', "Time spent in each phase of a conversation turn", ('phase',))
+SENTENCE_UPDATES = counter('sentence_updates_total', "Sentences received from app.py, by whether they changed", ('changed',))
+SOCKET_EMITS = counter('socketio_emits_total', "Socket.IO events pushed to viewers, by event", ('event',))
+gauge('conversation_sessions', "Clients with conversation state", function=lambda: len(client_sessions))
+gauge('socket_connections', "Connected Socket.IO clients", function=lambda: len(socket_clients))
+
+def get_embedded_gemini():
+    """Return the in-process GeminiHandler, creating it on first use"""
+    global embedded_gemini
+    with embedded_gemini_lock:
+        if embedded_gemini is None:
+            from gemini_handler import GeminiHandler
+            embedded_gemini = GeminiHandler(model="gemini-pro", max_words=5)
+            logger.info("Hosting Gemini handler in-process")
+        return embedded_gemini
+
 # Trigger an immediate Gemini connection check
 def trigger_gemini_connection_check():
     """Force an immediate check of the Gemini connection"""
@@ -67,88 +138,70 @@ def trigger_gemini_connection_check():
 @app.route('/api/sentence_update', methods=['POST'])
 def api_sentence_update():
     """Endpoint for app.py to directly push sentence updates"""
-    global current_sentence, last_update_time
-    
     try:
         data = request.json
         new_sentence = data.get('sentence', [])
         client_id = data.get('clientId', 'default')
         
-        logger.info(f"Received direct sentence update from app.py: {new_sentence}")
-        
-        # Update our stored sentence
-        current_sentence = new_sentence
-        last_update_time = time.time()
+        logger.info(f"Received direct sentence update from app.py for {client_id}: {new_sentence}")
         
-        # Emit to any connected WebSocket clients
-        try:
-            socketio.emit('sentence_update', {'sentence': current_sentence})
-            socketio.sleep(0)  # Allow emit to process
-            logger.info(f"Emitted sentence update to WebSocket clients: {current_sentence}")
-        except Exception as e:
-            logger.error(f"Error emitting sentence update via WebSocket: {str(e)}")
+        # Update our stored sentence; viewers are only sent real changes
+        changed = set_sentence(client_id, new_sentence)
+        SENTENCE_UPDATES.inc(changed=str(changed).lower())
         
-        return jsonify({'success': True})
+        return jsonify({'success': True, 'changed': changed, 'version': get_session(client_id)['version']})
     except Exception as e:
         logger.error(f"Error processing direct sentence update: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+def poll_client_sentence(client_id, session):
+    """Fetch one client's sentence from the sign app and emit it if it changed"""
+    try:
+        # Use the SIGN_APP_URL that was detected to work in probe_sign_app
+        url = f"{SIGN_APP_URL}/get_sentence"
+        logger.info(f"Polling for sentence of {client_id} at {url}")
+        
+        response = requests.get(url, params={'clientId': client_id}, timeout=5)  # Increased timeout from 3 to 5 seconds
+        logger.info(f"Received response from sign app: Status {response.status_code}")
+        
+        if response.status_code == 200:
+            try:
+                data = response.json()
+                logger.info(f"Parsed response data: {data}")
+                
+                if data.get('success', False):
+                    new_sentence = data.get('sentence', [])
+                    # Only emit if there's a change
+                    if set_sentence(client_id, new_sentence):
+                        logger.info(f"Sentence updated for {client_id}: {new_sentence}")
+            except ValueError as e:
+                logger.error(f"Error parsing JSON response: {str(e)}, Response: {response.text}")
+        else:
+            logger.warning(f"Failed to get sentence, status code: {response.status_code}, Response: {response.text}")
+    except requests.ConnectionError as e:
+        logger.warning(f"Connection error to sign app: {str(e)}")
+    except requests.Timeout as e:
+        logger.warning(f"Timeout polling sign app: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error during polling request: {str(e)}")
+
 def poll_sign_app_for_sentence():
-    """Background thread function to poll the sign app for the current sentence"""
-    global current_sentence, stop_polling, last_update_time
+    """Background thread function to poll the sign app for the sentences of watched clients"""
+    global stop_polling
     
     while not stop_polling:
         try:
-            # Only poll if we haven't received a direct update recently
-            if time.time() - last_update_time > 5:  # Only poll if no updates for 5 seconds
-                try:
-                    # Use the SIGN_APP_URL that was detected to work in check_and_emit_status
-                    url = f"{SIGN_APP_URL}/get_sentence?clientId=default"
-                    logger.info(f"Polling for sentence at {url}")
-                    
-                    response = requests.get(url, timeout=5)  # Increased timeout from 3 to 5 seconds
-                logger.info(f"Received response from sign app: Status {response.status_code}")
+            with client_sessions_lock:
+                sessions = list(client_sessions.items())
+            
+            for client_id, session in sessions:
+                idle_time = time.time() - session['last_update_time']
                 
-                if response.status_code == 200:
-                    try:
-                        data = response.json()
-                        logger.info(f"Parsed response data: {data}")
-                        
-                        if data.get('success', False):
-                            new_sentence = data.get('sentence', [])
-                            # Only emit if there's a change
-                            if new_sentence != current_sentence:
-                                current_sentence = new_sentence
-                                last_update_time = time.time()
-                                logger.info(f"Sentence updated: {current_sentence}")
-                                try:
-                                    # Force emit via socket
-                                    socketio.emit('sentence_update', {'sentence': current_sentence})
-                                    # Also immediately try to send a REST API update for clients using direct API
-                                    socketio.sleep(0)  # Allow emit to process
-                                except Exception as e:
-                                    logger.error(f"Error emitting sentence update: {str(e)}")
-                    except ValueError as e:
-                        logger.error(f"Error parsing JSON response: {str(e)}, Response: {response.text}")
-                else:
-                    logger.warning(f"Failed to get sentence, status code: {response.status_code}, Response: {response.text}")
-                except requests.ConnectionError as e:
-                    logger.warning(f"Connection error to sign app: {str(e)}")
-                except requests.Timeout as e:
-                    logger.warning(f"Timeout polling sign app: {str(e)}")
-                except Exception as e:
-                    logger.error(f"Error during polling request: {str(e)}")
+                # Only poll clients someone is watching that haven't sent a direct update recently
+                if session['viewers'] > 0 and idle_time > 5:  # Only poll if no updates for 5 seconds
+                    poll_client_sentence(client_id, session)
             
-            # Force periodic updates even if no change detected
-            # This ensures clients have the latest sentence
-            if time.time() - last_update_time > 10:  # Every 10 seconds
-                try:
-                    socketio.emit('sentence_update', {'sentence': current_sentence})
-                    last_update_time = time.time()
-                    socketio.sleep(0)  # Allow emit to process
-                    logger.info(f"Sent periodic update with current sentence: {current_sentence}")
-                except Exception as e:
-                    logger.error(f"Error emitting periodic update: {str(e)}")
+            prune_idle_sessions()
                     
         except Exception as e:
             logger.error(f"Error polling for sentence: {str(e)}")
@@ -167,13 +220,9 @@ def start_sign_recognition():
         return False
     
     try:
-        # Use subprocess.Popen to start the app.py process
-        sign_recognition_process = subprocess.Popen(
-            [sys.executable, "app.py"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        # Use subprocess.Popen to start the app.py process. Its output goes to our
+        # console: nothing reads a pipe, and once one fills every app.py log call blocks.
+        sign_recognition_process = subprocess.Popen([sys.executable, "app.py"])
         logger.info("Sign recognition app started successfully")
         return True
     except Exception as e:
@@ -197,9 +246,6 @@ def start_angular_app():
         # Use shell=True for Windows to handle the & character properly
         angular_process = subprocess.Popen(
             ["ng", "serve"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
             shell=True  # Use shell=True on Windows for paths with special characters
         )
         # Change back to original directory
@@ -229,7 +275,17 @@ def check_service(url, max_attempts=10):
     return False
 
 # Get response from Gemini with enhanced error handling and retry
-def get_gemini_response(user_sentence):
+def get_gemini_response(user_sentence, client_id='default', fallback=True):
+    """
+    Get Gemini's response to a sentence, in-process or from the Gemini service
+    
+    Args:
+        fallback: If False, raise ResponseUnavailable instead of returning a
+                  canned response when Gemini can't answer
+    """
+    if EMBEDDED_GEMINI:
+        return get_embedded_gemini().get_response(user_sentence, fallback=fallback)
+    
     try:
         logger.info(f"Sending to Gemini: '{user_sentence}'")
         
@@ -238,21 +294,26 @@ def get_gemini_response(user_sentence):
         base_wait_time = 1  # Start with 1 second wait
         
         for attempt in range(max_attempts):
+            attempt_start = time.time()
             try:
                 # Log retry attempts
                 if attempt > 0:
                     logger.info(f"Retry attempt {attempt+1}/{max_attempts} for Gemini request")
+                    GEMINI_CALL_RETRIES.inc()
                 
                 # Make request with increasing timeout
                 response = requests.post(
                     GEMINI_URL,
                     json={
                         "sentence": user_sentence.split() if isinstance(user_sentence, str) else user_sentence,
-                        "clientId": "default"
+                        "clientId": client_id,
+                        "fallback": fallback
                     },
                     timeout=10 * (attempt + 1)  # Increasing timeout with each retry
                 )
                 
+                GEMINI_CALL_SECONDS.observe(time.time() - attempt_start, mode='http',
+                                            outcome='success' if response.status_code == 200 else f'http_{response.status_code}')
                 if response.status_code == 200:
                     response_data = response.json()
                     result = response_data.get('response', '').strip()
@@ -267,8 +328,14 @@ def get_gemini_response(user_sentence):
                 elif response.status_code == 404:
                     # Model not found - critical error
                     logger.error(f"Gemini model not found. Please ensure Gemini service is running with updated models.")
+                    if not fallback:
+                        raise ResponseUnavailable("Gemini model not found")
                     return "I cannot respond now"
                     
+                elif response.status_code == 503 and response.json().get('unavailable'):
+                    # Gemini couldn't answer (e.g. quota) and no canned response was asked for
+                    raise ResponseUnavailable(response.json().get('error', 'Gemini unavailable'))
+                    
                 elif response.status_code >= 500:
                     # Server error - retry
                     logger.warning(f"Gemini server error (status {response.status_code}) on attempt {attempt+1}")
@@ -282,13 +349,18 @@ def get_gemini_response(user_sentence):
                     if attempt < max_attempts - 1:
                         time.sleep(wait_time)
                     
+            except ResponseUnavailable:
+                raise
+                
             except requests.exceptions.Timeout:
+                GEMINI_CALL_SECONDS.observe(time.time() - attempt_start, mode='http', outcome='timeout')
                 logger.warning(f"Gemini request timed out on attempt {attempt+1}")
                 wait_time = base_wait_time * (2 ** attempt)  # Exponential backoff
                 if attempt < max_attempts - 1:
                     time.sleep(wait_time)
                     
             except requests.exceptions.ConnectionError:
+                GEMINI_CALL_SECONDS.observe(time.time() - attempt_start, mode='http', outcome='connection_error')
                 logger.error(f"Connection error to Gemini on attempt {attempt+1}. Is the service running?")
                 # Try to restart the Gemini service connection
                 trigger_gemini_connection_check()
@@ -297,18 +369,100 @@ def get_gemini_response(user_sentence):
                     time.sleep(wait_time)
                     
             except Exception as e:
+                GEMINI_CALL_SECONDS.observe(time.time() - attempt_start, mode='http', outcome='error')
                 logger.error(f"Error in Gemini request on attempt {attempt+1}: {str(e)}")
                 wait_time = base_wait_time * (2 ** attempt)  # Exponential backoff
                 if attempt < max_attempts - 1:
                     time.sleep(wait_time)
         
+        if not fallback:
+            raise ResponseUnavailable("All Gemini attempts failed")
         # If all attempts failed, provide a generic response (max 5 words)
         logger.warning("All Gemini attempts failed, using fallback response")
         return "I hear you"
+    except ResponseUnavailable:
+        raise
     except Exception as e:
         logger.error(f"Error getting Gemini response: {str(e)}")
+        if not fallback:
+            raise ResponseUnavailable(str(e)) from e
         return "Please continue"
 
+# Stream a response from Gemini, reporting each partial reply as it arrives
+def stream_gemini_response(user_sentence, on_partial, client_id='default'):
+    """
+    Stream a Gemini response through the integration service's SSE endpoint.
+    
+    Args:
+        user_sentence: The sentence to respond to
+        on_partial: Called with the post-processed response so far each time it grows
+        client_id: The recognition client the sentence came from
+        
+    Returns:
+        The final response, or None if streaming failed and the caller should
+        fall back to get_gemini_response
+    """
+    global last_successful_gemini_request
+    if EMBEDDED_GEMINI:
+        result = None
+        for partial in get_embedded_gemini().stream_response(user_sentence):
+            result = partial
+            on_partial(result)
+        return result
+    
+    stream_start = time.time()
+    try:
+        logger.info(f"Streaming from Gemini: '{user_sentence}'")
+        response = requests.post(
+            GEMINI_STREAM_URL,
+            json={
+                "sentence": user_sentence.split() if isinstance(user_sentence, str) else user_sentence,
+                "clientId": client_id
+            },
+            stream=True,
+            timeout=10
+        )
+        
+        if response.status_code != 200 or not response.headers.get('Content-Type', '').startswith('text/event-stream'):
+            logger.warning(f"Gemini stream unavailable (status {response.status_code}), falling back")
+            GEMINI_CALL_SECONDS.observe(time.time() - stream_start, mode='stream', outcome='unavailable')
+            response.close()
+            return None
+        
+        result = None
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                event = json.loads(line[len('data:'):].strip())
+                
+                if event.get('done'):
+                    if not event.get('success', False):
+                        logger.warning(f"Gemini stream failed: {event.get('error')}")
+                        GEMINI_CALL_SECONDS.observe(time.time() - stream_start, mode='stream', outcome='failed')
+                        return result
+                    result = event.get('response', result)
+                    break
+                
+                result = event.get('response', '')
+                on_partial(result)
+        
+        GEMINI_CALL_SECONDS.observe(time.time() - stream_start, mode='stream', outcome='success' if result else 'empty')
+        if result:
+            last_successful_gemini_request = time.time()
+            logger.info(f"Gemini streamed response: '{result}'")
+        return result
+        
+    except requests.exceptions.ConnectionError:
+        GEMINI_CALL_SECONDS.observe(time.time() - stream_start, mode='stream', outcome='connection_error')
+        logger.error("Connection error to Gemini stream. Is the service running?")
+        trigger_gemini_connection_check()
+        return None
+    except Exception as e:
+        GEMINI_CALL_SECONDS.observe(time.time() - stream_start, mode='stream', outcome='error')
+        logger.warning(f"Error streaming Gemini response: {str(e)}")
+        return None
+
 # Send text to Angular app for translation to sign language
 def send_to_angular_app(text):
     try:
@@ -347,6 +501,251 @@ def send_to_angular_app(text):
         logger.error(f"Error sending to Angular app: {str(e)}")
         return False
 
+# Low-priority pool shared by every client's speculative prefetches
+prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='prefetch')
+
+def client_room(client_id):
+    """Socket.IO room for every socket viewing a client's conversation"""
+    return f"client:{client_id}"
+
+def get_session(client_id):
+    """Return the conversation state for a client, creating it on first use"""
+    with client_sessions_lock:
+        return _get_session_locked(client_id)
+
+def _get_session_locked(client_id):
+    """get_session() for callers already holding client_sessions_lock"""
+    session = client_sessions.get(client_id)
+    if session is None:
+        session = {
+            'sentence': [],
+            'last_update_time': time.time(),
+            'viewers': 0,
+            # Bumped on every real change; emitted_version is the last one sent to viewers
+            'version': 0,
+            'emitted_version': 0,
+            'emit_scheduled': False,
+            # Prefetches keep only real responses; a failed one leaves sending to a live request
+            'prefetcher': ResponsePrefetcher(
+                lambda sentence: get_gemini_response(sentence, client_id, fallback=False),
+                debounce=PREFETCH_DEBOUNCE_SECONDS,
+                executor=prefetch_executor
+            )
+        }
+        client_sessions[client_id] = session
+    return session
+
+def add_viewer(client_id):
+    """Count a socket watching a client, under the lock prune_idle_sessions() checks viewers with"""
+    with client_sessions_lock:
+        _get_session_locked(client_id)['viewers'] += 1
+
+def remove_viewer(client_id):
+    """Stop counting a socket watching a client; a session already dropped isn't recreated"""
+    with client_sessions_lock:
+        session = client_sessions.get(client_id)
+        if session is not None:
+            session['viewers'] -= 1
+
+def prune_idle_sessions():
+    """Drop sessions nobody is viewing that haven't been updated for a while"""
+    now = time.time()
+    with client_sessions_lock:
+        idle = [client_id for client_id, session in client_sessions.items()
+                if session['viewers'] <= 0 and now - session['last_update_time'] > SESSION_IDLE_TIMEOUT]
+        for client_id in idle:
+            client_sessions.pop(client_id)['prefetcher'].shutdown()
+    if idle:
+        logger.info(f"Dropped idle conversation sessions: {idle}")
+
+def set_sentence(client_id, sentence):
+    """
+    Store a client's current sentence. If it changed, bump its version,
+    let the prefetcher know and schedule an update for its viewers.
+    
+    Returns:
+        bool: True if the sentence changed
+    """
+    session = get_session(client_id)
+    sentence = list(sentence)
+    with client_sessions_lock:
+        session['last_update_time'] = time.time()
+        if sentence == session['sentence']:
+            return False
+        session['sentence'] = sentence
+        session['version'] += 1
+    
+    if PREFETCH_ENABLED:
+        session['prefetcher'].sentence_changed(sentence)
+    publish_sentence(client_id)
+    return True
+
+def sentence_payload(session):
+    """The sentence_update payload for a session's current state"""
+    return {
+        'sentence': list(session['sentence']),
+        'version': session['version'],
+        'epoch': SENTENCE_EPOCH
+    }
+
+def publish_sentence(client_id):
+    """
+    Send a client's latest sentence to its viewers. Changes arriving within
+    SENTENCE_BATCH_WINDOW of each other are coalesced into one update.
+    """
+    session = get_session(client_id)
+    with client_sessions_lock:
+        if session['emit_scheduled']:
+            return
+        session['emit_scheduled'] = True
+    
+    if SENTENCE_BATCH_WINDOW > 0:
+        socketio.start_background_task(flush_sentence, client_id, session)
+    else:
+        flush_sentence(client_id, session)
+
+def flush_sentence(client_id, session):
+    """Emit the session's sentence once the batch window has passed, unless already sent"""
+    if SENTENCE_BATCH_WINDOW > 0:
+        socketio.sleep(SENTENCE_BATCH_WINDOW)
+    
+    with client_sessions_lock:
+        session['emit_scheduled'] = False
+        if session['version'] <= session['emitted_version']:
+            return
+        session['emitted_version'] = session['version']
+        payload = sentence_payload(session)
+    
+    emit_to_client(client_id, 'sentence_update', payload)
+
+def emit_to_client(client_id, event, data):
+    """Emit an event only to the sockets viewing a client's conversation"""
+    try:
+        socketio.emit(event, data, to=client_room(client_id))
+        SOCKET_EMITS.inc(event=event)
+    except Exception as e:
+        logger.warning(f"Socket emit failed: {str(e)}")
+
+def respond_to_sentence(client_id, sentence_words, on_partial):
+    """
+    Get the response to a sentence, reusing a prefetched response if one
+    was started for it, otherwise streaming it from Gemini.
+    
+    Args:
+        client_id: The recognition client the sentence came from
+        sentence_words: The sentence as a list of signs
+        on_partial: Called with partial responses while streaming
+        
+    Returns:
+        The response text
+    """
+    sentence = " ".join(sentence_words)
+    
+    prefetched = get_session(client_id)['prefetcher'].take(sentence_words)
+    if prefetched is not None:
+        try:
+            gemini_response = prefetched.result(timeout=30)
+            if gemini_response:
+                logger.info(f"Using prefetched Gemini response: '{gemini_response}'")
+                return gemini_response
+        except Exception as e:
+            logger.warning(f"Prefetched response unavailable: {str(e)}")
+    
+    gemini_response = stream_gemini_response(sentence, on_partial, client_id)
+    if not gemini_response:
+        gemini_response = get_gemini_response(sentence, client_id)
+    return gemini_response
+
+def clear_sign_app_sentence(client_id):
+    """Ask the sign app to clear a client's sentence"""
+    response = requests.post(
+        f"{SIGN_APP_URL}/clear_sentence", 
+        json={'clientId': client_id},
+        timeout=5
+    )
+    response.raise_for_status()
+
+def run_conversation_turn(client_id):
+    """
+    Respond to a client's current sentence and fan the response out. The
+    Angular translation and the sign app sentence clear run concurrently
+    while the response is emitted to the client's room, and the turn's
+    timings are recorded.
+    
+    Args:
+        client_id: The recognition client whose sentence to respond to
+        
+    Returns:
+        tuple: (sentence, gemini_response)
+    """
+    turn_start = time.time()
+    
+    # Get the sentence
+    sentence_words = list(get_session(client_id)['sentence'])
+    sentence = " ".join(sentence_words)
+    logger.info(f"Processing sentence for {client_id}: {sentence}")
+    
+    # Stream the response from Gemini, pushing partial replies as they arrive
+    def emit_partial(text):
+        emit_to_client(client_id, 'conversation_partial', {
+            'user_sentence': sentence,
+            'response': text
+        })
+        socketio.sleep(0)  # Allow emit to process
+    
+    gemini_response = respond_to_sentence(client_id, sentence_words, emit_partial)
+    response_time = time.time()
+    
+    # Send to Angular app and clear the sentence concurrently
+    angular_future = fanout_executor.submit(send_to_angular_app, gemini_response)
+    clear_future = fanout_executor.submit(clear_sign_app_sentence, client_id)
+    
+    # Emit the conversation update
+    emit_to_client(client_id, 'conversation_update', {
+        'user_sentence': sentence,
+        'response': gemini_response
+    })
+    
+    try:
+        clear_future.result()
+        # Reset our local copy too
+        set_sentence(client_id, [])
+    except Exception as e:
+        logger.warning(f"Failed to clear sentence after conversation: {str(e)}")
+    
+    angular_future.result()
+    turn_end = time.time()
+    
+    turn_timings.append({
+        'mode': 'embedded' if EMBEDDED_GEMINI else 'http',
+        'respond': response_time - turn_start,
+        'fanout': turn_end - response_time,
+        'total': turn_end - turn_start,
+        'timestamp': turn_end
+    })
+    TURN_SECONDS.observe(response_time - turn_start, phase='respond')
+    TURN_SECONDS.observe(turn_end - response_time, phase='fanout')
+    TURN_SECONDS.observe(turn_end - turn_start, phase='total')
+    logger.info(f"Conversation turn took {turn_end - turn_start:.3f}s "
+                f"(respond {response_time - turn_start:.3f}s, fan-out {turn_end - response_time:.3f}s)")
+    
+    return sentence, gemini_response
+
+def summarize_turn_timings():
+    """Summarize recent turn timings per mode and phase (count, mean, p50, p95 in seconds)"""
+    summary = {}
+    for mode in sorted({t['mode'] for t in turn_timings}):
+        turns = [t for t in turn_timings if t['mode'] == mode]
+        summary[mode] = {'count': len(turns)}
+        for phase in ('respond', 'fanout', 'total'):
+            values = sorted(t[phase] for t in turns)
+            summary[mode][phase] = {
+                'mean': sum(values) / len(values),
+                'p50': values[int(0.50 * (len(values) - 1))],
+                'p95': values[int(0.95 * (len(values) - 1))]
+            }
+    return summary
+
 # Main route to display UI
 @app.route('/')
 def index():
@@ -361,22 +760,26 @@ def auto_translate():
 # API endpoint to check status
 @app.route('/api/status', methods=['GET'])
 def api_status():
-    status = check_and_emit_status()
+    # Pass ?refresh=1 to probe the services now instead of using the cached status
+    if request.args.get('refresh') == '1':
+        status = refresh_status()
+    else:
+        status = get_cached_status()
     return jsonify(status)
 
 # Direct API endpoint for getting the current sentence
 @app.route('/api/sentence', methods=['GET'])
 def api_sentence():
-    global current_sentence
+    client_id = request.args.get('clientId', 'default')
     # Try to fetch latest sentence from sign app directly
     try:
-        response = requests.get(f"{SIGN_APP_URL}/get_sentence?clientId=default", timeout=3)
+        response = requests.get(f"{SIGN_APP_URL}/get_sentence", params={'clientId': client_id}, timeout=3)
         if response.status_code == 200:
             try:
                 data = response.json()
                 logger.info(f"API endpoint received data from sign app: {data}")
                 if data.get('success', False):
-                    current_sentence = data.get('sentence', [])
+                    set_sentence(client_id, data.get('sentence', []))
             except ValueError as e:
                 logger.warning(f"Could not parse JSON response from sign app: {str(e)}, Response: {response.text}")
         else:
@@ -392,7 +795,9 @@ def api_sentence():
         sign_app_status = "Not running"
     
     return jsonify({
-        'sentence': current_sentence,
+        'sentence': get_session(client_id)['sentence'],
+        'version': get_session(client_id)['version'],
+        'clientId': client_id,
         'timestamp': time.time(),
         'sign_app_status': sign_app_status
     })
@@ -401,24 +806,20 @@ def api_sentence():
 @app.route('/api/clear_sentence', methods=['POST'])
 def api_clear_sentence():
     try:
+        client_id = (request.get_json(silent=True) or {}).get('clientId', request.args.get('clientId', 'default'))
         response = requests.post(
             f"{SIGN_APP_URL}/clear_sentence", 
-            json={'clientId': 'default'},
+            json={'clientId': client_id},
             timeout=5
         )
         
         success = response.status_code == 200
         if success:
-            global current_sentence
-            current_sentence = []
+            set_sentence(client_id, [])
             # Try to emit via socket too
-            try:
-                socketio.emit('sentence_update', {'sentence': []})
-                socketio.emit('system_message', {'message': 'Sentence cleared'})
-            except Exception as e:
-                logger.warning(f"Socket emit failed: {str(e)}")
+            emit_to_client(client_id, 'system_message', {'message': 'Sentence cleared'})
                 
-            logger.info("Sentence cleared successfully")
+            logger.info(f"Sentence cleared successfully for {client_id}")
             return jsonify({'success': True})
         else:
             logger.error(f"Failed to clear sentence: {response.status_code}")
@@ -431,48 +832,15 @@ def api_clear_sentence():
 @app.route('/api/send_conversation', methods=['POST'])
 def api_send_conversation():
     try:
-        global current_sentence
+        client_id = (request.get_json(silent=True) or {}).get('clientId', request.args.get('clientId', 'default'))
         
-        if not current_sentence:
+        if not get_session(client_id)['sentence']:
             return jsonify({
                 'success': False, 
                 'error': 'No sentence available'
             })
         
-        # Get the sentence
-        sentence = " ".join(current_sentence)
-        logger.info(f"Processing sentence: {sentence}")
-        
-        # Get response from Gemini
-        gemini_response = get_gemini_response(sentence)
-        
-        # Send to Angular app (simulation)
-        success = send_to_angular_app(gemini_response)
-        
-        # Try to emit via socket
-        try:
-            socketio.emit('conversation_update', {
-                'user_sentence': sentence,
-                'response': gemini_response
-            })
-        except Exception as e:
-            logger.warning(f"Socket emit failed: {str(e)}")
-        
-        # Clear the sentence after sending
-        try:
-            requests.post(
-                f"{SIGN_APP_URL}/clear_sentence", 
-                json={'clientId': 'default'},
-                timeout=5
-            )
-            # Reset our local copy too
-            current_sentence = []
-            try:
-                socketio.emit('sentence_update', {'sentence': []})
-            except Exception as e:
-                logger.warning(f"Socket emit failed: {str(e)}")
-        except Exception as e:
-            logger.warning(f"Failed to clear sentence after conversation: {str(e)}")
+        sentence, gemini_response = run_conversation_turn(client_id)
         
         return jsonify({
             'success': True, 
@@ -487,36 +855,105 @@ def api_send_conversation():
             'error': str(e)
         })
 
+# API endpoint for recent conversation turn timings
+@app.route('/api/turn_timings', methods=['GET'])
+def api_turn_timings():
+    return jsonify({
+        'embedded_gemini': EMBEDDED_GEMINI,
+        'summary': summarize_turn_timings(),
+        'recent': list(turn_timings)[-20:]
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics for conversation turns, Gemini calls and socket traffic"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
 # SocketIO event handlers
+def is_up_to_date(session, since_version, epoch):
+    """True if a client that last saw since_version in epoch already has the current sentence"""
+    return epoch == SENTENCE_EPOCH and since_version == session['version']
+
+def parse_version(value):
+    """Parse a since_version sent by a client, or None if missing or invalid"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def watch_client(client_id, since_version=None, epoch=None):
+    """
+    Move the current socket into a client's room and send it that client's
+    sentence, unless it says it already has the current version.
+    """
+    previous = socket_clients.get(request.sid)
+    if previous != client_id:
+        if previous is not None:
+            leave_room(client_room(previous))
+            remove_viewer(previous)
+        
+        socket_clients[request.sid] = client_id
+        join_room(client_room(client_id))
+        add_viewer(client_id)
+    
+    session = get_session(client_id)
+    if not is_up_to_date(session, since_version, epoch):
+        emit('sentence_update', sentence_payload(session))
+        SOCKET_EMITS.inc(event='sentence_update')
+
 @socketio.on('connect')
 def handle_connect():
-    logger.info('Client connected')
-    # Send current status and sentence immediately upon connection
-    check_and_emit_status()
-    emit('sentence_update', {'sentence': current_sentence})
+    client_id = request.args.get('clientId', 'default')
+    logger.info(f'Client connected, watching {client_id}')
+    # Send current status, and the sentence if the client missed changes while away
+    emit('status_update', get_cached_status())
+    watch_client(client_id, parse_version(request.args.get('since_version')), request.args.get('epoch'))
+
+@socketio.on('sync')
+def handle_sync(data):
+    """Answer a client asking for the changes since the sentence version it last saw"""
+    data = data or {}
+    client_id = socket_clients.get(request.sid, 'default')
+    session = get_session(client_id)
+    if is_up_to_date(session, parse_version(data.get('since_version')), data.get('epoch')):
+        return {'changed': False, 'version': session['version'], 'epoch': SENTENCE_EPOCH}
+    return dict(sentence_payload(session), changed=True)
+
+@socketio.on('join_client')
+def handle_join_client(data):
+    client_id = (data or {}).get('clientId')
+    if not client_id:
+        return {'success': False, 'error': 'No clientId given'}
+    logger.info(f'Socket now watching {client_id}')
+    watch_client(client_id)
+    return {'success': True}
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    client_id = socket_clients.pop(request.sid, None)
+    if client_id is not None:
+        remove_viewer(client_id)
     logger.info('Client disconnected')
 
 @socketio.on('check_status')
 def handle_check_status():
-    check_and_emit_status()
+    # Answer from the cache right away; changes found by the refresh are pushed when ready
+    emit('status_update', health_monitor.snapshot())
+    health_monitor.request_refresh()
 
 @socketio.on('clear_sentence')
 def handle_clear_sentence():
     try:
+        client_id = socket_clients.get(request.sid, 'default')
         response = requests.post(
             f"{SIGN_APP_URL}/clear_sentence", 
-            json={'clientId': 'default'},
+            json={'clientId': client_id},
             timeout=5
         )
         
         success = response.status_code == 200
         if success:
-            global current_sentence
-            current_sentence = []
-            emit('sentence_update', {'sentence': []})
+            set_sentence(client_id, [])
             emit('system_message', {'message': 'Sentence cleared'})
             logger.info("Sentence cleared successfully")
         else:
@@ -532,41 +969,14 @@ def handle_clear_sentence():
 @socketio.on('send_conversation')
 def handle_send_conversation():
     try:
-        # Use the current sentence we've been tracking
-        global current_sentence
+        # Use the sentence we've been tracking for the client this socket watches
+        client_id = socket_clients.get(request.sid, 'default')
         
-        if not current_sentence:
+        if not get_session(client_id)['sentence']:
             emit('system_message', {'message': 'No sentence available'})
             return {'success': False, 'error': 'No sentence available'}
         
-        # Get the sentence
-        sentence = " ".join(current_sentence)
-        logger.info(f"Processing sentence: {sentence}")
-        
-        # Get response from Gemini
-        gemini_response = get_gemini_response(sentence)
-        
-        # Send to Angular app (simulation)
-        success = send_to_angular_app(gemini_response)
-        
-        # Emit the conversation update
-        emit('conversation_update', {
-            'user_sentence': sentence,
-            'response': gemini_response
-        })
-        
-        # Clear the sentence after sending
-        try:
-            requests.post(
-                f"{SIGN_APP_URL}/clear_sentence", 
-                json={'clientId': 'default'},
-                timeout=5
-            )
-            # Reset our local copy too
-            current_sentence = []
-            emit('sentence_update', {'sentence': []})
-        except Exception as e:
-            logger.warning(f"Failed to clear sentence after conversation: {str(e)}")
+        sentence, gemini_response = run_conversation_turn(client_id)
         
         return {'success': True, 'response': gemini_response}
         
@@ -575,158 +985,148 @@ def handle_send_conversation():
         emit('system_message', {'message': f'Error: {str(e)}'})
         return {'success': False, 'error': str(e)}
 
-def check_and_emit_status():
-    """Check all services and emit status to clients"""
-    sign_app_running = False
-    angular_app_running = False
-    gemini_running = False
-    
-    # Try both port 5000 and 5005 for the sign app
-    sign_app_ports = ["http://127.0.0.1:5000", "http://127.0.0.1:5005"]  # Try 5000 first which is the default
-    sign_app_url_used = None
+# Thread pool for probing the candidate URLs of one service concurrently
+probe_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='probe')
+
+def first_reachable(urls, check):
+    """
+    Run check against every URL concurrently
     
-    # Try each possible port for the sign app with improved error handling
-    for test_url in sign_app_ports:
-        try:
-            # Increase timeout to 5 seconds to give it more time to respond
-            logger.info(f"Checking sign app at {test_url}...")
-            sign_response = requests.get(f"{test_url}/test", timeout=5)
-            logger.info(f"Response from {test_url}: status={sign_response.status_code}, content={sign_response.text[:100]}")
-            
-            if sign_response.status_code == 200:
-                sign_app_running = True
-                sign_app_url_used = test_url
-                # Update the global SIGN_APP_URL to use the working port
-                global SIGN_APP_URL
-                SIGN_APP_URL = test_url
-                logger.info(f"✅ Sign app found and running at {test_url} - using this URL")
-                
-                # Try to parse the response as JSON to verify it's really our app
-                try:
-                    data = sign_response.json()
-                    if data.get('success', False):
-                        logger.info(f"Sign app test endpoint confirmed success=true")
-                    else:
-                        logger.info(f"Sign app test endpoint returned success=false, but connection is working")
-                except ValueError:
-                    logger.info(f"Sign app response is not JSON, but connection is working")
-                    
-                break
-        except requests.RequestException as e:
-            logger.warning(f"Sign recognition app not available at {test_url}: {str(e)}")
-        except Exception as e:
-            logger.warning(f"Unexpected error checking sign app at {test_url}: {str(e)}")
+    Returns:
+        The first URL, in preference order, for which check returned True, or None
+    """
+    results = list(probe_executor.map(check, urls))
+    for url, ok in zip(urls, results):
+        if ok:
+            return url
+    return None
+
+def check_sign_app_url(test_url):
+    """Check whether the sign app answers its test endpoint at a URL"""
+    try:
+        sign_response = requests.get(f"{test_url}/test", timeout=5)
+        return sign_response.status_code == 200
+    except requests.RequestException as e:
+        logger.warning(f"Sign recognition app not available at {test_url}: {str(e)}")
+        return False
+
+def check_angular_url(angular_url):
+    """Check whether the Angular app is serving at a URL, with a lighter HEAD request as fallback"""
+    try:
+        angular_response = requests.get(angular_url, timeout=3, 
+                                      headers={'Accept': 'text/html', 'User-Agent': 'Mozilla/5.0'})
+        # Angular might return various status codes when running
+        if 200 <= angular_response.status_code < 400:
+            return True
+    except requests.RequestException as e:
+        logger.warning(f"Angular app not available at {angular_url}: {str(e)}")
     
-    if not sign_app_running:
+    try:
+        head_response = requests.head(angular_url, timeout=1)
+        return head_response.status_code < 500  # Any non-server error is promising
+    except requests.RequestException:
+        return False
+
+def probe_sign_app():
+    """Find the sign app on ports 5000 and 5005 and remember the working URL"""
+    global SIGN_APP_URL
+    # Try 5000 first which is the default
+    test_url = first_reachable(["http://127.0.0.1:5000", "http://127.0.0.1:5005"], check_sign_app_url)
+    if test_url is None:
         logger.warning("❌ Sign recognition app is not running on any tested port")
-        # Let's try a simpler check for each port without JSON parsing
-        for test_url in sign_app_ports:
-            try:
-                # Very basic check just to see if something is there
-                simple_response = requests.get(test_url, timeout=2)
-                logger.info(f"Basic check at {test_url}: status={simple_response.status_code}")
-                if simple_response.status_code == 200:
-                    logger.info(f"⚠️ Something is running at {test_url}, but not responding to /test endpoint")
-            except:
-                pass
-    
-    # Check Angular app with multiple URLs and better error handling
-    angular_urls = ["http://127.0.0.1:4200", "http://localhost:4200", "http://0.0.0.0:4200"]
+        return False
+    
+    if test_url != SIGN_APP_URL:
+        logger.info(f"✅ Sign app found and running at {test_url} - using this URL")
+    SIGN_APP_URL = test_url
+    return True
+
+def probe_angular_app():
+    """Find the Angular app on any of its usual URLs and remember the working one"""
     global ANGULAR_APP_URL
+    angular_url = first_reachable(["http://127.0.0.1:4200", "http://localhost:4200", "http://0.0.0.0:4200"],
+                                  check_angular_url)
     
-    for angular_url in angular_urls:
+    # Last resort - just assume it's running if we can access anything on the port
+    if angular_url is None:
         try:
-            logger.info(f"Checking Angular app at {angular_url}...")
-            # Use a shorter timeout for Angular (2 seconds)
-            angular_response = requests.get(angular_url, timeout=3, 
-                                          headers={'Accept': 'text/html', 'User-Agent': 'Mozilla/5.0'})
-            status = angular_response.status_code
-            logger.info(f"Angular app response from {angular_url}: status={status}")
-            
-            # Angular might return various status codes when running
-            if status == 200 or status == 304 or (status >= 300 and status < 400):
-                angular_app_running = True
-                ANGULAR_APP_URL = angular_url
-                logger.info(f"✅ Angular app found at {angular_url}")
-                break
-        except requests.RequestException as e:
-            logger.warning(f"Angular app not available at {angular_url}: {str(e)}")
-        except Exception as e:
-            logger.warning(f"Error checking Angular app at {angular_url}: {str(e)}")
-    
-    if not angular_app_running:
-        # Try a more basic check with HEAD requests (lighter/faster)
-        for angular_url in angular_urls:
-            try:
-                head_response = requests.head(angular_url, timeout=1)
-                if head_response.status_code < 500:  # Any non-server error is promising
-                    logger.info(f"✅ Angular app seems to be running at {angular_url} (HEAD request)")
-                    angular_app_running = True
-                    ANGULAR_APP_URL = angular_url
-                    break
-            except:
-                pass
-                
-        # Last resort - just assume it's running if we can access anything on the port
-        if not angular_app_running:
-            try:
-                import socket
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(1)
-                result = sock.connect_ex(('127.0.0.1', 4200))
-                sock.close()
-                if result == 0:
-                    logger.info("✅ Port 4200 is open, assuming Angular app is running")
-                    angular_app_running = True
-                    ANGULAR_APP_URL = "http://127.0.0.1:4200"
-            except:
-                pass
+            import socket
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(1)
+            result = sock.connect_ex(('127.0.0.1', 4200))
+            sock.close()
+            if result == 0:
+                logger.info("✅ Port 4200 is open, assuming Angular app is running")
+                angular_url = "http://127.0.0.1:4200"
+        except Exception:
+            pass
     
-    if not angular_app_running:
+    if angular_url is None:
         logger.warning("❌ Angular app not detected on any tested URL")
+        return False
+    
+    ANGULAR_APP_URL = angular_url
+    return True
+
+def probe_gemini():
+    """Check whether Gemini can answer requests"""
+    if EMBEDDED_GEMINI:
+        # The handler runs in this process, so it is up unless rate-limited
+        return not get_embedded_gemini().quota_exceeded
     
     try:
-        # First check if Gemini server is running at all using the test endpoint
+        # Check if Gemini server is running at all using the test endpoint
         gemini_server_response = requests.get(GEMINI_STATUS_URL, timeout=3)
         
-        if gemini_server_response.status_code == 200:
-            # Check if the test endpoint returns success
-            try:
-                data = gemini_server_response.json()
-                gemini_running = data.get('success', False)
-                
-                if gemini_running:
-                    logger.info(f"Gemini is running correctly")
-                else:
-                    logger.warning(f"Gemini service returned success=false")
-            except ValueError:
-                logger.warning("Could not parse JSON from Gemini status response")
-                gemini_running = gemini_server_response.status_code == 200
-        else:
+        if gemini_server_response.status_code != 200:
             logger.warning(f"Gemini server returned status code {gemini_server_response.status_code}")
+            return False
+        
+        # Check if the test endpoint returns success
+        try:
+            gemini_running = gemini_server_response.json().get('success', False)
+            if not gemini_running:
+                logger.warning(f"Gemini service returned success=false")
+            return gemini_running
+        except ValueError:
+            logger.warning("Could not parse JSON from Gemini status response")
+            return True
             
     except requests.ConnectionError:
         logger.warning("Could not connect to Gemini. Make sure Gemini service is running.")
     except requests.exceptions.ReadTimeout:
         logger.warning("Gemini request timed out. Service might be overloaded.")
-    except Exception as e:
-        logger.warning(f"Error checking Gemini: {str(e)}")
-    
-    # Emit status to all clients
+    return False
+
+def emit_status(status):
+    """Push a service status change to all clients"""
     try:
-        socketio.emit('status_update', {
-            'sign_app_running': sign_app_running,
-            'angular_app_running': angular_app_running,
-            'gemini_running': gemini_running
-        })
+        socketio.emit('status_update', status)
+        SOCKET_EMITS.inc(event='status_update')
     except Exception as e:
         logger.warning(f"Failed to emit status update: {str(e)}")
-    
-    return {
-        'sign_app_running': sign_app_running,
-        'angular_app_running': angular_app_running,
-        'gemini_running': gemini_running
-    }
+
+# Probe all services concurrently in the background and cache the result
+health_monitor = HealthMonitor(
+    {
+        'sign_app_running': probe_sign_app,
+        'angular_app_running': probe_angular_app,
+        'gemini_running': probe_gemini
+    },
+    interval=float(os.environ.get('HEALTH_CHECK_INTERVAL', '5')),
+    ttl=float(os.environ.get('HEALTH_CHECK_TTL', '15')),
+    on_change=emit_status
+)
+
+def get_cached_status():
+    """Return the cached service status, asking for a refresh if it is stale"""
+    if health_monitor.is_stale():
+        health_monitor.request_refresh()
+    return health_monitor.snapshot()
+
+def refresh_status():
+    """Check all services now; a change reaches clients through the monitor's on_change"""
+    return health_monitor.refresh()
 
 # Function to clean up processes on shutdown
 def cleanup():
@@ -734,6 +1134,14 @@ def cleanup():
     
     global stop_polling
     stop_polling = True
+    with client_sessions_lock:
+        for session in client_sessions.values():
+            session['prefetcher'].shutdown()
+    prefetch_executor.shutdown(wait=False)
+    health_monitor.stop()
+    fanout_executor.shutdown(wait=False)
+    if embedded_gemini:
+        embedded_gemini.shutdown()
     
     if sign_recognition_process:
         logger.info("Terminating sign recognition app...")
@@ -820,13 +1228,13 @@ if __name__ == '__main__':
         sign_app_ports = ["http://127.0.0.1:5000", "http://127.0.0.1:5005"]
         
         for test_url in sign_app_ports:
-        try:
+            try:
                 logger.info(f"Checking for sign app at {test_url}...")
                 sign_response = requests.get(f"{test_url}/test", timeout=5)
                 if sign_response.status_code == 200:
                     sign_running = True
                     # Update the URL to use the working port
-                    # We rely on the global declaration already present in check_and_emit_status
+                    # We rely on the global declaration already present in probe_sign_app
                     SIGN_APP_URL = test_url  
                     logger.info(f"✅ Sign recognition app is already running at {test_url}")
                     break
@@ -879,28 +1287,33 @@ if __name__ == '__main__':
             logger.warning("Angular app not detected. Please start it with: cd asl&fslmodel/frontend && ng serve")
         
         # Check if Gemini is running and start the connection maintenance thread
-        try:
-            response = requests.get(GEMINI_STATUS_URL, timeout=5)
-            gemini_running = response.status_code == 200
-            if gemini_running:
-                logger.info(f"Gemini is running")
-                # Start the Gemini connection maintenance thread
-                gemini_connection_thread = threading.Thread(target=check_gemini_connection, daemon=True)
-                gemini_connection_thread.start()
-                logger.info("Started Gemini connection maintenance thread")
-            else:
-                logger.warning(f"Gemini service returned status code {response.status_code}. Make sure Gemini is running.")
-        except Exception as e:
-            logger.warning(f"Gemini might not be running: {str(e)}")
-            logger.warning(f"Please make sure Gemini is running.")
+        if EMBEDDED_GEMINI:
+            # The in-process handler maintains its own connection
+            get_embedded_gemini()
+        else:
+            try:
+                response = requests.get(GEMINI_STATUS_URL, timeout=5)
+                gemini_running = response.status_code == 200
+                if gemini_running:
+                    logger.info(f"Gemini is running")
+                    # Start the Gemini connection maintenance thread
+                    gemini_connection_thread = socketio.start_background_task(check_gemini_connection)
+                    logger.info("Started Gemini connection maintenance thread")
+                else:
+                    logger.warning(f"Gemini service returned status code {response.status_code}. Make sure Gemini is running.")
+            except Exception as e:
+                logger.warning(f"Gemini might not be running: {str(e)}")
+                logger.warning(f"Please make sure Gemini is running.")
         
         # If services started successfully, start the sentence polling thread
         if success:
             stop_polling = False
-            sentence_polling_thread = threading.Thread(target=poll_sign_app_for_sentence, daemon=True)
-            sentence_polling_thread.start()
+            sentence_polling_thread = socketio.start_background_task(poll_sign_app_for_sentence)
             logger.info("Started sentence polling thread")
         
+        # Keep the service status fresh in the background
+        health_monitor.start()
+        
         # Start the orchestration app
         logger.info("Starting conversation orchestration app on port 5001")
         logger.info("NOTE: Please make sure the following services are running separately:")
@@ -908,8 +1321,14 @@ if __name__ == '__main__':
         logger.info("2. Angular App: cd asl&fslmodel/frontend && ng serve (on port 4200)")
         logger.info(f"3. Gemini Service")
         
-        # Run with allow_unsafe_werkzeug=True to support newer Flask versions
-        socketio.run(app, host='0.0.0.0', port=5001, debug=True, allow_unsafe_werkzeug=True)
+        if ASYNC_MODE == 'eventlet':
+            # Raise eventlet's default limit of 1024 concurrent connections
+            logger.info("Serving Socket.IO cooperatively with eventlet")
+            socketio.run(app, host='0.0.0.0', port=5001, debug=True, use_reloader=False,
+                         max_size=int(os.environ.get('ORCHESTRATOR_MAX_CONNECTIONS', '10000')))
+        else:
+            # Run with allow_unsafe_werkzeug=True to support newer Flask versions
+            socketio.run(app, host='0.0.0.0', port=5001, debug=True, allow_unsafe_werkzeug=True)
     except KeyboardInterrupt:
         logger.info("Interrupted by user")
     finally:
@@ -0,0 +1,283 @@
+import argparse
+import json
+import math
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+# Turns each client's stream of model score vectors into sign events. Scores
+# are smoothed with an exponential moving average over time, so clients
+# sending frames at different rates (see frame_pacing.py) are smoothed alike.
+# A sign is held from when its smoothed score reaches the enter threshold
+# until it falls below the lower exit threshold, and emitted once it has been
+# held for min_hold_seconds, unless it was emitted less than its refractory
+# period ago. Each update is a fixed number of array operations on the
+# clients' rows, however long they have been signing, and any number of
+# clients can be updated in one call.
+#
+# Score streams saved as .npy/.npz (an array of score vectors, plus "times"
+# in seconds in an .npz) can be decoded offline:
+#   python sign_decoder.py scores.npz --fps 20
+
+SignEvent = namedtuple('SignEvent', ['client_id', 'sign', 'time', 'score'])
+
+class StreamingSignDecoder:
+    """
+    Sign decoder with one row of state per client: the smoothed scores, the
+    held sign, when it started and whether it was emitted, and when each sign
+    was last emitted. Updates are thread safe.
+    """
+
+    def __init__(self, registry, smoothing_seconds=0.15, enter_threshold=0.65, exit_threshold=0.45,
+                 min_hold_seconds=0.1, capacity=16):
+        """
+        Args:
+            registry: SignRegistry of the model's signs, for their names and refractory periods
+            smoothing_seconds: Time constant of the moving average
+            enter_threshold: Smoothed score at which a sign starts being held
+            exit_threshold: Smoothed score below which the held sign is let go; with
+                            enter_threshold + exit_threshold > 1, softmax scores can't
+                            have another sign enter while one is held
+            min_hold_seconds: How long a sign must be held before it is emitted
+            capacity: Client rows allocated up front; more are added as needed
+        """
+        if exit_threshold > enter_threshold:
+            raise ValueError("exit_threshold must not be above enter_threshold")
+        self.names = list(registry.names)
+        self.refractory = np.array([sign.refractory_seconds for sign in registry.signs])
+        self.smoothing_seconds = smoothing_seconds
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.min_hold_seconds = min_hold_seconds
+        self.rows = {}  # client id -> row of the state arrays
+        self.free_rows = []
+        self.lock = threading.Lock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Grow the state arrays to capacity rows, keeping the existing ones"""
+        signs = len(self.names)
+        used = len(getattr(self, 'last_time', ()))
+        state = {
+            'smoothed': np.zeros((capacity, signs), dtype=np.float32),
+            'last_time': np.full(capacity, np.nan),        # Time of the last update, NaN before the first
+            'held': np.full(capacity, -1, dtype=int),      # Index of the held sign, -1 for none
+            'held_since': np.zeros(capacity),
+            'emitted': np.zeros(capacity, dtype=bool),     # Whether the held sign was emitted
+            'last_emitted': np.full((capacity, signs), -np.inf)
+        }
+        for name, array in state.items():
+            if used:
+                array[:used] = getattr(self, name)
+            setattr(self, name, array)
+        self.free_rows.extend(range(capacity - 1, used - 1, -1))
+
+    def _row(self, client_id):
+        row = self.rows.get(client_id)
+        if row is None:
+            if not self.free_rows:
+                self._allocate(2 * len(self.last_time))
+            row = self.rows[client_id] = self.free_rows.pop()
+            self._clear(row)
+        return row
+
+    def _clear(self, row, keep_emitted=False):
+        self.smoothed[row] = 0
+        self.last_time[row] = np.nan
+        self.held[row] = -1
+        self.emitted[row] = False
+        if not keep_emitted:
+            self.last_emitted[row] = -np.inf
+
+    def update(self, client_ids, scores, times):
+        """
+        Feed one score vector for each of a batch of clients, with the same
+        result as a step() for each
+
+        Args:
+            client_ids: The clients, each at most once per call
+            scores: Array of shape (clients, signs) of model scores
+            times: Timestamp in seconds of each score vector, increasing per client
+
+        Returns:
+            list of SignEvent for the signs emitted
+        """
+        scores = np.asarray(scores, dtype=np.float32)
+        times = np.asarray(times, dtype=float)
+        if scores.shape != (len(client_ids), len(self.names)):
+            raise ValueError(f"Expected scores of shape ({len(client_ids)}, {len(self.names)}), got {scores.shape}")
+
+        with self.lock:
+            rows = np.array([self._row(client_id) for client_id in client_ids], dtype=int)
+
+            # Moving average, starting from zero as if one time constant had passed
+            # since, so a single frame can't start holding a sign
+            elapsed = times - self.last_time[rows]
+            elapsed = np.where(np.isnan(elapsed), self.smoothing_seconds, np.maximum(elapsed, 0))
+            weight = -np.expm1(-elapsed / self.smoothing_seconds)
+            smoothed = self.smoothed[rows]
+            smoothed += weight[:, np.newaxis].astype(np.float32) * (scores - smoothed)
+            self.smoothed[rows] = smoothed
+            self.last_time[rows] = times
+
+            # Let go of held signs that dropped below the exit threshold
+            held = self.held[rows]
+            batch = np.arange(len(rows))
+            released = (held >= 0) & (smoothed[batch, held] < self.exit_threshold)
+            held[released] = -1
+
+            # Start holding the top sign once it reaches the enter threshold
+            top = smoothed.argmax(axis=1)
+            started = (held < 0) & (smoothed[batch, top] >= self.enter_threshold)
+            held[started] = top[started]
+            self.held[rows] = held
+            self.held_since[rows[started]] = times[started]
+            self.emitted[rows[released | started]] = False
+
+            # Emit held signs that were held long enough and are out of their refractory period
+            holding = held >= 0
+            sign = np.where(holding, held, 0)
+            emit = (holding & ~self.emitted[rows] &
+                    (times - self.held_since[rows] >= self.min_hold_seconds) &
+                    (times - self.last_emitted[rows, sign] >= self.refractory[sign]))
+            if not emit.any():
+                return []
+            self.emitted[rows[emit]] = True
+            self.last_emitted[rows[emit], sign[emit]] = times[emit]
+            return [SignEvent(client_ids[i], self.names[sign[i]], float(times[i]), float(smoothed[i, sign[i]]))
+                    for i in np.flatnonzero(emit)]
+
+    def step(self, client_id, scores, time):
+        """
+        Feed one client's score vector, as update() does for a batch but on
+        scalars, which is faster for a single client
+
+        Returns:
+            SignEvent, or None if no sign was emitted
+        """
+        scores = np.asarray(scores, dtype=np.float32)
+        if scores.shape != (len(self.names),):
+            raise ValueError(f"Expected {len(self.names)} scores, got shape {scores.shape}")
+
+        with self.lock:
+            row = self._row(client_id)
+            smoothed = self.smoothed[row]
+            last_time = self.last_time[row]
+            elapsed = self.smoothing_seconds if math.isnan(last_time) else max(time - last_time, 0)
+            smoothed += np.float32(-math.expm1(-elapsed / self.smoothing_seconds)) * (scores - smoothed)
+            self.last_time[row] = time
+
+            held = int(self.held[row])
+            if held >= 0 and smoothed[held] < self.exit_threshold:
+                held = -1
+                self.emitted[row] = False
+            if held < 0:
+                top = int(smoothed.argmax())
+                if smoothed[top] >= self.enter_threshold:
+                    held = top
+                    self.held_since[row] = time
+                    self.emitted[row] = False
+            self.held[row] = held
+
+            if (held < 0 or self.emitted[row] or time - self.held_since[row] < self.min_hold_seconds or
+                    time - self.last_emitted[row, held] < self.refractory[held]):
+                return None
+            self.emitted[row] = True
+            self.last_emitted[row, held] = time
+            return SignEvent(client_id, self.names[held], float(time), float(smoothed[held]))
+
+    def held_sign(self, client_id):
+        """The sign the client is holding, or None"""
+        with self.lock:
+            row = self.rows.get(client_id)
+            if row is None or self.held[row] < 0:
+                return None
+            return self.names[self.held[row]]
+
+    def reset(self, client_id):
+        """Forget a client's smoothed scores and held sign, but keep its refractory periods running"""
+        with self.lock:
+            row = self.rows.get(client_id)
+            if row is not None:
+                self._clear(row, keep_emitted=True)
+
+    def remove(self, client_id):
+        """Drop a client's state and free its row"""
+        with self.lock:
+            row = self.rows.pop(client_id, None)
+            if row is not None:
+                self.free_rows.append(row)
+
+def decode_stream(decoder, scores, times, client_id='stream'):
+    """
+    Decode one recorded score stream frame by frame
+
+    Args:
+        decoder: A StreamingSignDecoder
+        scores: Array of shape (frames, signs)
+        times: Timestamp of each frame in seconds
+
+    Returns:
+        list of SignEvent
+    """
+    events = []
+    for frame_scores, time in zip(scores, times):
+        event = decoder.step(client_id, frame_scores, time)
+        if event:
+            events.append(event)
+    return events
+
+def decode_streams(decoder, streams, fps):
+    """
+    Decode many recorded score streams at once, one batched update per frame
+    step, as if each stream were a client sending frames at fps
+
+    Args:
+        decoder: A StreamingSignDecoder
+        streams: Stream id -> array of shape (frames, signs)
+        fps: Frame rate of the streams
+
+    Returns:
+        dict: Stream id -> list of SignEvent
+    """
+    events = {stream: [] for stream in streams}
+    longest = max((len(scores) for scores in streams.values()), default=0)
+    for step in range(longest):
+        batch = [stream for stream, scores in streams.items() if step < len(scores)]
+        for event in decoder.update(batch, [streams[stream][step] for stream in batch], [step / fps] * len(batch)):
+            events[event.client_id].append(event)
+    return events
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode recorded score streams into sign events")
+    parser.add_argument('paths', nargs='+', help=".npy arrays of score vectors, or .npz files with scores and times")
+    parser.add_argument('--fps', type=float, default=20.0, help="Frame rate of streams without times")
+    parser.add_argument('--smoothing-seconds', type=float, default=0.15, help="Time constant of the moving average")
+    parser.add_argument('--enter', type=float, default=0.65, help="Smoothed score at which a sign is held")
+    parser.add_argument('--exit', type=float, default=0.45, help="Smoothed score below which it is let go")
+    parser.add_argument('--min-hold-seconds', type=float, default=0.1, help="Hold time before a sign is emitted")
+    parser.add_argument('--json', help="Also write the events to this file")
+    args = parser.parse_args()
+
+    from recognition_logic import SIGNS
+    decoder = StreamingSignDecoder(SIGNS, args.smoothing_seconds, args.enter, args.exit, args.min_hold_seconds)
+    report = {}
+    for path in args.paths:
+        data = np.load(path)
+        if path.endswith('.npz'):
+            scores = data['scores']
+            times = data['times'] if 'times' in data else np.arange(len(scores)) / args.fps
+        else:
+            scores = data
+            times = np.arange(len(scores)) / args.fps
+        events = decode_stream(decoder, scores, times, client_id=path)
+        report[path] = [event._asdict() for event in events]
+        print(f"{path}: " + (', '.join(f"{event.sign} at {event.time:.2f}s" for event in events) or 'no signs'))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+import json
+import math
+from itertools import islice
+
+import numpy as np
+
+# The signs the model knows, loaded from signs.json: their labels,
+# translations, score weights and the geometry rules a prediction has to pass.
+# A sign entry looks like
+#   {
+#     "name": "hello",                        # Label, in the order of the model's outputs
+#     "translations": {"tagalog": "kamusta"},
+#     "color": [245, 117, 16],                # For visualization
+#     "type": "dynamic",                      # Fallback check, from "types"
+#     "weight": 1.1,                          # Factor on the sign's model score
+#     "checks": [...],                        # Validity checks, the first that applies decides
+#     "gate": {...},                          # Optional hand shape check that lowers the weight
+#     "defer_to_raw_above": 0.65,             # Optional, see SignRegistry.postprocess
+#     "refractory_seconds": 2.0               # Optional, least time between two emissions of the sign
+#   }
+# A check applies once the motion history has motion_frames values and the
+# frame has what it requires ("geometry", "left_hand", "right_hand" or
+# "hand"), and then holds if the mean motion of those frames is strictly
+# between the motion bounds (multiples of the motion threshold, null for
+# none) and the conditions hold. A condition compares a hand feature, or the
+# difference of two, with a value, e.g. ["index_up - middle_up", ">", 0.05],
+# on the right or left hand, on "any" hand, or on the "dominant" hand (the
+# right one if present, else the left). If no check applies, the type's
+# check decides, and a sign is valid if that doesn't apply either. A
+# top-level "refractory_seconds" is the default for signs without their own.
+
+# Per-hand features of FrameGeometry.hand_features, in column order. The
+# column after them is always 0, so a condition on a single feature is the
+# difference with that column.
+HAND_FEATURES = ('thumb_up', 'index_up', 'middle_up', 'ring_up', 'pinky_up', 'thumb_spread', 'chin_distance',
+                 'nose_offset')
+
+HAND_MODES = ('left', 'right', 'any', 'dominant')
+REQUIREMENTS = ('geometry', 'left_hand', 'right_hand', 'hand')
+
+COMPARISONS = ('>', '>=', '<', '<=')
+
+def _feature_column(name):
+    if name not in HAND_FEATURES:
+        raise ValueError(f"Unknown hand feature {name!r}, expected one of {HAND_FEATURES}")
+    return HAND_FEATURES.index(name)
+
+class HandConditions:
+    """
+    Conditions on the hand features of a frame, compiled into (column,
+    column, threshold) triples that are checked with plain float comparisons
+    """
+
+    def __init__(self, conditions, hand='any'):
+        """
+        Args:
+            conditions: [expression, comparison, value] lists, where expression
+                        is a hand feature or "feature - feature"
+            hand: Which hand the conditions are checked on, one of HAND_MODES
+        """
+        if hand not in HAND_MODES:
+            raise ValueError(f"Unknown hand {hand!r}, expected one of {HAND_MODES}")
+        self.hand = hand
+        # Every condition becomes features[left] - features[right] > threshold: "x < t" turns
+        # into "-x > -t" by swapping the columns, and ">= t" into "> t" for the next float down
+        self.compiled = []
+        for expression, comparison, value in conditions:
+            if comparison not in COMPARISONS:
+                raise ValueError(f"Unknown comparison {comparison!r}, expected one of {COMPARISONS}")
+            minuend, _, subtrahend = (part.strip() for part in expression.partition('-'))
+            columns = [_feature_column(minuend), _feature_column(subtrahend) if subtrahend else len(HAND_FEATURES)]
+            threshold = float(value)
+            if comparison.startswith('<'):
+                columns.reverse()
+                threshold = -threshold
+            if comparison.endswith('='):
+                threshold = math.nextafter(threshold, -math.inf)
+            self.compiled.append((columns[0], columns[1], threshold))
+
+    def __len__(self):
+        return len(self.compiled)
+
+    def holds(self, geometry):
+        """Whether all conditions hold on the chosen hand; features of a missing hand are NaN, so they fail"""
+        if not len(self):
+            return True
+        if geometry is None:
+            return False
+        features = geometry.hand_features
+        if self.hand == 'any':
+            rows = features
+        elif self.hand == 'dominant':
+            rows = (features[1 if geometry.present[1] else 0],)
+        else:
+            rows = (features[1 if self.hand == 'right' else 0],)
+        for row in rows:
+            for left, right, threshold in self.compiled:
+                if not row[left] - row[right] > threshold:
+                    break
+            else:
+                return True
+        return False
+
+class Check:
+    """One validity check of a sign: a motion range over recent frames plus hand conditions"""
+
+    def __init__(self, spec, motion_threshold):
+        """
+        Args:
+            spec: The check's entry in signs.json
+            motion_threshold: Motion per frame the motion bounds are multiples of
+        """
+        self.requires = tuple(spec.get('requires', ()))
+        unknown = set(self.requires) - set(REQUIREMENTS)
+        if unknown:
+            raise ValueError(f"Unknown requirements {sorted(unknown)}, expected some of {REQUIREMENTS}")
+        self.needs_left = 'left_hand' in self.requires
+        self.needs_right = 'right_hand' in self.requires
+        self.needs_hand = 'hand' in self.requires
+        self.motion_frames = int(spec.get('motion_frames', 0))
+        low, high = spec.get('motion', (None, None))
+        self.min_motion = -math.inf if low is None else motion_threshold * low
+        self.max_motion = math.inf if high is None else motion_threshold * high
+        self.conditions = HandConditions(spec.get('conditions', ()), spec.get('hand', 'any'))
+
+    def applies(self, geometry, motion_history):
+        if len(motion_history) < self.motion_frames:
+            return False
+        if not self.requires:
+            return True
+        if geometry is None:
+            return False
+        left, right = geometry.present
+        return ((left or not self.needs_left) and (right or not self.needs_right) and
+                (left or right or not self.needs_hand))
+
+    def holds(self, geometry, motion_history):
+        if self.motion_frames:
+            mean = sum(islice(reversed(motion_history), self.motion_frames)) / self.motion_frames
+            if not self.min_motion < mean < self.max_motion:
+                return False
+        return self.conditions.holds(geometry)
+
+class Gate:
+    """A hand shape check that lowers a sign's weight when the model isn't sure of it and the hand doesn't match"""
+
+    def __init__(self, spec):
+        self.below = spec['below']
+        self.failed_weight = spec['failed_weight']
+        self.conditions = HandConditions(spec['conditions'], spec.get('hand', 'any'))
+
+class Sign:
+    """A sign of the registry with its checks compiled"""
+
+    def __init__(self, index, spec, sign_type, type_check, motion_threshold, refractory_seconds):
+        self.index = index
+        self.name = spec['name']
+        self.translations = dict(spec.get('translations', {}))
+        self.color = tuple(spec.get('color', (255, 255, 255)))
+        self.type = sign_type
+        self.weight = float(spec.get('weight', 1.0))
+        self.checks = [Check(check, motion_threshold) for check in spec.get('checks', ())] + [type_check]
+        self.gate = Gate(spec['gate']) if 'gate' in spec else None
+        self.defer_to_raw_above = spec.get('defer_to_raw_above')
+        self.refractory_seconds = float(spec.get('refractory_seconds', refractory_seconds))
+
+    def is_valid(self, geometry, motion_history):
+        """Whether the frame and the recent motion fit the sign; decided by the first check that applies"""
+        for check in self.checks:
+            if check.applies(geometry, motion_history):
+                return check.holds(geometry, motion_history)
+        return True
+
+    def __repr__(self):
+        return f"Sign({self.name!r})"
+
+class SignRegistry:
+    """
+    The signs of a model, in the order of its outputs, with their weights as
+    one array so weighting the scores is one multiplication. Only the checks
+    of the predicted sign run, so postprocessing a prediction costs the same
+    however many signs there are.
+    """
+
+    def __init__(self, spec, motion_threshold):
+        """
+        Args:
+            spec: Parsed signs.json
+            motion_threshold: Motion per frame the motion bounds in spec are multiples of
+        """
+        self.type_checks = {name: Check(check, motion_threshold) for name, check in spec['types'].items()}
+        self.default_type = spec.get('default_type', 'dynamic')
+        refractory_seconds = spec.get('refractory_seconds', 0.0)
+        self.signs = []
+        for index, sign in enumerate(spec['signs']):
+            sign_type = sign.get('type', self.default_type)
+            if sign_type not in self.type_checks:
+                raise ValueError(f"Sign {sign['name']!r} has unknown type {sign_type!r}")
+            self.signs.append(Sign(index, sign, sign_type, self.type_checks[sign_type], motion_threshold,
+                                   refractory_seconds))
+        self.names = [sign.name for sign in self.signs]
+        self.by_name = {sign.name: sign for sign in self.signs}
+        if len(self.by_name) != len(self.signs):
+            raise ValueError("Sign names in the registry must be unique")
+        self.weights = np.array([sign.weight for sign in self.signs], dtype=np.float32)
+
+    def __len__(self):
+        return len(self.signs)
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def translations(self, language):
+        """Sign name -> its translation, for the signs translated to the language"""
+        return {sign.name: sign.translations[language] for sign in self.signs if language in sign.translations}
+
+    def is_valid(self, name, geometry, motion_history):
+        """Check a sign by name; names outside the registry get the default type's check"""
+        sign = self.by_name.get(name)
+        if sign is not None:
+            return sign.is_valid(geometry, motion_history)
+        check = self.type_checks[self.default_type]
+        return check.holds(geometry, motion_history) if check.applies(geometry, motion_history) else True
+
+    def postprocess(self, scores, geometry, motion_history):
+        """
+        Pick the sign to show for one window's model scores
+
+        The scores are multiplied by the sign weights. When the model's top
+        sign has a gate and a score below the gate's, its weight drops to the
+        gate's failed_weight unless the hand passes the gate. A sign picked only
+        thanks to the weights gives way to the model's own top sign if that
+        scored above the picked sign's defer_to_raw_above.
+
+        The scores the sign was picked by are returned too, scaled to sum to 1
+        like the model's so the sign decoder's thresholds apply to them: the
+        weighted and gated scores, or the model's own when the pick gave way.
+
+        Returns:
+            tuple: (sign, top raw score, validity of the sign, decision scores)
+        """
+        scores = np.asarray(scores)
+        if len(scores) != len(self.signs):
+            raise ValueError(f"Got {len(scores)} scores for a registry of {len(self.signs)} signs")
+        raw_index = int(np.argmax(scores))
+        raw_max_score = float(scores[raw_index])
+
+        weighted_scores = scores * self.weights
+        gate = self.signs[raw_index].gate
+        if gate is not None and raw_max_score < gate.below and not gate.conditions.holds(geometry):
+            weighted_scores[raw_index] = scores[raw_index] * gate.failed_weight
+        sign = self.signs[int(np.argmax(weighted_scores))]
+
+        if (sign.index != raw_index and sign.defer_to_raw_above is not None and
+                raw_max_score > sign.defer_to_raw_above):
+            sign = self.signs[raw_index]
+            decision_scores = scores.astype(np.float32)
+        else:
+            total = weighted_scores.sum()
+            decision_scores = (weighted_scores / total if total > 0 else weighted_scores).astype(np.float32)
+        return sign, raw_max_score, sign.is_valid(geometry, motion_history), decision_scores
+
+def load_sign_registry(path, motion_threshold):
+    """Load and compile a signs.json file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return SignRegistry(json.load(f), motion_threshold)
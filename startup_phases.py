@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Runs a service's slow initialization (imports, model loading, warm-up) in
+# named phases on background threads, so the service can answer liveness
+# checks right away and say when it is ready. Phases run in parallel unless
+# they depend on each other, and each one's timing is kept for the startup
+# profile served on /ready.
+
+class Startup:
+    """
+    Initialization phases with dependencies, run concurrently once started.
+    The service is ready when every phase has finished; if one fails, the
+    phases depending on it are skipped and the service never becomes ready.
+    """
+
+    def __init__(self, on_phase_done=None):
+        """
+        Args:
+            on_phase_done: Optional function called with a phase's name, status
+                           ('done' or 'failed') and duration in seconds
+        """
+        self.on_phase_done = on_phase_done
+        self.phases = {}  # name -> (function, names of the phases it runs after)
+        self.profile_entries = {}  # name -> dict of status, start_ms, duration_ms and error
+        self.results = {}
+        self.started_at = None
+        self.finished_at = None
+        self.ready_event = threading.Event()
+        self.failed = False
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def phase(self, name, after=()):
+        """
+        Decorator registering a function as a phase
+
+        Args:
+            name: Phase name used in the profile
+            after: Names of the phases that must finish first; their results are
+                   available from result() when the function runs
+        """
+        def register(function):
+            unknown = [dependency for dependency in after if dependency not in self.phases]
+            if unknown:
+                raise ValueError(f"Phase {name!r} runs after unknown phases {unknown}")
+            self.phases[name] = (function, tuple(after))
+            self.profile_entries[name] = {'status': 'pending'}
+            return function
+        return register
+
+    def start(self):
+        """Start all phases; calling it again does nothing"""
+        with self.lock:
+            if self.started_at is not None:
+                return
+            self.started_at = time.perf_counter()
+            self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.phases)), thread_name_prefix='startup')
+            futures = {}
+            # Phases are registered after their dependencies, so those futures exist already
+            for name, (function, after) in self.phases.items():
+                futures[name] = self.executor.submit(self._run, name, function, [futures[d] for d in after])
+        threading.Thread(target=self._finish, args=(list(futures.values()),), daemon=True).start()
+
+    def _run(self, name, function, dependencies):
+        for dependency in dependencies:
+            if not dependency.result():
+                self.profile_entries[name] = {'status': 'skipped'}
+                return False
+        start = time.perf_counter()
+        self.profile_entries[name] = {'status': 'running', 'start_ms': round((start - self.started_at) * 1000, 1)}
+        try:
+            self.results[name] = function()
+        except Exception as e:
+            logger.exception(f"Startup phase {name} failed")
+            self.profile_entries[name].update(status='failed', error=str(e),
+                                              duration_ms=round((time.perf_counter() - start) * 1000, 1))
+            self.failed = True
+            self._phase_done(name, 'failed', time.perf_counter() - start)
+            return False
+        duration = time.perf_counter() - start
+        self.profile_entries[name].update(status='done', duration_ms=round(duration * 1000, 1))
+        logger.info(f"Startup phase {name} took {duration * 1000:.0f} ms")
+        self._phase_done(name, 'done', duration)
+        return True
+
+    def _phase_done(self, name, status, duration):
+        if self.on_phase_done:
+            self.on_phase_done(name, status, duration)
+
+    def _finish(self, futures):
+        succeeded = all([future.result() for future in futures])
+        self.finished_at = time.perf_counter()
+        self.executor.shutdown(wait=False)
+        if succeeded:
+            self.ready_event.set()
+            logger.info(f"Startup finished in {(self.finished_at - self.started_at) * 1000:.0f} ms")
+        else:
+            logger.error("Startup failed; the service will not become ready")
+
+    @property
+    def ready(self):
+        return self.ready_event.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the service is ready; returns False on timeout"""
+        return self.ready_event.wait(timeout)
+
+    def result(self, name):
+        """The value a finished phase returned"""
+        return self.results[name]
+
+    def profile(self):
+        """The readiness and per-phase timings, for /ready"""
+        total = None
+        if self.finished_at is not None:
+            total = round((self.finished_at - self.started_at) * 1000, 1)
+        elif self.started_at is not None:
+            total = round((time.perf_counter() - self.started_at) * 1000, 1)
+        return {
+            'ready': self.ready,
+            'failed': self.failed,
+            'started': self.started_at is not None,
+            'elapsed_ms': total,
+            'phases': {name: dict(entry) for name, entry in self.profile_entries.items()}
+        }
@@ -0,0 +1,33 @@
+from collections import deque
+
+from frame_pacing import FramePacer
+from recognition_logic import init_client_buffer
+
+# Checks how the frame pacer treats held hand shapes and signers picking up
+# after an idle stretch:
+#   python -m pytest test_frame_pacing.py
+
+def still_buffer(pacer):
+    buffer = init_client_buffer()
+    buffer['motion_history'].extend([0.0] * pacer.still_frames)
+    return buffer
+
+def test_held_hand_shape_keeps_signing_rate_for_a_window():
+    pacer = FramePacer()
+    buffer = still_buffer(pacer)
+    assert pacer.client_interval('client', buffer, now=0.0) == pacer.min_interval_ms
+    assert pacer.client_interval('client', buffer, now=pacer.hold_seconds - 0.05) == pacer.min_interval_ms
+    assert pacer.client_interval('client', buffer, now=pacer.hold_seconds) == pacer.idle_interval_ms
+
+def test_restart_keeps_most_recent_frames():
+    pacer = FramePacer()
+    buffer = still_buffer(pacer)
+    buffer['frames'].extend(range(30))
+    assert pacer.target_interval('client', buffer, 0, now=0.0) == pacer.min_interval_ms
+    assert pacer.target_interval('client', buffer, 0, now=pacer.hold_seconds) == pacer.idle_interval_ms
+
+    # The hands move again
+    buffer['motion_history'].append(1.0)
+    assert pacer.restart_window('client', buffer, now=pacer.hold_seconds + 0.15)
+    assert buffer['frames'] == deque(range(30 - pacer.restart_keep_frames, 30))
+    assert not pacer.restart_window('client', buffer, now=pacer.hold_seconds + 0.15)
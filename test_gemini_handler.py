@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from gemini_handler import GeminiHandler
+from responders import Responder, ResponseUnavailable
+
+# Checks that replies with nothing usable left after post-processing are
+# never passed off as answers when the caller asked for real responses only,
+# and how hedged requests record latency and time out:
+#   python -m pytest test_gemini_handler.py
+
+class FixedResponder(Responder):
+    """Responder that always answers with the same text"""
+
+    name = 'fixed'
+
+    def __init__(self, reply):
+        self.reply = reply
+
+    def generate(self, model_name, prompt, system_instruction=None, generation_config=None, stream=False):
+        return iter([self.reply]) if stream else self.reply
+
+    def list_models(self):
+        return ["models/gemini-1.5-flash-8b"]
+
+class SlowModelResponder(FixedResponder):
+    """FixedResponder that takes the given seconds to answer, per model"""
+
+    def __init__(self, reply, latencies):
+        super().__init__(reply)
+        self.latencies = latencies
+
+    def generate(self, model_name, prompt, system_instruction=None, generation_config=None, stream=False):
+        time.sleep(self.latencies.get(model_name, 0.0))
+        return super().generate(model_name, prompt, system_instruction, generation_config, stream)
+
+def make_handler(reply, responder=None, **kwargs):
+    handler = GeminiHandler(responder=responder or FixedResponder(reply), **kwargs)
+    handler.is_running = False
+    return handler
+
+@pytest.mark.parametrize('reply', ["", "!", "#tag"])
+def test_unusable_reply_is_unavailable_without_fallback(reply):
+    with pytest.raises(ResponseUnavailable):
+        make_handler(reply).get_response("hello", fallback=False)
+
+@pytest.mark.parametrize('reply', ["", "!"])
+def test_unusable_reply_gets_canned_response_with_fallback(reply):
+    response = make_handler(reply).get_response("hello")
+    assert isinstance(response, str) and len(response) >= 2
+
+def test_usable_reply_is_returned_without_fallback():
+    assert make_handler("hi there friend").get_response("hello", fallback=False) == "Hi there friend"
+
+def test_stream_of_unusable_reply_ends_with_canned_response():
+    assert list(make_handler("!").stream_response("hello"))[-1]
+
+def test_hedge_records_both_latencies_once():
+    primary, backup = GeminiHandler.FALLBACK_MODELS[:2]
+    responder = SlowModelResponder("hi there friend", {primary: 0.3})
+    handler = make_handler(None, responder, hedge=True, hedge_default_delay=0.05)
+    try:
+        assert handler.get_response("hello", fallback=False) == "Hi there friend"
+        assert handler.get_hedge_stats() == {'hedged': 1, 'backup_wins': 1}
+        # Give the losing request time to finish reading its response
+        time.sleep(0.5)
+        stats = handler.get_latency_stats()
+        assert stats[primary]['count'] == 1 and stats[backup]['count'] == 1
+        assert stats[primary]['p50'] >= 0.05
+        assert stats[backup]['p50'] is not None
+    finally:
+        handler.shutdown()
+
+def test_hedge_on_saturated_executor_times_out():
+    handler = make_handler("hi there friend", hedge=True, hedge_timeout=0.2)
+    release = threading.Event()
+    try:
+        for _ in range(handler.hedge_executor._max_workers):
+            handler.hedge_executor.submit(release.wait)
+        start = time.time()
+        with pytest.raises(TimeoutError):
+            handler._generate_hedged("hello")
+        assert time.time() - start < 1.0
+    finally:
+        release.set()
+        handler.shutdown()
@@ -0,0 +1,277 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from recognition_logic import KEYPOINT_LAYOUTS
+from tfjs_numpy_model import NumpyLayersModel, load_tfjs_weights
+
+# Writes the tfjs model files browsers download: weight shards named after a
+# hash of their contents, so they can be cached for good, plus float16 and
+# uint8 quantized variants of the float32 weights. tfjs dequantizes weights
+# back to float32 when it loads them, so a variant only changes the download
+# size and the precision of the weights. convert_model.py calls
+# write_variants() after converting; to redo it for an existing conversion
+# and see what each variant costs in accuracy against action.h5:
+#   python tfjs_artifacts.py tfjs_model --data MP_Data
+# which rewrites tfjs_model/ and writes tfjs_model_float16/ and tfjs_model_uint8/.
+
+QUANTIZATION_DTYPES = ('float16', 'uint8')
+
+# Largest weight shard written, as the tfjs converter does
+SHARD_BYTES = 4 * 1024 * 1024
+
+# Hex digits of the SHA-256 content hash used in shard names and ETags
+HASH_LENGTH = 16
+
+# Weight shards written by the tfjs converter or by write_model
+SHARD_NAME = re.compile(r'^group\d+-shard\d+of\d+(\.[0-9a-f]+)?\.bin$')
+
+# Cache-Control for files whose name changes with their contents, and for model.json,
+# which keeps its name and is revalidated against its ETag instead
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+def quantize(values, dtype):
+    """
+    Quantize float32 weights as the tfjs converter does
+
+    uint8 uses one affine range per weight tensor, stretched to include 0 and
+    nudged so that 0 is exactly representable (zero padding and biases stay exact).
+
+    Returns:
+        tuple: (quantized array, the weight's "quantization" manifest entry)
+    """
+    if dtype == 'float16':
+        return values.astype('<f2'), {'dtype': 'float16', 'original_dtype': 'float32'}
+    info = np.iinfo(dtype)
+    low = min(float(values.min()), 0.0)
+    high = max(float(values.max()), 0.0)
+    scale = (high - low) / (info.max - info.min) or 1.0
+    zero_point = int(np.clip(round(info.min - low / scale), info.min, info.max))
+    low = (info.min - zero_point) * scale
+    high = (info.max - zero_point) * scale
+    quantized = np.round((np.clip(values, low, high) - low) / scale).astype(dtype)
+    return quantized, {'dtype': dtype, 'min': low, 'scale': scale, 'original_dtype': 'float32'}
+
+def is_quantized(spec):
+    return any('quantization' in weight for group in spec['weightsManifest'] for weight in group['weights'])
+
+def write_model(spec, weights, output_dir, quantization=None):
+    """
+    Write model.json and content-hashed weight shards to output_dir
+
+    Shards are written before model.json replaces the old one, and shards the
+    new model.json doesn't use are removed last, so a client loading the model
+    meanwhile gets either version whole.
+
+    Args:
+        spec: Parsed model.json of the model
+        weights: Weight name -> float32 array, as read by load_tfjs_weights
+        output_dir: Directory to write
+        quantization: None to keep float32 weights, or 'float16' or 'uint8'
+
+    Returns:
+        int: Total size of the weight shards in bytes
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    entries = []
+    chunks = []
+    for group in spec['weightsManifest']:
+        for weight in group['weights']:
+            values = np.asarray(weights[weight['name']], dtype='<f4')
+            entry = {'name': weight['name'], 'shape': weight['shape'], 'dtype': 'float32'}
+            if quantization:
+                values, entry['quantization'] = quantize(values, quantization)
+            chunks.append(values.tobytes())
+            entries.append(entry)
+    data = b''.join(chunks)
+
+    count = max(1, -(-len(data) // SHARD_BYTES))
+    paths = []
+    for index in range(count):
+        shard = data[index * SHARD_BYTES:(index + 1) * SHARD_BYTES]
+        path = f"group1-shard{index + 1}of{count}.{content_hash(shard)}.bin"
+        with open(os.path.join(output_dir, path), 'wb') as f:
+            f.write(shard)
+        paths.append(path)
+
+    model_json = dict(spec, weightsManifest=[{'paths': paths, 'weights': entries}])
+    temporary = os.path.join(output_dir, 'model.json.tmp')
+    with open(temporary, 'w') as f:
+        json.dump(model_json, f, separators=(',', ':'))
+    os.replace(temporary, os.path.join(output_dir, 'model.json'))
+
+    for name in os.listdir(output_dir):
+        if SHARD_NAME.match(name) and name not in paths:
+            os.remove(os.path.join(output_dir, name))
+    return len(data)
+
+def variant_dir(model_dir, dtype):
+    """Where a quantized variant of model_dir goes, e.g. tfjs_model_float16 for tfjs_model"""
+    return f"{os.path.normpath(model_dir)}_{dtype}"
+
+def write_variants(model_dir, dtypes=QUANTIZATION_DTYPES):
+    """
+    Give the float32 model in model_dir content-hashed shard names and write
+    its quantized variants next to it
+
+    Returns:
+        dict: Variant name ('float32' and each dtype) -> its model.json path
+    """
+    with open(os.path.join(model_dir, 'model.json'), 'r') as f:
+        spec = json.load(f)
+    if is_quantized(spec):
+        raise ValueError(f"{model_dir} holds quantized weights; variants are made from the float32 model")
+    weights = load_tfjs_weights(model_dir, spec['weightsManifest'])
+
+    models = {}
+    for dtype, output_dir in [('float32', model_dir)] + [(dtype, variant_dir(model_dir, dtype)) for dtype in dtypes]:
+        size = write_model(spec, weights, output_dir, None if dtype == 'float32' else dtype)
+        models[dtype] = os.path.join(output_dir, 'model.json')
+        print(f"Wrote {dtype} weights to {output_dir} ({size / 1024:.0f} KiB)")
+    return models
+
+def weights_size(model_json_path):
+    with open(model_json_path, 'r') as f:
+        spec = json.load(f)
+    model_dir = os.path.dirname(model_json_path)
+    return sum(os.path.getsize(os.path.join(model_dir, path))
+               for group in spec['weightsManifest'] for path in group['paths'])
+
+def accuracy_report(reference, models, windows, labels=None):
+    """
+    Run each model on the same windows and compare it with the reference model
+
+    Args:
+        reference: The model the variants should match, e.g. action.h5 loaded with Keras
+        models: Variant name -> model.json path
+        windows: Input windows as the models expect them
+        labels: Class indices of the windows, if known, to report accuracy
+
+    Returns:
+        dict: Variant name -> weight size, load time, agreement with the
+        reference and, with labels, accuracy and its change from the reference
+    """
+    reference_scores = reference.predict(windows, verbose=0)
+    reference_predictions = np.argmax(reference_scores, axis=1)
+    reference_accuracy = float((reference_predictions == labels).mean()) if labels is not None else None
+
+    report = {}
+    for name, path in models.items():
+        start = time.perf_counter()
+        model = NumpyLayersModel(path)
+        load_seconds = time.perf_counter() - start
+        scores = model.predict(windows)
+        predictions = np.argmax(scores, axis=1)
+        differences = np.abs(scores - reference_scores)
+        report[name] = {
+            'model': path,
+            'weights_bytes': weights_size(path),
+            'load_ms': load_seconds * 1000,
+            'agreement': float((predictions == reference_predictions).mean()),
+            'max_abs_diff': float(differences.max()),
+            'mean_abs_diff': float(differences.mean())
+        }
+        if labels is not None:
+            accuracy = float((predictions == labels).mean())
+            report[name]['accuracy'] = accuracy
+            report[name]['accuracy_delta'] = accuracy - reference_accuracy
+    return report
+
+def format_report(report):
+    lines = [f"{'variant':<10}{'weights KiB':>13}{'load ms':>9}{'agreement':>11}{'max diff':>10}"
+             f"{'accuracy':>10}{'delta':>9}"]
+    for name, row in report.items():
+        accuracy = f"{row['accuracy']:.4f}" if 'accuracy' in row else '-'
+        delta = f"{row['accuracy_delta']:+.4f}" if 'accuracy_delta' in row else '-'
+        lines.append(f"{name:<10}{row['weights_bytes'] / 1024:>13.0f}{row['load_ms']:>9.1f}{row['agreement']:>11.4f}"
+                     f"{row['max_abs_diff']:>10.2e}{accuracy:>10}{delta:>9}")
+    return '\n'.join(lines)
+
+def report_windows(data_paths, features, stride=1, count=64):
+    """
+    Windows to compare the models on: recordings projected onto the layout of
+    the given input width, or synthetic keypoints (without labels) if no data is given
+
+    Returns:
+        tuple: (windows, labels or None, the recording each window was cut from;
+        each synthetic window counts as a recording of its own)
+    """
+    layout = next((layout for layout in KEYPOINT_LAYOUTS.values() if layout.size == features), None)
+    if layout is None:
+        raise ValueError(f"No keypoint layout has {features} features per frame")
+    if data_paths:
+        from evaluate_model import load_dataset
+        windows, labels, streams = load_dataset(data_paths, stride)
+        return layout.select(windows), labels, streams
+    from benchmark_pipeline import synthetic_keypoints
+    windows = np.array([[synthetic_keypoints(seed * 30 + frame) for frame in range(30)] for seed in range(count)],
+                       dtype=np.float32)
+    return layout.select(windows), None, np.arange(count)
+
+# Files served from the tfjs model directories, by path: ((mtime, size), ETag, contents)
+_served_files = {}
+
+def read_model_file(path):
+    """
+    A model file's contents and strong ETag (its content hash), read and
+    hashed once for each version of the file
+
+    Returns:
+        tuple: (ETag, bytes)
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _served_files.get(path)
+    if cached is None or cached[0] != version:
+        with open(path, 'rb') as f:
+            data = f.read()
+        cached = _served_files[path] = (version, content_hash(data), data)
+    return cached[1], cached[2]
+
+def cache_control(filename):
+    """Cache-Control for a model file: hashed shards never change, model.json must be revalidated"""
+    match = SHARD_NAME.match(filename)
+    return IMMUTABLE_CACHE_CONTROL if match and match.group(1) else REVALIDATE_CACHE_CONTROL
+
+def main():
+    parser = argparse.ArgumentParser(description="Write content-hashed and quantized tfjs model variants")
+    parser.add_argument('model_dir', nargs='?', default='tfjs_model', help="Directory of the float32 tfjs model")
+    parser.add_argument('--variants', nargs='*', default=list(QUANTIZATION_DTYPES), choices=QUANTIZATION_DTYPES,
+                        help="Quantized variants to write")
+    parser.add_argument('--data', nargs='*', default=[],
+                        help="Full-layout .npy/.npz recordings for the accuracy report; synthetic frames if omitted")
+    parser.add_argument('--reference', default='action.h5',
+                        help="Model the variants are compared with (falls back to the float32 tfjs model)")
+    parser.add_argument('--stride', type=int, default=1, help="Frames between windows cut from longer recordings")
+    parser.add_argument('--json', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    models = write_variants(args.model_dir, args.variants)
+
+    from evaluate_model import load_model
+    try:
+        reference = load_model(args.reference)
+    except (ImportError, OSError) as e:
+        print(f"Can't load {args.reference} ({e}); comparing with the float32 tfjs model instead")
+        reference = load_model(models['float32'])
+
+    windows, labels, _ = report_windows(args.data, reference.input_shape[-1], args.stride)
+    if labels is None:
+        print("No --data given: comparing on synthetic keypoints, without accuracy")
+    report = accuracy_report(reference, models, windows, labels)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
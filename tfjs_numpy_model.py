@@ -0,0 +1,122 @@
+import json
+import os
+import numpy as np
+
+# Runs the converted model in tfjs_model/ with numpy alone, for offline tools
+# on machines without TensorFlow. Supports the layers the sign model uses:
+# LSTM (Keras gate order i, f, c, o) and Dense.
+
+ACTIVATIONS = {
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+    'tanh': np.tanh,
+    'linear': lambda x: x,
+    'softmax': lambda x: _softmax(x)
+}
+
+def _softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+def dequantize(values, quantization):
+    """Turn quantized weights back into float32, as tfjs does when loading them"""
+    if quantization['dtype'] == 'float16':
+        return values.astype(np.float32)
+    return (values.astype(np.float32) * np.float32(quantization['scale']) + np.float32(quantization['min']))
+
+def load_tfjs_weights(model_dir, manifest):
+    """
+    Read the weight shards listed in a tfjs weights manifest into a dict of
+    name -> array, dequantizing float16 and uint8/uint16 quantized weights
+    """
+    weights = {}
+    for group in manifest:
+        data = b''.join(open(os.path.join(model_dir, path), 'rb').read() for path in group['paths'])
+        offset = 0
+        for spec in group['weights']:
+            count = int(np.prod(spec['shape'])) if spec['shape'] else 1
+            quantization = spec.get('quantization')
+            dtype = np.dtype(quantization['dtype'] if quantization else spec['dtype'])
+            values = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(spec['shape'])
+            offset += count * dtype.itemsize
+            weights[spec['name']] = dequantize(values, quantization) if quantization else values
+    return weights
+
+class NumpyLayersModel:
+    """
+    A tfjs layers model evaluated with numpy.
+
+    predict() takes the same (batch, 30, 1662) input as the Keras model and
+    returns the class probabilities, so it can stand in for it in batch tools.
+    """
+
+    def __init__(self, model_json_path):
+        with open(model_json_path, 'r') as f:
+            spec = json.load(f)
+        model_dir = os.path.dirname(os.path.abspath(model_json_path))
+        weights = load_tfjs_weights(model_dir, spec['weightsManifest'])
+
+        self.layers = []
+        for layer in spec['modelTopology']['model_config']['config']['layers']:
+            kind = layer['class_name']
+            config = layer['config']
+            name = config['name']
+            if kind == 'InputLayer':
+                self.input_shape = tuple(config['batch_input_shape'])
+                continue
+            # Weight names look like "lstm_1/lstm_cell_1/kernel" or "dense/kernel"
+            params = {key.rsplit('/', 1)[1]: value for key, value in weights.items() if key.split('/', 1)[0] == name}
+            if kind == 'LSTM':
+                self.layers.append(('lstm', config, params))
+            elif kind == 'Dense':
+                self.layers.append(('dense', config, params))
+            elif kind == 'Dropout':
+                continue
+            else:
+                raise ValueError(f"Unsupported layer type {kind} in {model_json_path}")
+
+    @staticmethod
+    def _lstm(x, config, params):
+        """Run one LSTM layer over a (batch, time, features) input"""
+        units = config['units']
+        activation = ACTIVATIONS[config.get('activation', 'tanh')]
+        recurrent_activation = ACTIVATIONS[config.get('recurrent_activation', 'sigmoid')]
+        kernel = params['kernel']
+        recurrent_kernel = params['recurrent_kernel']
+        bias = params.get('bias', 0)
+
+        # The input projection for every timestep at once
+        projected = x @ kernel + bias
+        batch, steps = x.shape[0], x.shape[1]
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = []
+        for t in range(steps):
+            z = projected[:, t] + h @ recurrent_kernel
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * activation(c)
+            if config.get('return_sequences'):
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if config.get('return_sequences') else h
+
+    @staticmethod
+    def _dense(x, config, params):
+        y = x @ params['kernel']
+        if 'bias' in params:
+            y = y + params['bias']
+        return ACTIVATIONS[config.get('activation', 'linear')](y)
+
+    def predict(self, x, batch_size=256, verbose=0):
+        """Return the model output for a batch of input sequences"""
+        x = np.asarray(x, dtype=np.float32)
+        outputs = []
+        for start in range(0, len(x), batch_size):
+            y = x[start:start + batch_size]
+            for kind, config, params in self.layers:
+                y = self._lstm(y, config, params) if kind == 'lstm' else self._dense(y, config, params)
+            outputs.append(y.astype(np.float32))
+        return np.concatenate(outputs) if outputs else np.zeros((0,), dtype=np.float32)
@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from recognition_logic import actions
+from tflite_model import TFLiteModel
+
+# Writes TensorFlow Lite versions of the Keras sign model for CPU inference:
+#   - float32: the model as it is, the baseline for the quantized ones
+#   - dynamic_range: int8 weights; activations stay float, and the LSTM and
+#     Dense kernels quantize them on the fly
+#   - full_integer: int8 weights and activations, with the activation ranges
+#     calibrated on recorded keypoint windows, and int8 inputs and outputs
+#   - mixed_integer: written instead of full_integer when the converter has no
+#     int8 kernel for some op; int8 where it has one and float elsewhere
+# and reports each one's per-class accuracy against the Keras model and its
+# CPU latency on single windows, to pick the fastest model that keeps the
+# recognition quality. Unless given separate calibration recordings, the
+# recordings are split so the report never runs on the windows calibrated on.
+# convert_model.py --tflite calls write_tflite_variants() and
+# quantization_report(); to convert and report alone:
+#   python tflite_artifacts.py action.h5 --data MP_Data
+
+TFLITE_QUANTIZATIONS = ('dynamic_range', 'full_integer')
+MIXED_INTEGER = 'mixed_integer'
+
+# Windows run through the model to calibrate full integer quantization
+CALIBRATION_WINDOWS = 200
+
+# Share of the report recordings held out to calibrate on when no calibration recordings are given
+CALIBRATION_SPLIT = 0.2
+
+def split_calibration(streams, split=CALIBRATION_SPLIT, seed=0):
+    """
+    Hold out whole recordings to calibrate on, so the report compares the
+    models on recordings their activation ranges weren't fit to
+
+    Returns:
+        tuple: (calibration mask, report mask); the same all-True mask for both
+        with fewer than two recordings
+    """
+    from train_layout_model import split_by_stream
+    report, calibration = split_by_stream(streams, split, seed)
+    if not calibration.any():
+        print("Fewer than two recordings: calibrating on the windows the report runs on")
+        return report, report
+    return calibration, report
+
+def labels_of(labels, mask):
+    """The labels of the windows in mask, or None without labels"""
+    return None if labels is None else labels[mask]
+
+def calibration_windows(windows, labels=None, count=CALIBRATION_WINDOWS, seed=0):
+    """
+    Pick up to count windows to calibrate on, as many from each sign as the
+    others when labels are given, so the activation ranges aren't set by the
+    signs recorded most
+
+    Returns:
+        array of windows
+    """
+    rng = np.random.default_rng(seed)
+    if labels is None or len(windows) <= count:
+        picked = rng.permutation(len(windows))[:count]
+    else:
+        classes = np.unique(labels)
+        per_class = max(1, count // len(classes))
+        picked = np.concatenate([rng.permutation(np.flatnonzero(labels == c))[:per_class] for c in classes])
+    return windows[np.sort(picked)]
+
+def representative_dataset(windows):
+    """The converter's calibration input: a generator of single-window batches"""
+    def generate():
+        for window in windows:
+            yield [window[np.newaxis].astype(np.float32)]
+    return generate
+
+def convert_tflite(model, quantization=None, calibration=None):
+    """
+    Convert a Keras model to a TensorFlow Lite flatbuffer for a batch of one window
+
+    Args:
+        model: The Keras model
+        quantization: None for float32, one of TFLITE_QUANTIZATIONS, or MIXED_INTEGER
+        calibration: Windows to calibrate full_integer and mixed_integer activations on
+
+    Returns:
+        bytes: The .tflite file contents
+
+    Raises:
+        Exception: From the converter, e.g. for full_integer when some op has no int8 kernel
+    """
+    import tensorflow as tf
+    # A fixed batch of one, as app.py predicts, lets the converter fuse each LSTM into a single op
+    run = tf.function(lambda x: model(x, training=False))
+    concrete = run.get_concrete_function(tf.TensorSpec((1,) + tuple(model.input_shape[1:]), tf.float32))
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([concrete], model)
+    if quantization is None:
+        return converter.convert()
+    if quantization not in TFLITE_QUANTIZATIONS + (MIXED_INTEGER,):
+        raise ValueError(f"Unknown quantization {quantization!r}, expected one of {TFLITE_QUANTIZATIONS}")
+
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization in ('full_integer', MIXED_INTEGER):
+        if calibration is None or not len(calibration):
+            raise ValueError(f"{quantization} quantization needs calibration windows")
+        converter.representative_dataset = representative_dataset(calibration)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        if quantization == MIXED_INTEGER:
+            converter.target_spec.supported_ops.append(tf.lite.OpsSet.TFLITE_BUILTINS)
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    return converter.convert()
+
+def tflite_path(output_dir, variant):
+    return os.path.join(output_dir, f'{variant}.tflite')
+
+def write_tflite_variants(model, output_dir='tflite_model', quantizations=TFLITE_QUANTIZATIONS, calibration=None):
+    """
+    Write the float32 TensorFlow Lite model and its quantized variants to output_dir.
+    If full_integer can't be converted, mixed_integer is written instead and any
+    earlier full_integer.tflite removed, so that name only ever holds an int8-only model.
+
+    Returns:
+        dict: Variant name ('float32' and each quantization written) -> its .tflite path
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    models = {}
+    for variant in ('float32',) + tuple(quantizations):
+        try:
+            data = convert_tflite(model, None if variant == 'float32' else variant, calibration)
+        except Exception as e:
+            if variant != 'full_integer':
+                raise
+            # Older converters have no int8 kernel for some LSTM ops; the report's tensor dtypes show what stayed float
+            print(f"Integer-only conversion failed ({e}); writing {MIXED_INTEGER} with float kernels where "
+                  f"there is no int8 one")
+            if os.path.exists(tflite_path(output_dir, variant)):
+                os.remove(tflite_path(output_dir, variant))
+            variant = MIXED_INTEGER
+            data = convert_tflite(model, variant, calibration)
+        models[variant] = tflite_path(output_dir, variant)
+        with open(models[variant], 'wb') as f:
+            f.write(data)
+        print(f"Wrote {variant} TensorFlow Lite model to {models[variant]} ({len(data) / 1024:.0f} KiB)")
+    return models
+
+def measure_latency(predict, windows, runs=200, warmup=10):
+    """
+    Time predict() on one window at a time, as app.py's worker calls it
+
+    Returns:
+        tuple: (median, 95th percentile) milliseconds per window
+    """
+    samples = []
+    for i in range(warmup + runs):
+        window = windows[i % len(windows)][np.newaxis]
+        start = time.perf_counter()
+        predict(window)
+        if i >= warmup:
+            samples.append(time.perf_counter() - start)
+    samples = np.array(samples) * 1000
+    return float(np.median(samples)), float(np.percentile(samples, 95))
+
+def per_class_accuracy(predictions, labels):
+    """Sign -> share of its windows predicted as it, for the signs with windows"""
+    return {actions[c]: float((predictions[labels == c] == c).mean())
+            for c in range(len(actions)) if (labels == c).any()}
+
+def quantization_report(reference, models, windows, labels=None, runs=200, num_threads=None):
+    """
+    Run the reference model and each TensorFlow Lite variant on the same
+    windows and compare them
+
+    Args:
+        reference: The Keras model the variants were converted from
+        models: Variant name -> .tflite path
+        windows: Input windows as the models expect them
+        labels: Class indices of the windows, if known, to report accuracy
+        runs: Single-window predictions timed per model
+        num_threads: CPU threads for the interpreters
+
+    Returns:
+        dict: Model name ('keras' and each variant) -> file size, latency,
+        agreement with the reference and, with labels, overall and per-class
+        accuracy and their change from the reference
+    """
+    reference_scores = reference.predict(windows, verbose=0)
+    reference_predictions = np.argmax(reference_scores, axis=1)
+    median, p95 = measure_latency(lambda x: reference.predict(x, verbose=0), windows, runs)
+    report = {'keras': {'latency_ms': median, 'latency_p95_ms': p95, 'agreement': 1.0}}
+    if labels is not None:
+        report['keras']['accuracy'] = float((reference_predictions == labels).mean())
+        report['keras']['per_class'] = per_class_accuracy(reference_predictions, labels)
+
+    for name, path in models.items():
+        model = TFLiteModel(path, num_threads=num_threads)
+        scores = model.predict(windows)
+        predictions = np.argmax(scores, axis=1)
+        median, p95 = measure_latency(model.predict, windows, runs)
+        row = report[name] = {
+            'model': path,
+            'bytes': os.path.getsize(path),
+            'latency_ms': median,
+            'latency_p95_ms': p95,
+            'agreement': float((predictions == reference_predictions).mean()),
+            'max_abs_diff': float(np.abs(scores - reference_scores).max()),
+            'tensor_dtypes': model.tensor_dtypes()
+        }
+        if labels is not None:
+            row['accuracy'] = float((predictions == labels).mean())
+            row['accuracy_delta'] = row['accuracy'] - report['keras']['accuracy']
+            row['per_class'] = per_class_accuracy(predictions, labels)
+            row['per_class_delta'] = {sign: accuracy - report['keras']['per_class'][sign]
+                                      for sign, accuracy in row['per_class'].items()}
+    return report
+
+def fastest_within(report, max_accuracy_drop):
+    """
+    The fastest variant whose accuracy, overall and for every sign, is at most
+    max_accuracy_drop below the Keras model's; None without accuracy
+    """
+    candidates = [(row['latency_ms'], name) for name, row in report.items()
+                  if 'accuracy_delta' in row and row['accuracy_delta'] >= -max_accuracy_drop and
+                  all(delta >= -max_accuracy_drop for delta in row['per_class_delta'].values())]
+    return min(candidates)[1] if candidates else None
+
+def format_quantization_report(report):
+    lines = [f"{'model':<15}{'KiB':>7}{'median ms':>11}{'p95 ms':>9}{'agreement':>11}{'accuracy':>10}{'delta':>9}"]
+    for name, row in report.items():
+        size = f"{row['bytes'] / 1024:.0f}" if 'bytes' in row else '-'
+        accuracy = f"{row['accuracy']:.4f}" if 'accuracy' in row else '-'
+        delta = f"{row['accuracy_delta']:+.4f}" if 'accuracy_delta' in row else '-'
+        lines.append(f"{name:<15}{size:>7}{row['latency_ms']:>11.3f}{row['latency_p95_ms']:>9.3f}"
+                     f"{row['agreement']:>11.4f}{accuracy:>10}{delta:>9}")
+
+    variants = [name for name, row in report.items() if 'per_class_delta' in row]
+    if variants:
+        lines.append('')
+        lines.append(f"{'sign':<15}{'keras':>9}" + ''.join(f"{name:>15}" for name in variants))
+        for sign, accuracy in report['keras']['per_class'].items():
+            lines.append(f"{sign:<15}{accuracy:>9.4f}" +
+                         ''.join(f"{report[name]['per_class_delta'][sign]:>+15.4f}" for name in variants))
+    return '\n'.join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Write quantized TensorFlow Lite models and compare them")
+    parser.add_argument('model', nargs='?', default='action.h5', help="Keras .h5 model to convert")
+    parser.add_argument('--output', default='tflite_model', help="Directory for the .tflite files")
+    parser.add_argument('--quantizations', nargs='*', default=list(TFLITE_QUANTIZATIONS),
+                        choices=TFLITE_QUANTIZATIONS, help="Quantized variants to write next to the float32 model")
+    parser.add_argument('--data', nargs='*', default=[],
+                        help="Full-layout .npy/.npz recordings for the report; synthetic frames if omitted")
+    parser.add_argument('--calibration', nargs='*',
+                        help="Recordings to calibrate full_integer on (default: recordings held out of --data)")
+    parser.add_argument('--stride', type=int, default=1, help="Frames between windows cut from longer recordings")
+    parser.add_argument('--runs', type=int, default=200, help="Single-window predictions timed per model")
+    parser.add_argument('--threads', type=int, default=2,
+                        help="CPU threads for the interpreters (app.py gives TensorFlow 2)")
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01,
+                        help="Accuracy a variant may lose, overall and per sign, to be recommended")
+    parser.add_argument('--json', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    from tfjs_artifacts import report_windows
+    import tensorflow as tf
+    model = tf.keras.models.load_model(args.model, compile=False)
+    features = model.input_shape[-1]
+    windows, labels, streams = report_windows(args.data, features, args.stride)
+    if labels is None:
+        print("No --data given: calibrating and comparing on synthetic keypoints, without accuracy")
+    if args.calibration is None:
+        calibration_mask, report_mask = split_calibration(streams)
+        calibration, calibration_labels = windows[calibration_mask], labels_of(labels, calibration_mask)
+        windows, labels = windows[report_mask], labels_of(labels, report_mask)
+    else:
+        calibration, calibration_labels, _ = report_windows(args.calibration, features, args.stride)
+
+    models = write_tflite_variants(model, args.output, args.quantizations,
+                                   calibration_windows(calibration, calibration_labels))
+    report = quantization_report(model, models, windows, labels, args.runs, args.threads)
+    print(format_quantization_report(report))
+    if labels is not None:
+        best = fastest_within(report, args.max_accuracy_drop)
+        print(f"\nFastest within {args.max_accuracy_drop:.2%} accuracy: {best or 'none'}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import threading
+
+import numpy as np
+
+# Runs a TensorFlow Lite model written by tflite_artifacts.py behind the same
+# predict() as the Keras model, for app.py (MODEL_PATH=tflite_model/....tflite)
+# and the offline tools. Uses the standalone tflite_runtime interpreter when it
+# is installed, so serving doesn't need TensorFlow, and tf.lite otherwise.
+# Models with int8 inputs and outputs (full_integer, mixed_integer) are fed and read through
+# their quantization parameters, so callers always pass and get float32.
+
+def _interpreter_class():
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+class TFLiteModel:
+    """
+    A TensorFlow Lite model converted for a batch of one window, as app.py
+    predicts; predict() runs a batch one window at a time.
+    """
+
+    def __init__(self, path, num_threads=None):
+        """
+        Args:
+            path: The .tflite file
+            num_threads: CPU threads the interpreter's kernels may use
+        """
+        self.path = path
+        self.interpreter = _interpreter_class()(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        input_details = self.interpreter.get_input_details()[0]
+        output_details = self.interpreter.get_output_details()[0]
+        self.input_index = input_details['index']
+        self.output_index = output_details['index']
+        self.input_dtype = input_details['dtype']
+        self.input_quantization = input_details['quantization']  # (scale, zero point), scale 0 if not quantized
+        self.output_quantization = output_details['quantization']
+        self.input_shape = (None,) + tuple(int(d) for d in input_details['shape'][1:])
+        self.output_shape = (None,) + tuple(int(d) for d in output_details['shape'][1:])
+        # An interpreter holds its tensors, so it runs one window at a time
+        self.lock = threading.Lock()
+
+    def _quantize_input(self, window):
+        scale, zero_point = self.input_quantization
+        if not scale:
+            return window.astype(self.input_dtype)
+        limits = np.iinfo(self.input_dtype)
+        return np.clip(np.round(window / scale) + zero_point, limits.min, limits.max).astype(self.input_dtype)
+
+    def _dequantize_output(self, output):
+        scale, zero_point = self.output_quantization
+        if not scale:
+            return output.astype(np.float32)
+        return ((output.astype(np.float32) - zero_point) * scale).astype(np.float32)
+
+    def predict(self, x, batch_size=None, verbose=0):
+        """Return the model output for a batch of input sequences; batch_size and verbose are ignored"""
+        x = np.asarray(x, dtype=np.float32)
+        outputs = []
+        with self.lock:
+            for window in x:
+                self.interpreter.set_tensor(self.input_index, self._quantize_input(window[np.newaxis]))
+                self.interpreter.invoke()
+                outputs.append(self._dequantize_output(self.interpreter.get_tensor(self.output_index)[0]))
+        return np.stack(outputs) if outputs else np.zeros((0,) + self.output_shape[1:], dtype=np.float32)
+
+    def tensor_dtypes(self):
+        """Number of tensors of each dtype, e.g. to see whether any float kernels are left"""
+        counts = {}
+        for tensor in self.interpreter.get_tensor_details():
+            name = np.dtype(tensor['dtype']).name
+            counts[name] = counts.get(name, 0) + 1
+        return counts
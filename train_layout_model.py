@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from evaluate_model import SEQUENCE_LENGTH, load_dataset
+from recognition_logic import actions, KEYPOINT_LAYOUTS, get_layout
+
+# Trains the sign model on a reduced keypoint layout from the same full-layout
+# recordings action.h5 is trained on (MP_Data/<sign>/<sequence>/<frame>.npy
+# or .npz shards, see evaluate_model.py), then converts it for tfjs. E.g.
+#   python train_layout_model.py MP_Data --layout pose_hands
+# writes action_pose_hands.h5 and tfjs_model_pose_hands/, which app.py picks
+# up with KEYPOINT_LAYOUT=pose_hands.
+
+def build_model(features, classes):
+    """The architecture of action.h5 (see tfjs_model/model.json) for a given input width"""
+    import tensorflow as tf
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(SEQUENCE_LENGTH, features)),
+        tf.keras.layers.LSTM(64, return_sequences=True, activation='relu'),
+        tf.keras.layers.LSTM(128, return_sequences=True, activation='relu'),
+        tf.keras.layers.LSTM(64, return_sequences=False, activation='relu'),
+        tf.keras.layers.Dense(64, activation='relu'),
+        tf.keras.layers.Dense(32, activation='relu'),
+        tf.keras.layers.Dense(classes, activation='softmax')
+    ])
+    model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['categorical_accuracy'])
+    return model
+
+def split_by_stream(streams, validation_split, seed):
+    """
+    Hold out whole recordings for validation, so overlapping windows cut from
+    one recording don't end up on both sides
+
+    Returns:
+        tuple: (training mask, validation mask)
+    """
+    ids = np.unique(streams)
+    if validation_split <= 0 or len(ids) < 2:
+        return np.ones(len(streams), dtype=bool), np.zeros(len(streams), dtype=bool)
+    rng = np.random.default_rng(seed)
+    rng.shuffle(ids)
+    held_out = ids[:max(1, int(round(len(ids) * validation_split)))]
+    validation = np.isin(streams, held_out)
+    return ~validation, validation
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and convert the sign model for a keypoint layout")
+    parser.add_argument('paths', nargs='+', help="Full-layout .npy/.npz recordings or directories of them")
+    parser.add_argument('--layout', required=True, choices=list(KEYPOINT_LAYOUTS), help="Keypoint layout to train on")
+    parser.add_argument('--epochs', type=int, default=200, help="Maximum training epochs")
+    parser.add_argument('--patience', type=int, default=30,
+                        help="Stop after this many epochs without validation improvement")
+    parser.add_argument('--batch-size', type=int, default=32, help="Windows per training batch")
+    parser.add_argument('--stride', type=int, default=1, help="Frames between windows cut from longer recordings")
+    parser.add_argument('--validation-split', type=float, default=0.1, help="Fraction of recordings held out")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the split and the weights")
+    parser.add_argument('--output', help="Keras model to write (default action_<layout>.h5)")
+    parser.add_argument('--tfjs-output', help="tfjs model directory to write (default tfjs_model_<layout>)")
+    parser.add_argument('--no-tfjs', action='store_true', help="Skip the tfjs conversion")
+    args = parser.parse_args()
+
+    import tensorflow as tf
+    tf.keras.utils.set_random_seed(args.seed)
+
+    layout = get_layout(args.layout)
+    output = args.output or f"action_{layout.name}.h5"
+    tfjs_output = args.tfjs_output or f"tfjs_model_{layout.name}"
+
+    windows, labels, streams = load_dataset(args.paths, args.stride)
+    windows = layout.select(windows)
+    targets = tf.keras.utils.to_categorical(labels, num_classes=len(actions))
+    train, validation = split_by_stream(streams, args.validation_split, args.seed)
+    print(f"Training on {train.sum()} windows ({validation.sum()} held out) with layout "
+          f"{layout.name}, {layout.size} features per frame")
+
+    model = build_model(layout.size, len(actions))
+    callbacks = []
+    validation_data = None
+    if validation.any():
+        validation_data = (windows[validation], targets[validation])
+        callbacks.append(tf.keras.callbacks.EarlyStopping(monitor='val_categorical_accuracy', patience=args.patience,
+                                                          mode='max', restore_best_weights=True))
+    history = model.fit(windows[train], targets[train], epochs=args.epochs, batch_size=args.batch_size,
+                        validation_data=validation_data, callbacks=callbacks, verbose=2)
+
+    model.save(output)
+    print(f"Saved {output}")
+
+    summary = {
+        'layout': layout.name,
+        'features': layout.size,
+        'epochs': len(history.history['loss']),
+        'train_windows': int(train.sum()),
+        'validation_windows': int(validation.sum()),
+        'train_accuracy': float(history.history['categorical_accuracy'][-1])
+    }
+    if validation.any():
+        summary['validation_accuracy'] = float(max(history.history['val_categorical_accuracy']))
+    with open(os.path.splitext(output)[0] + '.json', 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(json.dumps(summary, indent=2))
+
+    if not args.no_tfjs:
+        from convert_model import convert
+        convert(output, tfjs_output)
+
+if __name__ == '__main__':
+    main()